@@ -1,9 +1,60 @@
-from r2api.converter.giallo_zafferano import GZConverter
-from r2api.converter.fatto_in_casa import FCConverter
-from r2api.converter.molliche_di_zucchero import MZConverter
-from r2api.converter.allacciate_il_grembiule import AGConverter
-from r2api.converter.ricette_di_max import RMConverter
+import importlib
+import sys
 
-from r2api.translate.apply_translation import translate_data
+from r2api.version import __version__
 
-from r2api.utilities.unit_conversion import convert_units_ing, convert_units_prep, simplify_units
\ No newline at end of file
+# Every top level name and the module it comes from. The modules are only imported the first time one of their names is used
+# so i.e. using only convert_units_prep never imports bs4, requests or any of the converters
+_lazy_names = {
+    'GZConverter': 'r2api.converter.giallo_zafferano',
+    'FCConverter': 'r2api.converter.fatto_in_casa',
+    'MZConverter': 'r2api.converter.molliche_di_zucchero',
+    'AGConverter': 'r2api.converter.allacciate_il_grembiule',
+    'RMConverter': 'r2api.converter.ricette_di_max',
+    'Recipe': 'r2api.converter.recipe',
+    'Ingredient': 'r2api.converter.recipe',
+    'convert': 'r2api.converter.registry',
+    'converter_for': 'r2api.converter.registry',
+    'register_converter': 'r2api.converter.registry',
+    'crawl': 'r2api.crawl.crawler',
+    'crawl_and_convert': 'r2api.crawl.crawler',
+    'translate_data': 'r2api.translate.apply_translation',
+    'convert_many': 'r2api.batch.batch_conversion',
+    'BatchResult': 'r2api.batch.batch_conversion',
+    'convert_many_processes': 'r2api.batch.process_conversion',
+    'export_ndjson': 'r2api.export.ndjson',
+    'write_ndjson': 'r2api.export.ndjson',
+    'IngredientTable': 'r2api.export.columnar',
+    'aconvert': 'r2api.batch.async_conversion',
+    'aconvert_many': 'r2api.batch.async_conversion',
+    'convert_units_ing': 'r2api.utilities.unit_conversion',
+    'convert_units_ing_batch': 'r2api.utilities.unit_conversion',
+    'convert_units_prep': 'r2api.utilities.unit_conversion',
+    'simplify_units': 'r2api.utilities.unit_conversion',
+    'UnitConverter': 'r2api.utilities.unit_conversion',
+    'Quantity': 'r2api.utilities.quantity',
+    'parse_quantity': 'r2api.utilities.quantity',
+    'enable_conversion_cache': 'r2api.utilities.unit_conversion',
+    'disable_conversion_cache': 'r2api.utilities.unit_conversion',
+}
+
+__all__ = ['__version__', *_lazy_names]
+
+def _load(name: str):
+    value = getattr(importlib.import_module(_lazy_names[name]), name)
+    # Afterwards it's a normal attribute, so __getattr__ isn't called for it again
+    globals()[name] = value
+    return value
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name: str):
+        if name in _lazy_names:
+            return _load(name)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    def __dir__():
+        return sorted(set(globals()) | set(_lazy_names))
+else:
+    # Module level __getattr__ only exists since Python 3.7, so everything is imported up front as before
+    for _name in _lazy_names:
+        _load(_name)
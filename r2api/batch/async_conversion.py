@@ -0,0 +1,164 @@
+import asyncio
+import functools
+import itertools
+from concurrent.futures import Executor
+from typing import (
+    AsyncIterator,
+    Iterable,
+    Optional,
+    Type
+)
+
+import requests
+
+from ..converter.base_converter import BaseConverter
+from ..converter.registry import converter_for
+from ..fetch.cache import ResponseCache
+from ..fetch.scheduler import HostScheduler, parse_retry_after
+from ..fetch.session import EndMarkerScanner, STREAM_CHUNK_SIZE
+from .batch_conversion import BatchResult
+
+async def aconvert(url: str, converter: Optional[Type[BaseConverter]] = None, *, convert_units: bool = True, executor: Optional[Executor] = None, session = None, **converter_options) -> BaseConverter:
+    """
+    The asyncio version of instantiating a converter: await aconvert(url, GZConverter) instead of GZConverter(url)
+    The page is fetched without blocking the event loop, then the parsing (which is CPU bound) is handed off to the executor
+
+    Args:
+        url (str): the recipe url
+        converter (Optional[Type[BaseConverter]]): the converter class to use, if None it's found with r2api.converter.registry
+        convert_units (bool): if the units should be converted from metric to imperial
+        executor (Optional[Executor]): where the parsing is run, the event loop's default executor if None
+        session (Optional[Union[aiohttp.ClientSession, requests.Session]]): if an aiohttp session is given, the page is fetched with it
+        **converter_options: any other keyword arguments are passed on to the converter
+
+    Raises:
+        ValueError: if converter is None and no converter is registered for the url
+
+    Returns:
+        BaseConverter: the converter instance, exactly as if it had been instantiated synchronously
+    """
+    if converter is None:
+        converter = converter_for(url)
+    loop = asyncio.get_event_loop()
+    recipe_cache = converter_options.get('recipe_cache')
+    if recipe_cache is not None:
+        # sqlite blocks, so even the lookup is done in the executor
+        cached_recipe = await loop.run_in_executor(executor, recipe_cache.get, url, converter, convert_units)
+        if cached_recipe is not None:
+            return converter.from_recipe(url, cached_recipe)
+
+    cache = converter_options.pop('cache', None)
+    # The converter gets stream too, so it knows the page may have been cut short (i.e. not to archive it)
+    stream = converter_options.get('stream', False)
+    scheduler = converter_options.pop('scheduler', None)
+    # Files (and pages in an archive) are read by the converter itself in the executor
+    content = None
+    if not converter_options.get('read_from_file'):
+        content = await afetch(url, converter, session=session, executor=executor, cache=cache, stream=stream, scheduler=scheduler)
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(converter, url, convert_units=convert_units, content=content, **converter_options)
+    )
+
+async def afetch(url: str, converter: Type[BaseConverter] = BaseConverter, *, session = None, executor: Optional[Executor] = None, cache: Optional[ResponseCache] = None, stream: bool = False, scheduler: Optional[HostScheduler] = None) -> bytes:
+    """
+    Fetch the page at the url without blocking the event loop
+    If an aiohttp session is given, it is used. Otherwise the converter's fetch (with the requests session
+    if one was given, the shared one if not) is run in the executor so that this works even if aiohttp isn't installed
+    With a scheduler, the request waits for its turn at the host (without blocking the event loop either)
+    """
+    loop = asyncio.get_event_loop()
+    if session is not None and not isinstance(session, requests.Session):
+        headers = dict(converter.headers)
+        # The cache is sqlite, which blocks, so it's used in the executor too
+        cached = await loop.run_in_executor(executor, cache.get, url) if cache is not None else None
+        if cached is not None:
+            if not cache.revalidate:
+                return cached.content
+            headers.update(cached.conditional_headers())
+        if scheduler is None:
+            response = await session.get(url, headers=headers)
+        else:
+            response = await _scheduled_get(session, url, headers, scheduler)
+        async with response:
+            if cached is not None and response.status == 304:
+                await loop.run_in_executor(executor, functools.partial(
+                    cache.refresh, url, etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified')
+                ))
+                return cached.content
+            if stream and converter.end_markers:
+                scanner = EndMarkerScanner(converter.end_markers)
+                async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    if scanner.feed(chunk):
+                        # Leaving the block without reading the rest closes the connection
+                        return scanner.content
+                content = scanner.content
+            else:
+                content = await response.read()
+            if cache is not None and response.status == 200:
+                await loop.run_in_executor(executor, functools.partial(
+                    cache.put, url, content, etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified')
+                ))
+            return content
+    return await loop.run_in_executor(executor, functools.partial(converter.fetch, url, session=session, cache=cache, stream=stream, scheduler=scheduler))
+
+async def _scheduled_get(session, url: str, headers: dict, scheduler: HostScheduler):
+    """The aiohttp version of the scheduling in r2api.fetch.session.fetch"""
+    attempt = 0
+    while True:
+        await asyncio.sleep(scheduler.reserve(url))
+        response = await session.get(url, headers=headers)
+        if response.status not in scheduler.throttle_statuses:
+            scheduler.succeeded(url)
+            return response
+        scheduler.throttled(url, parse_retry_after(response.headers.get('Retry-After')))
+        if attempt >= scheduler.max_retries:
+            return response
+        attempt += 1
+        response.release()
+
+async def aconvert_many(urls: Iterable[str], converter: Optional[Type[BaseConverter]] = None, *, concurrency: int = 8, convert_units: bool = True, executor: Optional[Executor] = None, session = None, **converter_options) -> AsyncIterator[BatchResult]:
+    """
+    The asyncio version of convert_many: results are yielded as they finish with errors captured per url
+
+    Args:
+        urls (Iterable[str]): the recipe urls
+        converter (Optional[Type[BaseConverter]]): the converter class used for every url, if None each url's is found with r2api.converter.registry
+        concurrency (int): how many recipes are fetched/parsed at the same time
+        convert_units (bool): if the units should be converted from metric to imperial
+        executor (Optional[Executor]): where the parsing is run, the event loop's default executor if None
+        session (Optional[Union[aiohttp.ClientSession, requests.Session]]): if an aiohttp session is given, the pages are fetched with it
+        **converter_options: any other keyword arguments are passed on to the converter
+
+    Raises:
+        ValueError: if concurrency is less than 1
+
+    Returns:
+        AsyncIterator[BatchResult]: one result per url
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    async def convert_one(url: str) -> BatchResult:
+        try:
+            converted = await aconvert(url, converter, convert_units=convert_units,
+                executor=executor, session=session, **converter_options)
+        except Exception as e:
+            return BatchResult(url, None, e)
+        return BatchResult(url, converted.recipe, None)
+
+    scheduler = converter_options.get('scheduler')
+    urls = scheduler.interleave(urls) if scheduler is not None else iter(urls)
+    # Same as convert_many: only as many urls as can be worked on are turned into tasks
+    pending = {asyncio.ensure_future(convert_one(url)) for url in itertools.islice(urls, concurrency)}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for url in itertools.islice(urls, 1):
+                    pending.add(asyncio.ensure_future(convert_one(url)))
+                yield task.result()
+    finally:
+        # If the caller stops iterating early, the remaining tasks are cancelled
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,122 @@
+import itertools
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Type,
+    Union
+)
+
+from ..converter.base_converter import BaseConverter
+from ..converter.registry import converter_for
+
+# How often (in seconds) the urls in a queue are checked for while the results are being waited for
+_POLL_INTERVAL = 0.1
+
+class BatchResult(NamedTuple):
+    """
+    The outcome of converting one URL in a batch
+    recipe will be None if the conversion failed, in which case error holds the exception that was raised
+    """
+    url: str
+    recipe: Optional[dict]
+    error: Optional[Exception]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def convert_many(urls: Union[Iterable[str], queue.Queue], converter: Optional[Type[BaseConverter]] = None, *, max_workers: int = 8, convert_units: bool = True, **converter_options) -> Iterator[BatchResult]:
+    """
+    Fetches and parses many recipes at once using a pool of threads
+    Results are yielded as soon as they finish, so they will not necessarily be in the same order as urls
+
+    Args:
+        urls (Union[Iterable[str], queue.Queue]): the recipe urls, it can be a generator so the whole list never needs to be in memory.
+            It can also be a queue.Queue another thread puts the urls in as it finds them (i.e. a crawl), followed by None once
+            there are no more: the finished results are then never held up waiting for the next url
+        converter (Optional[Type[BaseConverter]]): the converter class used for every url, if None each url's is found with r2api.converter.registry
+        max_workers (int): how many recipes are fetched/parsed at the same time
+        convert_units (bool): if the units should be converted from metric to imperial
+        **converter_options: any other keyword arguments are passed on to the converter, i.e. read_from_file. With a scheduler, the urls
+            (unless they're in a queue) are interleaved by host
+
+    Raises:
+        ValueError: if max_workers is less than 1
+
+    Returns:
+        Iterator[BatchResult]: one result per url, an error on one url doesn't stop the batch
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    if isinstance(urls, queue.Queue):
+        take = _take_from_queue(urls)
+    else:
+        # The workers take the urls round-robin across the hosts, so a busy (or throttling) host doesn't leave them all waiting on it
+        scheduler = converter_options.get('scheduler')
+        take = _take_from_iterator(scheduler.interleave(urls) if scheduler is not None else iter(urls))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # We only keep a couple of urls queued per worker
+        # so a batch of 40k urls doesn't create 40k futures up front
+        window = max_workers * 2
+        pending = set()
+        exhausted = False
+        while True:
+            # Only waits for a url if there's no result to wait for instead
+            taken = take(window - len(pending), not pending) if not exhausted else None
+            if taken is None:
+                exhausted = True
+            else:
+                for url in taken:
+                    pending.add(executor.submit(_convert_one, converter, url, convert_units, converter_options))
+            if not pending:
+                if exhausted:
+                    return
+                continue
+            # If the queue had no url ready, the window is topped up again on the next wake-up
+            done, pending = wait(pending, timeout=None if exhausted else _POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+def _take_from_iterator(urls: Iterator[str]) -> Callable[[int, bool], Optional[List[str]]]:
+    def take(count: int, block: bool) -> Optional[List[str]]:
+        # An iterator can't be read without blocking, so block is ignored
+        taken = list(itertools.islice(urls, count))
+        return taken if taken or count == 0 else None
+    return take
+
+def _take_from_queue(urls: queue.Queue) -> Callable[[int, bool], Optional[List[str]]]:
+    finished = False
+
+    def take(count: int, block: bool) -> Optional[List[str]]:
+        """Up to count urls, as many as there are right now unless block is set, and None once the queue has given None"""
+        nonlocal finished
+        taken = []
+        while not finished and len(taken) < count:
+            try:
+                url = urls.get(block=block and not taken)
+            except queue.Empty:
+                break
+            if url is None:
+                finished = True
+            else:
+                taken.append(url)
+        return None if finished and not taken else taken
+    return take
+
+def _convert_one(converter: Optional[Type[BaseConverter]], url: str, convert_units: bool, converter_options: dict) -> BatchResult:
+    # Every exception is caught so one bad page doesn't bring down the rest of the batch
+    try:
+        if converter is None:
+            converter = converter_for(url)
+        recipe = converter(url, convert_units=convert_units, **converter_options).recipe
+    except Exception as e:
+        return BatchResult(url, None, e)
+    return BatchResult(url, recipe, None)
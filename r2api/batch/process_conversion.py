@@ -0,0 +1,119 @@
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import (
+    Iterable,
+    Iterator,
+    Optional,
+    Type
+)
+
+from ..converter.base_converter import BaseConverter
+from ..converter.parsers import get_default_parser
+from ..converter.registry import converter_for
+from .batch_conversion import BatchResult
+
+# The options used to get the page, which is done in the threads. Every other option goes to the converter in the worker process
+_LOAD_OPTIONS = ('read_from_file', 'archive', 'session', 'cache', 'stream', 'scheduler')
+
+def _warm_up(converters, default_parser: str) -> None:
+    """
+    Run once in every worker process, before the first page arrives: sets the default parser to this process's
+    (a spawned worker would otherwise start with html.parser whatever set_default_parser was given), then resolves the parser
+    and builds the strainer of the converters (the one given, if any). The strainers and every other cache (parse_quantity's, etc.)
+    stay in the worker for the pages after, only the converters themselves are made per page, since each is the recipe of its page
+    """
+    from ..converter.parsers import make_strainer, set_default_parser
+    set_default_parser(default_parser)
+    for converter in converters:
+        converter.get_parser()
+        make_strainer(converter.parse_only)
+
+def _parse(converter: Type[BaseConverter], url: str, content, convert_units: bool, converter_options: dict) -> dict:
+    # Runs in a worker process, only the plain recipe dictionary is sent back (a soup can't be pickled, and shouldn't be)
+    return converter(url, content=content, convert_units=convert_units, **converter_options)._recipe_dict()
+
+def convert_many_processes(urls: Iterable[str], converter: Optional[Type[BaseConverter]] = None, *, fetch_workers: int = 16, parse_workers: Optional[int] = None, convert_units: bool = True, **converter_options) -> Iterator[BatchResult]:
+    """
+    Like convert_many, but the pages are parsed in a pool of processes while they're fetched in a pool of threads
+    Parsing is CPU bound and holds the GIL, so with threads alone it never uses more than about one core.
+    Here the threads only download, and the raw pages are sent to the worker processes to be parsed
+    Results are yielded as soon as they finish, so they will not necessarily be in the same order as urls
+
+    Args:
+        urls (Iterable[str]): the recipe urls, it can be a generator so the whole list never needs to be in memory
+        converter (Optional[Type[BaseConverter]]): the converter class used for every url, if None each url's is found with r2api.converter.registry
+        fetch_workers (int): how many pages are downloaded at the same time
+        parse_workers (Optional[int]): how many processes parse the pages, one per core if None
+        convert_units (bool): if the units should be converted from metric to imperial
+        **converter_options: any other keyword arguments are passed on to the converter. read_from_file, archive, session, cache,
+            stream and scheduler are used in the threads, recipe_cache in this process, and the rest are sent to the worker processes
+
+    Raises:
+        ValueError: if fetch_workers or parse_workers is less than 1
+
+    Returns:
+        Iterator[BatchResult]: one result per url with the recipe as a plain dictionary, an error on one url doesn't stop the batch
+    """
+    if parse_workers is None:
+        parse_workers = os.cpu_count() or 1
+    if fetch_workers < 1:
+        raise ValueError("fetch_workers must be at least 1")
+    if parse_workers < 1:
+        raise ValueError("parse_workers must be at least 1")
+
+    load_options = {key: converter_options.pop(key) for key in _LOAD_OPTIONS if key in converter_options}
+    recipe_cache = converter_options.pop('recipe_cache', None)
+    # The recipe is a plain dictionary either way
+    converter_options.pop('lazy', None)
+    converter_options.pop('keep_soup', None)
+    scheduler = load_options.get('scheduler')
+    urls = scheduler.interleave(urls) if scheduler is not None else iter(urls)
+
+    def load(url: str):
+        # Runs in a thread: returns the cached recipe or the converter class and the page for a worker process to parse
+        url_converter = converter if converter is not None else converter_for(url)
+        if recipe_cache is not None:
+            cached_recipe = recipe_cache.get(url, url_converter, convert_units)
+            if cached_recipe is not None:
+                return url_converter, cached_recipe, None
+        return url_converter, None, url_converter.load(url, **load_options)
+
+    # Only as many urls as both pools can work on (and a few more queued) are read, as in convert_many
+    window = (fetch_workers + parse_workers) * 2
+    warm_converters = (converter,) if converter is not None else ()
+    with ThreadPoolExecutor(max_workers=fetch_workers) as threads, \
+            ProcessPoolExecutor(max_workers=parse_workers, initializer=_warm_up, initargs=(warm_converters, get_default_parser())) as processes:
+        # future -> (url, converter class or None while it's being fetched)
+        pending = {}
+
+        def refill() -> None:
+            for url in itertools.islice(urls, max(0, window - len(pending))):
+                pending[threads.submit(load, url)] = (url, None)
+
+        refill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, parsed_by = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    yield BatchResult(url, None, e)
+                    continue
+                if parsed_by is not None:
+                    if recipe_cache is not None:
+                        recipe_cache.put(url, parsed_by, convert_units, result)
+                    yield BatchResult(url, result, None)
+                    continue
+                url_converter, cached_recipe, content = result
+                if cached_recipe is not None:
+                    yield BatchResult(url, cached_recipe, None)
+                    continue
+                try:
+                    parse_future = processes.submit(_parse, url_converter, url, content, convert_units, converter_options)
+                except Exception as e:
+                    yield BatchResult(url, None, e)
+                    continue
+                pending[parse_future] = (url, url_converter)
+            refill()
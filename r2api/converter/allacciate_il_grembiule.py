@@ -11,8 +11,7 @@ from .base_converter import BaseConverter
 from ..utilities.unit_conversion import (
     convert_units_prep,
     convert_units_name,
-    convert_units_ing,
-    float_dot_zero
+    convert_units_ing
 )
 
 
@@ -26,6 +25,14 @@ class AGConverter(BaseConverter):
     recipe['preparation']: list of the steps to make the recipe
     """
 
+    # The preparation is the last thing we need and it's a single list
+    end_markers = (b'recipe-steps', b'</ol>')
+    # Every image is needed to find the one of the recipe
+    parse_only = ('title', 'img', 'div.recipe-ingredients-content', 'div.recipe-steps')
+    recipe_url_pattern = r'^https?://blog\.giallozafferano\.it/allacciateilgrembiule/(?!category/|tag/|page/|author/|wp-)[\w-]+/?$'
+    listing_url_pattern = r'^https?://blog\.giallozafferano\.it/allacciateilgrembiule/(category/[\w/-]+|page/\d+/?)$'
+    crawl_seeds = ('https://blog.giallozafferano.it/allacciateilgrembiule/',)
+
     def get_title(self, soup: BeautifulSoup) -> str:
         return soup.find("title").text
 
@@ -164,11 +171,7 @@ class AGConverter(BaseConverter):
         #   how the conversion must be done
         _name = convert_units_name(name)
         _quantity, _unit = convert_units_ing(quantity, unit)
-        if float_dot_zero(_quantity):
-            # This is the best and only spot to knock off the .0
-            # since it will be created by the conversion util functions
-            _quantity = int(_quantity)
-        return [_name, _quantity, _unit] 
+        return [_name, _quantity, _unit]
 
     def get_preparation(self, soup: BeautifulSoup, convert_units: bool = True):
         """
@@ -1,6 +1,18 @@
 from abc import ABC, abstractmethod
 from bs4 import BeautifulSoup
-import requests, json
+import requests, json, zlib, functools
+
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from ..export.serializers import dumps
+from ..fetch.archive import SnapshotArchive
+from ..fetch.cache import ResponseCache
+from ..fetch.scheduler import HostScheduler
+from ..fetch.session import DEFAULT_HEADERS, cut_short, fetch
+from .lazy_recipe import LazyRecipe
+from .parsers import get_default_parser, make_strainer, resolve_parser
+from .recipe import Recipe, to_ingredients
+from .recipe_cache import RecipeCache
 
 class BaseConverter(ABC):
     """
@@ -10,9 +22,21 @@ class BaseConverter(ABC):
     Parameters:
         url: string -- the recipe url
         convert_units: boolean = True -- if the units should be converted from metric to imperial
-        read_from_file: boolean = False -- if the url is a relative path to the recipe or a url
+        read_from_file: boolean = False -- if the url is a relative path to the recipe or a url (or, with an archive, the url of a page in the archive)
+        content: string or bytes = None -- the already fetched page, if given the url is neither fetched nor read
+        session: requests.Session = None -- the session used to fetch the page, the shared session from r2api.fetch.session if None
+        cache: ResponseCache = None -- an opt-in on-disk cache of the fetched pages that are revalidated instead of downloaded again
+        archive: SnapshotArchive = None -- with read_from_file, the page is read from the archive, otherwise the fetched page is added to it (unless stream cut it short)
+        recipe_cache: RecipeCache = None -- an opt-in cache of parsed recipes, if the recipe is in it the page isn't fetched or parsed (and soup will be None)
+        scheduler: HostScheduler = None -- limits the rate of requests to each host and pauses hosts that throttle (see r2api.fetch.scheduler)
+        stream: boolean = False -- if the download should stop once the parts of the page the converter needs have been received
+        parser: string = None -- the BeautifulSoup parser ('html.parser', 'lxml' or 'auto'), the converter's or the default parser if None
+        strain: boolean = True -- if only the elements in the converter's parse_only are parsed, otherwise the soup is of the whole page
+        keep_soup: boolean = True -- if False, the soup is decomposed once the recipe is built and only the page, compressed, is kept (see get_soup)
+        lazy: boolean = False -- if each field of the recipe is only computed when it's first accessed (see r2api.converter.lazy_recipe.LazyRecipe), ignored with a recipe_cache. Without keep_soup, the first field accessed builds the others too, so the page is only parsed again once
 
     Properties:
+        recipe: Recipe -- the parsed recipe, which can be used like the dictionary it used to be (see r2api.converter.recipe.Recipe)
 
     Methods:
         write_soup_to writes the soup as bs4.Soup.prettify() to a the relative path specified
@@ -20,25 +44,159 @@ class BaseConverter(ABC):
     NOTE: The recipe will not be parsed whatsoever in this base class.
     """
 
-    def __init__(self, url: str, *, convert_units: bool = True, read_from_file: bool = False):
+    headers = DEFAULT_HEADERS
+    # With stream=True, the download stops once these have all been seen in order (see r2api.fetch.session.EndMarkerScanner)
+    # Converters set them to something that comes after the last part of the page they need. Empty means the whole page is always read
+    end_markers: Tuple[bytes, ...] = ()
+    # The BeautifulSoup parser used by this converter, None means the default from r2api.converter.parsers
+    parser: Optional[str] = None
+    # The elements the converter reads, as 'tag', 'tag.class' or 'tag#id' (see r2api.converter.parsers.SelectorStrainer)
+    # Only these (and everything inside them) are built into the soup. Empty means the whole page is
+    parse_only: Tuple[str, ...] = ()
+    # For r2api.crawl: the links that are recipes of the converter's site, the links that are pages listing them (i.e. categories)
+    # and the pages a crawl of the site starts from. A converter without a recipe_url_pattern is never crawled
+    recipe_url_pattern: Optional[str] = None
+    listing_url_pattern: Optional[str] = None
+    crawl_seeds: Tuple[str, ...] = ()
+
+    def __init__(self, url: str, *, convert_units: bool = True, read_from_file: bool = False, content: Optional[Union[str, bytes]] = None, session: Optional[requests.Session] = None, cache: Optional[ResponseCache] = None, recipe_cache: Optional[RecipeCache] = None, stream: bool = False, parser: Optional[str] = None, strain: bool = True, lazy: bool = False, keep_soup: bool = True, archive: Optional[SnapshotArchive] = None, scheduler: Optional[HostScheduler] = None):
+        self.url = url
+        # A cached recipe means there is nothing to fetch or parse at all
+        # If the content was passed in, the caller wants it parsed, so the cache isn't checked
+        if recipe_cache is not None and content is None:
+            cached_recipe = recipe_cache.get(url, type(self), convert_units)
+            if cached_recipe is not None:
+                self.soup = None
+                self._raw = None
+                self.recipe = Recipe.from_dict(cached_recipe)
+                return
+
+        # If the content has already been fetched (i.e. by aconvert), we only parse it
+        if content is None:
+            content = self.load(url, read_from_file=read_from_file, archive=archive, session=session, cache=cache, stream=stream, scheduler=scheduler)
+        elif archive is not None and not read_from_file:
+            content_bytes = content.encode('utf-8') if isinstance(content, str) else content
+            # A streamed page (i.e. fetched by aconvert) that stopped at the end markers isn't the whole page
+            if not (stream and cut_short(content_bytes, self.end_markers)):
+                archive.put(url, content_bytes)
+        self._parse_options = (self.get_parser(parser), strain)
+        self._raw = None
+        self.soup = self._parse(content)
+
+        # For a listing, i.e., only the name and the image may be wanted, so the ingredients and preparation
+        # (and their unit conversion) are only done if they're accessed. The cache has to store the whole recipe though
+        if lazy and recipe_cache is None:
+            fields = {
+                'name': self.get_title,
+                'image': self.get_image,
+                'ingredients': lambda soup: to_ingredients(self.get_ingredients(soup, convert_units)),
+                'preparation': lambda soup: self.get_preparation(soup, convert_units),
+            }
+            if keep_soup:
+                self.recipe = LazyRecipe({key: functools.partial(self._lazy_field, field) for key, field in fields.items()})
+                return
+            # Without the soup, the page has to be parsed again, which costs more than building every field from it,
+            # so the first field accessed builds all the ones that haven't been yet
+            self.recipe = LazyRecipe({key: functools.partial(self._reparsed_fields, fields, key) for key in fields})
+            self._release_soup(content)
+            return
+
+        self.recipe = Recipe(
+            self.get_title(self.soup),
+            self.get_image(self.soup),
+            self.get_ingredients(self.soup, convert_units),
+            self.get_preparation(self.soup, convert_units)
+        )
+
+        if recipe_cache is not None:
+            recipe_cache.put(url, type(self), convert_units, self.recipe)
+
+        if not keep_soup:
+            self._release_soup(content)
+
+    def _lazy_field(self, field: Callable[[BeautifulSoup], Any]) -> Any:
+        return field(self.soup)
+
+    def _reparsed_fields(self, fields: Dict[str, Callable[[BeautifulSoup], Any]], key: str) -> Any:
+        soup = self.get_soup()
+        for other, field in fields.items():
+            # A field that was set (or deleted) in the meantime is left as it is
+            if other != key and other in self.recipe and not self.recipe.is_computed(other):
+                self.recipe[other] = field(soup)
+        value = fields[key](soup)
+        soup.decompose()
+        return value
+
+    def _parse(self, content: Union[str, bytes]) -> BeautifulSoup:
+        parser, strain = self._parse_options
+        return BeautifulSoup(content, parser, parse_only=make_strainer(self.parse_only) if strain else None)
+
+    def _release_soup(self, content: Union[str, bytes]) -> None:
+        # A soup is many times the size of the page (every tag and string is an object with links to its neighbours)
+        # and the page compresses well, so thousands of converters can be kept around without their soups
+        # decompose breaks up the tree right away instead of leaving it for the garbage collector
+        self.soup.decompose()
+        self.soup = None
+        self._raw_is_text = isinstance(content, str)
+        self._raw = zlib.compress(content.encode('utf-8') if self._raw_is_text else content)
+
+    def get_soup(self) -> Optional[BeautifulSoup]:
+        """
+        The soup of the page. If it was released (keep_soup=False), the page is parsed again (the same way) and the new soup isn't kept
+        None if the recipe came from a recipe cache, since the page was never fetched
+        """
+        if self.soup is not None or self._raw is None:
+            return self.soup
+        content = zlib.decompress(self._raw)
+        return self._parse(content.decode('utf-8') if self._raw_is_text else content)
+
+    @classmethod
+    def from_recipe(cls, url: str, recipe: dict) -> 'BaseConverter':
+        """Wraps an already parsed recipe (i.e. from a RecipeCache) in a converter without fetching or parsing anything"""
+        converter = cls.__new__(cls)
+        converter.url = url
+        converter.soup = None
+        converter._raw = None
+        converter.recipe = Recipe.from_dict(recipe)
+        return converter
+
+    @classmethod
+    def get_parser(cls, parser: Optional[str] = None) -> str:
+        """The parser that is used: the one passed in, otherwise the converter's own, otherwise the default"""
+        if parser is not None:
+            return resolve_parser(parser)
+        if cls.parser is not None:
+            return resolve_parser(cls.parser)
+        return get_default_parser()
+
+    @classmethod
+    def load(cls, url: str, *, read_from_file: bool = False, archive: Optional[SnapshotArchive] = None, session: Optional[requests.Session] = None, cache: Optional[ResponseCache] = None, stream: bool = False, scheduler: Optional[HostScheduler] = None) -> Union[str, bytes]:
+        """
+        Gets the page the way the constructor would, without parsing it: read from the file or the archive with read_from_file,
+        otherwise fetched (and added to the archive if there is one)
+        """
+        if read_from_file and archive is not None:
+            content = archive.get(url)
+            if content is None:
+                raise KeyError(f"{url} is not in the archive")
+            return content
         if read_from_file:
             with open(url, 'r') as f:
-                self.soup = BeautifulSoup(f, 'html.parser')
-        else:
-            # Yes, fellow robot--err, a robot! Yes, hello. I'm a HUMAN. Please let me access your website.
-            r = requests.get(url,
-                headers={'User-agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:61.0) Gecko/20100101 Firefox/61.0'})
-            self.soup = BeautifulSoup(r.content, 'html.parser')
-
-        self.recipe = {}
-        self.recipe['name'] = self.get_title(self.soup)
-        self.recipe['image'] = self.get_image(self.soup)
-        self.recipe['ingredients'] = self.get_ingredients(
-            self.soup, convert_units
-        )
-        self.recipe['preparation'] = self.get_preparation(
-            self.soup, convert_units
-        )
+                return f.read()
+        content = cls.fetch(url, session=session, cache=cache, stream=stream, scheduler=scheduler)
+        # The original bytes are archived (rather than the soup) so replaying them gives exactly what was parsed
+        # A page cut short by the end markers isn't archived, replaying it wouldn't be replaying the page
+        if archive is not None and not (stream and cut_short(content, cls.end_markers)):
+            archive.put(url, content)
+        return content
+
+    @classmethod
+    def fetch(cls, url: str, *, session: Optional[requests.Session] = None, cache: Optional[ResponseCache] = None, stream: bool = False, scheduler: Optional[HostScheduler] = None) -> bytes:
+        """
+        Download the page at the url with the shared (or given) session and return the raw bytes of the response
+        If stream is True, the download stops after the converter's end_markers
+        """
+        return fetch(url, session=session, headers=cls.headers, cache=cache, end_markers=cls.end_markers if stream else (), scheduler=scheduler)
 
     def __repr__(self):
         return repr(self.recipe)
@@ -67,14 +225,35 @@ class BaseConverter(ABC):
         return self.recipe.keys()
 
     def write_soup_to(self, path: str):
-        """Write the soup to the path"""
+        """Write the soup to the path, if it was released (keep_soup=False) it's parsed again from the compressed page"""
+        soup = self.get_soup()
+        if soup is None:
+            raise ValueError("There is no soup to write, the recipe came from a recipe cache")
         with open(path, 'w') as f:
-            f.write(self.soup.prettify())
+            f.write(soup.prettify())
 
-    def write_recipe_to(self, path: str, indent:int = 4):
-        """Write the recipe to the path as a JSON object, indent is customizable"""
-        with open(path, 'w') as f:
-            f.write(json.dumps(self.recipe, indent=indent))
+    def write_recipe_to(self, path: str, indent:int = 4, format: str = 'json'):
+        """
+        Write the recipe to the path as a JSON object, indent is customizable
+        format can be 'orjson' (the same JSON written much faster, indented by 2 if at all) or 'msgpack' (compact binary),
+        which need pip install orjson/msgpack. r2api.export.serializers.read_recipe reads any of them back
+        """
+        if format == 'json':
+            with open(path, 'w') as f:
+                f.write(json.dumps(self._recipe_dict(), indent=indent))
+            return
+        # Serialized first, so the file isn't emptied if the format is unknown or its module isn't installed
+        data = dumps(self._recipe_dict(), format, indent=indent)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def _recipe_dict(self) -> dict:
+        """The recipe as a plain dictionary (the ingredients as lists), a lazy recipe has all of its fields computed"""
+        if isinstance(self.recipe, Recipe):
+            return self.recipe.to_dict()
+        if isinstance(self.recipe, LazyRecipe):
+            return self.recipe.materialize()
+        return self.recipe
 
     # Abstract methods
     @abstractmethod
@@ -8,11 +8,11 @@ from typing import (
 from bs4 import BeautifulSoup
 
 from .base_converter import BaseConverter
+from ..utilities.quantity import parse_quantity
 from ..utilities.unit_conversion import (
     convert_units_prep,
     convert_units_name,
-    convert_units_ing,
-    float_dot_zero
+    convert_units_ing
 )
 
 class FCConverter(BaseConverter):
@@ -29,6 +29,14 @@ class FCConverter(BaseConverter):
     Optional parameters: convert_units: bool = True
     If True, units and their quantities in both ingredients and preparation will be converted into American imperial units. If False, they will not be converted
     """
+
+    # The preparation is the last thing we need and it's a single list
+    end_markers = (b'wpurp-recipe-instructions', b'</ol>')
+    parse_only = ('title', 'img#top-img', 'li.wpurp-recipe-ingredient', 'li.wpurp-recipe-instruction')
+    recipe_url_pattern = r'^https?://(www\.)?fattoincasadabenedetta\.it/ricetta/[\w-]+/?$'
+    listing_url_pattern = r'^https?://(www\.)?fattoincasadabenedetta\.it/(categoria|category)/[\w/-]+$'
+    crawl_seeds = ('https://www.fattoincasadabenedetta.it/',)
+
     def get_title(self, soup: BeautifulSoup) -> str:
         return soup.find('title') \
             .text \
@@ -75,9 +83,7 @@ class FCConverter(BaseConverter):
             if len(children) > 0 and re.search(r'\d+', children[0].text):
                 # The first child's text will be the quantity
                 # i.e. (5 o 6) in this particular case
-                try:
-                    float(quantity)
-                except:
+                if not parse_quantity(quantity).plain:
                     quantity = children[0].text
                 # If there are parentheses, then this will get rid of them
                 quantity = quantity.replace("(", "").replace(")", "")
@@ -112,16 +118,11 @@ class FCConverter(BaseConverter):
             if name[:3] == "di ":
                 name = name[3:].capitalize()
 
-            # If convert_units is set to False, this is skipped
+            # If convert_units is set to False, this is skipped and the quantity stays as it was written
             if convert_units:
                 quantity, unit = convert_units_ing(quantity, unit)
                 name = convert_units_name(name)
 
-            # If we have a quantity like 1.0 (which should not happen with this recipe)
-            # then we convert it to 1
-            if float_dot_zero(quantity):
-                quantity = int(quantity)
-
             ingredients.append([name, quantity, unit])
         return ingredients
 
@@ -8,13 +8,18 @@ from typing import (
 from bs4 import BeautifulSoup
 
 from .base_converter import BaseConverter
+from ..utilities.quantity import format_quantity
 from ..utilities.unit_conversion import (
     convert_units_prep,
     convert_units_name,
-    convert_units_ing,
-    float_dot_zero
+    convert_units_ing
 )
 
+# The note, quantity and unit of an ingredient, see _parse_ingredients for its groups
+# Everything after the note is optional, so the first way it's tried always matches and nothing is backtracked into:
+# it takes linear time even on a long run of digits or letters (the only backtracking is .* looking for the last bracket)
+_QUANTITY_UNIT_PATTERN = re.compile(r'(\(.*\)|\D*)?(\d*[,\./]?[\d]*)[\s]*(\D*)(\d+)?[\s]*(\D+)?')
+
 class GZConverter(BaseConverter):
     """
     This class will take a URL of a Giallo Zafferano recipe and and produce a dictionary accessible at .recipe with the following qualities
@@ -25,6 +30,15 @@ class GZConverter(BaseConverter):
     recipe['preparation']: list of the steps to make the recipe
     """
 
+    # The preparation is the second gz-content-recipe div (see get_preparation), so the third means we have everything
+    end_markers = (b'gz-content-recipe gz-mBottom4x',) * 3
+    # The image can be in the featured picture, the first source or a preloaded link
+    parse_only = ('title', 'picture.gz-featured-image', 'source', 'link', 'dd.gz-ingredient', 'div.gz-content-recipe')
+    recipe_url_pattern = r'^https?://ricette\.giallozafferano\.it/[\w-]+\.html$'
+    # The categories are on www.giallozafferano.it rather than on ricette.giallozafferano.it
+    listing_url_pattern = r'^https?://(www\.)?giallozafferano\.it/ricette-cat/[\w/-]*$'
+    crawl_seeds = ('https://www.giallozafferano.it/ricette-cat/',)
+
     def get_title(self, soup: BeautifulSoup) -> str:
         return soup.find('title').text.strip().replace("\n", "")
 
@@ -70,23 +84,10 @@ class GZConverter(BaseConverter):
             'a piacere': 'to taste'
         }
 
-        # This is me trying to be funny, but for the comprehension of units
-        # if they use a vulgar fraction will need it to be converted into an
-        # amount. I didn't include more because I doubt many recipes include
-        # things like 2/5ths of a teaspoon.
+        # Vulgar fractions (½) are counted by the regex as letters, not numbers, so they end up in group(1)
+        # They're numbers to parse_quantity, which is what reads every quantity in the end
+        vulgar_fractions = ('¼', '½', '¾', '⅓', '⅔')
 
-        # Any vulgar fraction is uncommon and tends not to be paired with units.
-        # Since this is unicode, it could be passed on just fine without
-        # conversion into future parts;
-        # however, this is a precaution because it could potentially happen
-        especially_vulgar_fractions = {
-            '¼': '1/4',
-            '½': '1/2',
-            '¾': '3/4',
-            '⅓': '1/3',
-            '⅔': '2/3'
-        }
-        
         # Isolate the name, easiest to find in this soup
         name = ingredient.find('a').text.strip()
         # quantity_unit will be one of three formats:
@@ -105,7 +106,7 @@ class GZConverter(BaseConverter):
         #     If the special word exists, group(2) will be None
         # 3. group(3) will be the unit or the special word
         #     group(3) should never be none--it would mean the ingredient doesn't have any words
-        q_u_regex = re.search(r'(\(.*\)|\D*)?(\d*[,\./]?[\d]*)[\s]*(\D*)(\d+)?[\s]*(\D+)?', quantity_unit)
+        q_u_regex = _QUANTITY_UNIT_PATTERN.search(quantity_unit)
 
         # Again, we check if it worked; an blank regex makes the ingredient get appended as []
         if q_u_regex:
@@ -147,13 +148,13 @@ class GZConverter(BaseConverter):
                             unit = "n/a"
                 
                 # This is the same but for a note and a vulgar fraction
-                for fraction in especially_vulgar_fractions.keys():
+                for fraction in vulgar_fractions:
                     if fraction in q_u_regex.group(1):
                         special_or_fraction_in_group1 = True
                         temp = q_u_regex.group(1).split(fraction)
                         name += f" {temp[0]}"
                         note_added = True
-                        quantity = especially_vulgar_fractions[fraction]
+                        quantity = fraction
                         if len(temp) > 1:
                             unit = temp[1]
                         else:
@@ -186,10 +187,8 @@ class GZConverter(BaseConverter):
                 unit = 'n/a'
             # Case 2: There's is a vulgar fraction
             # i.e. ¼ -> group(1) = ¼; group(2) and (3) = None;
-            elif q_u_regex.group(1) and q_u_regex.group(1) in especially_vulgar_fractions:
-                quantity = especially_vulgar_fractions[q_u_regex.group(1)]
-                # This statement is saying: the quantity is equall to the conversion
-                # outlined in the especially_vulgar_fractions dictionary
+            elif q_u_regex.group(1) and q_u_regex.group(1) in vulgar_fractions:
+                quantity = q_u_regex.group(1)
                 if q_u_regex.group(3) and q_u_regex.group(3) != '':
                     unit = q_u_regex.group(3)
                 else:
@@ -246,27 +245,20 @@ class GZConverter(BaseConverter):
                     name += ' '
                 name += note.strip()
         
-        # With the units identified, they can be converted
+        # With the units identified, they can be converted (which rounds the quantity and knocks off any .0)
+        # Otherwise it's written as it was, with a vulgar fraction written out (½ is 1/2) as GZ always has
         if convert_units:
             quantity, unit = convert_units_ing(quantity, unit)
             name = convert_units_name(name)
-        # Sometimes the quantity cannot be be rounded because it is not a number
-        # even after the conversion
-
-        # This is by far the easiest place to do the .0 to int conversion
-        if float_dot_zero(quantity):
-            quantity = int(quantity)
+        else:
+            quantity = format_quantity(quantity)
 
         # With the modifications in 0.1.3, sometimes the units don't
         # get caught in the other regex that allow for them
         if unit == '':
             unit = 'n/a'
 
-        try:
-            final_ingredient = [name, round(quantity, 2), unit]
-        except:
-            final_ingredient = [name, quantity, unit]
-        return final_ingredient
+        return [name, quantity, unit]
 
     def get_preparation(self, soup: BeautifulSoup, convert_units: bool = True) -> List[str]:
         """
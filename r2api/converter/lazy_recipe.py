@@ -0,0 +1,82 @@
+from collections.abc import ItemsView, KeysView, ValuesView
+from typing import (
+    Any,
+    Callable,
+    Dict
+)
+
+class LazyRecipe(dict):
+    """
+    A recipe dictionary whose fields are only computed the first time they're accessed, then kept
+    The uncomputed fields still count as keys, so it looks like the dictionary it would have been if it had been made at once:
+    keys(), in, len(), iteration, items(), values() and == all see every field (items(), values() and == compute them)
+    json.dumps only sees the fields that have been computed, so use materialize() first (write_recipe_to does)
+
+    Parameters:
+        fields: dict of string to function -- the name of each field and the function (with no arguments) that computes it
+    """
+
+    def __init__(self, fields: Dict[str, Callable[[], Any]]):
+        super().__init__()
+        self._fields = dict(fields)
+
+    def __missing__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        value = self._fields[key]()
+        self[key] = value
+        return value
+
+    def __contains__(self, key) -> bool:
+        return key in self._fields or super().__contains__(key)
+
+    def __iter__(self):
+        yield from self._fields
+        for key in super().__iter__():
+            if key not in self._fields:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._fields.pop(key, None)
+        if super().__contains__(key):
+            super().__delitem__(key)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, dict):
+            return self.materialize() == (other.materialize() if isinstance(other, LazyRecipe) else other)
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __repr__(self) -> str:
+        return repr(self.materialize())
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self) -> KeysView:
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        return ItemsView(self)
+
+    def copy(self) -> dict:
+        return self.materialize()
+
+    def is_computed(self, key: str) -> bool:
+        """If the field has already been computed (or set)"""
+        return super().__contains__(key)
+
+    def materialize(self) -> dict:
+        """Computes every field that hasn't been yet and returns the recipe as a plain dictionary"""
+        return {key: self[key] for key in self}
@@ -10,8 +10,7 @@ from .base_converter import BaseConverter
 from ..utilities.unit_conversion import (
     convert_units_prep,
     convert_units_name,
-    convert_units_ing,
-    float_dot_zero
+    convert_units_ing
 )
 
 
@@ -25,6 +24,14 @@ class MZConverter(BaseConverter):
     recipe['preparation']: list of the steps to make the recipe
     """
 
+    # The preparation is the last thing we need and it's a single list
+    end_markers = (b'recipe-instructions-group', b'</ol>')
+    # Every image is needed to find the one of the recipe
+    parse_only = ('title', 'img', 'div.recipe-ingredients', 'div.recipe-instructions-group')
+    recipe_url_pattern = r'^https?://blog\.giallozafferano\.it/mollichedizucchero/(?!category/|tag/|page/|author/|wp-)[\w-]+/?$'
+    listing_url_pattern = r'^https?://blog\.giallozafferano\.it/mollichedizucchero/(category/[\w/-]+|page/\d+/?)$'
+    crawl_seeds = ('https://blog.giallozafferano.it/mollichedizucchero/',)
+
     def get_title(self, soup: BeautifulSoup) -> str:
         return soup.find('title').text.strip()
 
@@ -94,15 +101,9 @@ class MZConverter(BaseConverter):
                 # Checking for vulgar fractions and special words
                 if converted_unit in special_words:
                     converted_unit = special_words[converted_unit]
-                # One last check for a float_dot_zero conversion
-                if float_dot_zero(converted_quantity):
-                    # Note: this is only happening in the conversion because
-                    # the units already nice and round before the conversion
-                    converted_quantity = int(converted_quantity)
                 converted_units.append(
                     [converted_name, converted_quantity, converted_unit])
             ingredients = converted_units
-        # float_dot_zero only comes up if the ingredient quantity has been converted
         return ingredients
 
     def _get_ingredient_final(self, ing_part, item):
@@ -0,0 +1,111 @@
+import functools
+from typing import (
+    Optional,
+    Tuple
+)
+
+from bs4 import SoupStrainer, Tag
+from bs4.builder import builder_registry
+
+# The parsers the converters are tested against. They give identical recipes for every converter,
+# lxml is just a lot faster. html5lib is left out on purpose: it builds a different tree for some blogs
+SUPPORTED_PARSERS: Tuple[str, ...] = ('html.parser', 'lxml')
+
+_default_parser = 'html.parser'
+
+def available_parsers() -> Tuple[str, ...]:
+    """Returns the supported parsers that are installed (html.parser always is, lxml is optional)"""
+    return tuple(parser for parser in SUPPORTED_PARSERS if builder_registry.lookup(parser) is not None)
+
+def resolve_parser(parser: str) -> str:
+    """
+    Turns a parser setting into the name BeautifulSoup is given
+
+    Args:
+        parser (str): one of SUPPORTED_PARSERS or 'auto', which is the fastest parser that's installed
+
+    Raises:
+        ValueError: if the parser isn't supported or isn't installed
+
+    Returns:
+        str: the parser name
+    """
+    if parser == 'auto':
+        return available_parsers()[-1]
+    if parser not in SUPPORTED_PARSERS:
+        raise ValueError(f"parser must be 'auto' or one of {', '.join(SUPPORTED_PARSERS)}, not {parser}")
+    if parser not in available_parsers():
+        raise ValueError(f"parser {parser} is not installed")
+    return parser
+
+def set_default_parser(parser: str) -> None:
+    """Sets the parser used by every converter that doesn't set its own, 'auto' picks lxml if it's installed"""
+    global _default_parser
+    _default_parser = resolve_parser(parser)
+
+def get_default_parser() -> str:
+    return _default_parser
+
+class SelectorStrainer(SoupStrainer):
+    """
+    A SoupStrainer that keeps only the elements matching simple selectors (and everything inside them)
+    A selector is a tag name optionally followed by a class or an id, e.g. 'title', 'dd.gz-ingredient' or 'img#top-img'
+
+    Only the elements a converter reads are built into the tree, everything else on the page is skipped while parsing
+    """
+
+    def __init__(self, selectors: Tuple[str, ...]):
+        self.selectors = tuple(self._parse_selector(selector) for selector in selectors)
+        # Before bs4 4.13, a function passed as the name is called with the name and the attributes of every tag
+        super().__init__(self.match_tag)
+
+    @staticmethod
+    def _parse_selector(selector: str) -> Tuple[str, Optional[str], Optional[str]]:
+        if '.' in selector:
+            name, css_class = selector.split('.', 1)
+            return name, css_class, None
+        if '#' in selector:
+            name, id_ = selector.split('#', 1)
+            return name, None, id_
+        return selector, None, None
+
+    def match_tag(self, name, attrs=None) -> bool:
+        if isinstance(name, Tag):
+            name, attrs = name.name, name.attrs
+        attrs = attrs or {}
+        for selector_name, css_class, id_ in self.selectors:
+            if name != selector_name:
+                continue
+            if css_class is not None:
+                # Depending on the parser and the bs4 version, class is either the raw string or already split
+                classes = attrs.get('class') or ()
+                if isinstance(classes, str):
+                    classes = classes.split()
+                if css_class not in classes:
+                    continue
+            if id_ is not None and attrs.get('id') != id_:
+                continue
+            return True
+        return False
+
+    # Since bs4 4.13, these are asked instead before a tag or a string outside of the kept elements is created
+    def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+        return self.match_tag(name, attrs)
+
+    def allow_string_creation(self, string) -> bool:
+        return False
+
+@functools.lru_cache(maxsize=None)
+def make_strainer(selectors: Tuple[str, ...]) -> Optional[SelectorStrainer]:
+    """
+    Builds the strainer for a converter's parse_only once, it holds no state so it's shared between soups and threads
+
+    Args:
+        selectors (Tuple[str, ...]): the selectors of the elements to keep
+
+    Returns:
+        Optional[SelectorStrainer]: the strainer, or None (the whole page) if there are no selectors
+    """
+    if not selectors:
+        return None
+    return SelectorStrainer(tuple(selectors))
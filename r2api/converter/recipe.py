@@ -0,0 +1,152 @@
+import sys
+from typing import (
+    Iterable,
+    List,
+    Union
+)
+
+from ..utilities.quantity import Quantity, parse_quantity
+
+# The fields of every recipe, in order
+RECIPE_FIELDS = ('name', 'image', 'ingredients', 'preparation')
+
+def _shared(value):
+    # The same names, units and quantities come up in recipe after recipe ('Farina 00', 'g', 'q.b.'), but each page
+    # (or line of JSON) makes its own copy of them. Interned, every ingredient with the same one points to a single string
+    # A bs4 NavigableString is made a plain string first, otherwise it would keep its whole soup alive
+    if isinstance(value, str):
+        return sys.intern(str(value))
+    return value
+
+class Ingredient(list):
+    """
+    One ingredient of a recipe: its name, quantity and unit
+    It's the [name, quantity, unit] list it always was (so json.dumps, ==, indexing and unpacking work as before),
+    with the items as attributes too: ingredient.name, ingredient.quantity, ingredient.unit
+    The strings in it are interned, so millions of ingredients only hold one copy of each name, unit and quantity
+
+    Parameters:
+        name: string -- the name of the ingredient
+        quantity: float, int or string -- how much of it, a string if it isn't a number (i.e. '1/2' or 'q.b.')
+        unit: string -- the unit of the quantity, 'n/a' if there is none
+    """
+
+    __slots__ = ()
+
+    def __init__(self, name: str = '', quantity: Union[float, int, str] = '', unit: str = ''):
+        super().__init__((_shared(name), _shared(quantity), _shared(unit)))
+
+    def __setitem__(self, index, value) -> None:
+        super().__setitem__(index, _shared(value) if isinstance(index, int) else value)
+
+    name = property(lambda self: self[0], lambda self, value: self.__setitem__(0, value))
+    quantity = property(lambda self: self[1], lambda self, value: self.__setitem__(1, value))
+    unit = property(lambda self: self[2], lambda self, value: self.__setitem__(2, value))
+
+    def __eq__(self, other) -> bool:
+        # == to the tuple with the same items too, so (name, quantity, unit) can be compared to it
+        if isinstance(other, tuple):
+            return list.__eq__(self, list(other))
+        return list.__eq__(self, other)
+
+    def __ne__(self, other) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Ingredient({', '.join(repr(item) for item in self)})"
+
+    @property
+    def parsed_quantity(self) -> Quantity:
+        """The quantity parsed by parse_quantity (the quantity itself stays as it's written in JSON)"""
+        return parse_quantity(self.quantity)
+
+    def to_list(self) -> list:
+        """The ingredient as a plain [name, quantity, unit] list"""
+        return list(self)
+
+def to_ingredients(ingredients: Iterable) -> List[Ingredient]:
+    """Every [name, quantity, unit] list (or tuple) as an Ingredient, the ones that already are stay as they are"""
+    return [ingredient if isinstance(ingredient, Ingredient) else Ingredient(*ingredient) for ingredient in ingredients]
+
+def _field(key: str) -> property:
+    return property(lambda self: self[key], lambda self, value: self.__setitem__(key, value))
+
+class Recipe(dict):
+    """
+    A parsed recipe. It's the dictionary it always was (so json.dumps, ==, isinstance(recipe, dict) and any other keys,
+    i.e. recipe['source'] = url, work as before), with the four fields as attributes too (recipe.name)
+    The ingredients are always Ingredients: [name, quantity, unit] lists that are set are made into Ingredients
+
+    Parameters:
+        name: string -- the name of the recipe
+        image: string -- the url of its image
+        ingredients: list -- its Ingredients, [name, quantity, unit] lists are made into Ingredients
+        preparation: list of strings -- the steps of the recipe
+        **extra -- any other keys of the recipe
+    """
+
+    __slots__ = ()
+
+    def __init__(self, name: str = '', image: str = '', ingredients: Iterable = (), preparation: Iterable[str] = (), **extra):
+        super().__init__(name=name, image=image, ingredients=to_ingredients(ingredients), preparation=list(preparation), **extra)
+
+    name = _field('name')
+    image = _field('image')
+    ingredients = _field('ingredients')
+    preparation = _field('preparation')
+
+    @classmethod
+    def from_dict(cls, data) -> 'Recipe':
+        """The recipe from a dictionary (or any mapping), i.e. from JSON. Missing fields are empty, any other keys are kept"""
+        if isinstance(data, cls):
+            return data
+        return cls(**data)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key == 'ingredients':
+            value = to_ingredients(value)
+        super().__setitem__(key, value)
+
+    def update(self, *args, **kwargs) -> None:
+        # dict.update doesn't go through __setitem__
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key: str, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def copy(self) -> 'Recipe':
+        """A shallow copy, as dict.copy would make, except that the lists are new too: the Ingredients in them are the same"""
+        return Recipe(**self)
+
+    def to_dict(self) -> dict:
+        """The recipe as a plain dictionary, with the ingredients as plain [name, quantity, unit] lists"""
+        plain = dict(self)
+        plain['ingredients'] = [list(ingredient) for ingredient in self.get('ingredients') or []]
+        plain['preparation'] = list(self.get('preparation') or [])
+        return plain
+
+def to_json(value):
+    """
+    The default for json.dumps (or orjson.dumps, msgpack.packb) to serialize Recipes and Ingredients: json.dumps(recipe, default=to_json)
+    They're a dict and lists, so they serialize without it. It's kept for the code that already passes it
+
+    Args:
+        value: the object that couldn't be serialized
+
+    Raises:
+        TypeError: if it isn't a Recipe or an Ingredient, as json.dumps would have
+
+    Returns:
+        the recipe as a dictionary or the ingredient as a list
+    """
+    if isinstance(value, Recipe):
+        return value.to_dict()
+    if isinstance(value, Ingredient):
+        return value.to_list()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,171 @@
+import contextlib
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import (
+    Optional,
+    Type
+)
+
+from ..version import __version__
+from .recipe import to_json
+
+_PACKAGE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@functools.lru_cache(maxsize=None)
+def converter_fingerprint(converter: type) -> str:
+    """
+    A hash of the r2api version, the source of the r2api package and the source of the converter's module
+    Recipes cached with an older version of the converter (or of the unit conversion, etc.) will therefore not be used
+    even if the version number wasn't changed. It is computed only once per converter class.
+    """
+    digest = hashlib.sha1(__version__.encode())
+    paths = []
+    for root, directories, files in os.walk(_PACKAGE_DIRECTORY):
+        directories.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith('.py'))
+    # Converters made outside of r2api must be hashed too
+    try:
+        converter_path = os.path.abspath(inspect.getfile(converter))
+        if converter_path not in paths:
+            paths.append(converter_path)
+    except TypeError:
+        pass
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+class RecipeCache:
+    """
+    A persistent cache of parsed recipes stored in a sqlite database
+    A recipe is found again only if it was made from the same url by the same converter class, with the same convert_units
+    and with the same r2api version and source (see converter_fingerprint), so a cached recipe is always the one the converter would produce
+
+    Parameters:
+        path: string -- the path of the sqlite database, it will be created if it doesn't exist
+        ttl: float = None -- how many seconds a recipe is kept, forever if None
+        max_entries: int = 100000 -- once there are more recipes than this, the least recently used ones are evicted
+
+    It can be shared between threads.
+    """
+
+    # As with the ResponseCache, accesses are numbered instead of timestamped
+    _NEXT_ACCESS = "(SELECT COALESCE(MAX(last_access), 0) + 1 FROM recipes)"
+
+    def __init__(self, path: str, *, ttl: Optional[float] = None, max_entries: int = 100000):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS recipes (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                recipe TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_access INTEGER NOT NULL
+            )
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS recipes_last_access ON recipes (last_access)")
+        # Counting the rows on every put would scan the whole table, so the count is kept in a row of its own, up to date
+        # with triggers. It's in the database rather than in this object, since other RecipeCaches (or processes) may share it
+        with self._transaction():
+            self._connection.execute("CREATE TABLE IF NOT EXISTS recipe_count (count INTEGER NOT NULL)")
+            if self._connection.execute("SELECT 1 FROM recipe_count").fetchone() is None:
+                self._connection.execute("INSERT INTO recipe_count SELECT COUNT(*) FROM recipes")
+            self._connection.execute("""
+                CREATE TRIGGER IF NOT EXISTS recipes_inserted AFTER INSERT ON recipes
+                BEGIN UPDATE recipe_count SET count = count + 1; END
+            """)
+            self._connection.execute("""
+                CREATE TRIGGER IF NOT EXISTS recipes_deleted AFTER DELETE ON recipes
+                BEGIN UPDATE recipe_count SET count = count - 1; END
+            """)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock right away, so another connection can't write in between the reads and the writes
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def _stored(self) -> int:
+        return self._connection.execute("SELECT count FROM recipe_count").fetchone()[0]
+
+    @staticmethod
+    def key(url: str, converter: Type, convert_units: bool) -> str:
+        """The key a recipe is stored under"""
+        parts = [url, f"{converter.__module__}.{converter.__qualname__}", bool(convert_units), converter_fingerprint(converter)]
+        return hashlib.sha1(json.dumps(parts).encode()).hexdigest()
+
+    def get(self, url: str, converter: Type, convert_units: bool = True) -> Optional[dict]:
+        """Returns the cached recipe or None if it isn't cached (or has expired)"""
+        key = self.key(url, converter, convert_units)
+        with self._lock:
+            row = self._connection.execute("SELECT recipe, created FROM recipes WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl is not None and time.time() - row[1] > self.ttl:
+                self._connection.execute("DELETE FROM recipes WHERE key = ?", (key,))
+                return None
+            self._connection.execute(f"UPDATE recipes SET last_access = {self._NEXT_ACCESS} WHERE key = ?", (key,))
+        return json.loads(row[0])
+
+    def put(self, url: str, converter: Type, convert_units: bool, recipe: dict) -> None:
+        """Stores the recipe and evicts the least recently used ones if there are more than max_entries"""
+        key = self.key(url, converter, convert_units)
+        serialized = json.dumps(recipe, default=to_json)
+        with self._lock, self._transaction():
+            # Not INSERT OR REPLACE: the row it replaces is deleted without the delete trigger
+            updated = self._connection.execute(
+                f"UPDATE recipes SET url = ?, recipe = ?, created = ?, last_access = {self._NEXT_ACCESS} WHERE key = ?",
+                (url, serialized, time.time(), key)
+            ).rowcount
+            if not updated:
+                self._connection.execute(
+                    f"INSERT INTO recipes VALUES (?, ?, ?, ?, {self._NEXT_ACCESS})",
+                    (key, url, serialized, time.time())
+                )
+            overflow = self._stored() - self.max_entries
+            if overflow > 0:
+                self._connection.execute(
+                    "DELETE FROM recipes WHERE key IN (SELECT key FROM recipes ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+
+    def purge_expired(self) -> int:
+        """Deletes every expired recipe and returns how many there were"""
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            return self._connection.execute("DELETE FROM recipes WHERE created < ?", (time.time() - self.ttl,)).rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM recipes")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._stored()
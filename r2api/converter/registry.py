@@ -0,0 +1,115 @@
+import importlib
+import threading
+from typing import (
+    Dict,
+    List,
+    Tuple,
+    Type,
+    Union
+)
+from urllib.parse import urlsplit
+
+from .base_converter import BaseConverter
+
+# A converter is registered either as the class itself or as 'module:Class'
+# The latter is only imported the first time a url of its site is converted
+ConverterTarget = Union[str, Type[BaseConverter]]
+
+# host -> [(path prefix, converter)], longest prefix first
+# The prefix is '' if the whole host is one site, Giallo Zafferano's blogs are all on the same host
+_registry: Dict[str, List[Tuple[str, ConverterTarget]]] = {}
+_lock = threading.Lock()
+
+def _normalize_host(host: str) -> str:
+    host = host.lower().rstrip('.')
+    return host[4:] if host.startswith('www.') else host
+
+def _normalize_prefix(path_prefix: str) -> str:
+    path_prefix = path_prefix.strip('/')
+    return f"/{path_prefix}" if path_prefix else ''
+
+def register_converter(host: str, converter: ConverterTarget, path_prefix: str = '') -> None:
+    """
+    Registers the converter for the urls of a site, so r2api.convert can pick it. Registering the same host and prefix again replaces it
+
+    Args:
+        host (str): the host of the site, with or without www., e.g. 'ricette.giallozafferano.it'
+        converter (ConverterTarget): the converter class or 'module:Class', which is only imported when it's first needed
+        path_prefix (str): only urls whose path starts with this (a whole path segment, e.g. '/mollichedizucchero') use the converter
+    """
+    if isinstance(converter, str) and ':' not in converter:
+        raise ValueError(f"converter must be a class or 'module:Class', not {converter}")
+    host = _normalize_host(host)
+    path_prefix = _normalize_prefix(path_prefix)
+    with _lock:
+        entries = [entry for entry in _registry.get(host, []) if entry[0] != path_prefix]
+        entries.append((path_prefix, converter))
+        entries.sort(key=lambda entry: len(entry[0]), reverse=True)
+        _registry[host] = entries
+
+def unregister_converter(host: str, path_prefix: str = '') -> None:
+    """Removes the converter registered for the host and prefix, if there is one"""
+    host = _normalize_host(host)
+    path_prefix = _normalize_prefix(path_prefix)
+    with _lock:
+        entries = [entry for entry in _registry.get(host, []) if entry[0] != path_prefix]
+        if entries:
+            _registry[host] = entries
+        else:
+            _registry.pop(host, None)
+
+def _resolve(host: str, path_prefix: str, converter: ConverterTarget) -> Type[BaseConverter]:
+    if not isinstance(converter, str):
+        return converter
+    module_name, class_name = converter.split(':', 1)
+    resolved = getattr(importlib.import_module(module_name), class_name)
+    if not (isinstance(resolved, type) and issubclass(resolved, BaseConverter)):
+        raise TypeError(f"{converter} is not a subclass of BaseConverter")
+    # The import is only done once, afterwards the class itself is in the table
+    with _lock:
+        _registry[host] = [(prefix, resolved if (prefix == path_prefix and target is converter) else target)
+            for prefix, target in _registry.get(host, [])]
+    return resolved
+
+def converter_for(url: str) -> Type[BaseConverter]:
+    """
+    Finds the converter for the url's site
+
+    Args:
+        url (str): the recipe url
+
+    Raises:
+        ValueError: if no converter is registered for the url
+
+    Returns:
+        Type[BaseConverter]: the converter class
+    """
+    parts = urlsplit(url)
+    host = _normalize_host(parts.hostname or '')
+    path = parts.path
+    for path_prefix, converter in _registry.get(host, ()):
+        if not path_prefix or path == path_prefix or path.startswith(path_prefix + '/'):
+            return _resolve(host, path_prefix, converter)
+    raise ValueError(f"There is no converter for {url}")
+
+def convert(url: str, **converter_options) -> BaseConverter:
+    """
+    Converts the recipe at the url with the converter registered for its site: r2api.convert(url) instead of r2api.GZConverter(url)
+
+    Args:
+        url (str): the recipe url
+        **converter_options: any keyword arguments are passed on to the converter, i.e. convert_units
+
+    Raises:
+        ValueError: if no converter is registered for the url
+
+    Returns:
+        BaseConverter: the converter instance
+    """
+    return converter_for(url)(url, **converter_options)
+
+register_converter('ricette.giallozafferano.it', 'r2api.converter.giallo_zafferano:GZConverter')
+register_converter('fattoincasadabenedetta.it', 'r2api.converter.fatto_in_casa:FCConverter')
+register_converter('blog.giallozafferano.it', 'r2api.converter.molliche_di_zucchero:MZConverter', '/mollichedizucchero')
+register_converter('blog.giallozafferano.it', 'r2api.converter.allacciate_il_grembiule:AGConverter', '/allacciateilgrembiule')
+register_converter('blog.giallozafferano.it', 'r2api.converter.ricette_di_max:RMConverter', '/primipiattiricette')
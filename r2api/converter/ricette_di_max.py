@@ -11,8 +11,7 @@ from .base_converter import BaseConverter
 from ..utilities.unit_conversion import (
     convert_units_prep,
     convert_units_name,
-    convert_units_ing,
-    float_dot_zero
+    convert_units_ing
 )
 
 
@@ -26,6 +25,15 @@ class RMConverter(BaseConverter):
     recipe['preparation']: list of the steps to make the recipe
     """
 
+    # The preparation only ends after the second ad (see get_preparation), which has no reliable marker,
+    # so the whole page is always read even with stream=True
+    end_markers = ()
+    # The preparation is found by walking the page from the ingredients onwards, so the whole page is parsed
+    parse_only = ()
+    recipe_url_pattern = r'^https?://blog\.giallozafferano\.it/primipiattiricette/(?!category/|tag/|page/|author/|wp-)[\w-]+/?$'
+    listing_url_pattern = r'^https?://blog\.giallozafferano\.it/primipiattiricette/(category/[\w/-]+|page/\d+/?)$'
+    crawl_seeds = ('https://blog.giallozafferano.it/primipiattiricette/',)
+
     def get_title(self, soup: BeautifulSoup) -> str:
         return soup.find('title').text
 
@@ -166,11 +174,7 @@ class RMConverter(BaseConverter):
         #   how the conversion must be done
         _name = convert_units_name(name)
         _quantity, _unit = convert_units_ing(quantity, unit)
-        if float_dot_zero(_quantity):
-            # This is the best and only spot to knock off the .0
-            # since it will be created by the conversion util functions
-            _quantity = int(_quantity)
-        return [_name, _quantity, _unit] 
+        return [_name, _quantity, _unit]
 
     def get_preparation(self, soup, convert_units=True) -> List[str]:
         """
@@ -0,0 +1,57 @@
+import hashlib
+import math
+
+class BloomFilter:
+    """
+    A set of strings that takes a fixed amount of memory however many are added, at the cost of a few false positives:
+    a string that was never added is sometimes (with the error_rate probability, once capacity strings have been added)
+    reported as being in it. Something that was added is always reported as being in it
+
+    Parameters:
+        capacity: int = 1000000 -- how many strings are expected to be added
+        error_rate: float = 0.001 -- the probability of a false positive once capacity strings have been added
+    """
+
+    def __init__(self, capacity: int = 1000000, error_rate: float = 0.001):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # The optimal number of bits and of hashes for the capacity and error rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    def _positions(self, item: str):
+        # Every position is made from two hashes (Kirsch-Mitzenmacher) rather than hashing the item hash_count times
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> bool:
+        """Adds the string, returns True if it wasn't already in the filter"""
+        new = False
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self._count += 1
+        return new
+
+    def __contains__(self, item: str) -> bool:
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        """How many strings have been added (those mistaken for ones already added aren't counted)"""
+        return self._count
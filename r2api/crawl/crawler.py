@@ -0,0 +1,224 @@
+import collections
+import gzip
+import queue
+import re
+import threading
+import xml.etree.ElementTree as ElementTree
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    Type
+)
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+
+from ..batch.batch_conversion import BatchResult, convert_many
+from ..converter.base_converter import BaseConverter
+from ..converter.parsers import get_default_parser, make_strainer
+from ..converter.registry import converter_for
+from ..fetch.scheduler import HostScheduler
+from ..fetch.session import DEFAULT_HEADERS, fetch
+from .bloom import BloomFilter
+
+def default_converters() -> List[Type[BaseConverter]]:
+    """The converters of the sites r2api supports"""
+    urls = (
+        "https://ricette.giallozafferano.it/",
+        "https://www.fattoincasadabenedetta.it/",
+        "https://blog.giallozafferano.it/mollichedizucchero/",
+        "https://blog.giallozafferano.it/allacciateilgrembiule/",
+        "https://blog.giallozafferano.it/primipiattiricette/",
+    )
+    return [converter_for(url) for url in urls]
+
+class _Site:
+    """A converter's url patterns, compiled once per crawl"""
+    def __init__(self, converter: Type[BaseConverter]):
+        self.converter = converter
+        self.recipe: Optional[Pattern] = re.compile(converter.recipe_url_pattern) if converter.recipe_url_pattern else None
+        self.listing: Optional[Pattern] = re.compile(converter.listing_url_pattern) if converter.listing_url_pattern else None
+
+def _robots_url(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/robots.txt"
+
+def crawl(seeds: Optional[Iterable[str]] = None, *, converters: Optional[Sequence[Type[BaseConverter]]] = None, follow_listings: bool = True, use_sitemaps: bool = True, max_pages: Optional[int] = None, session: Optional[requests.Session] = None, seen: Optional[BloomFilter] = None, scheduler: Optional[HostScheduler] = None) -> Iterator[str]:
+    """
+    Finds the urls of recipes by walking sitemaps and the pages listing recipes (i.e. categories), yielding each as soon as it's found
+    A link is a recipe if it matches a converter's recipe_url_pattern and a listing to walk if it matches its listing_url_pattern
+
+    Args:
+        seeds (Optional[Iterable[str]]): the pages to start from (listings or sitemaps), every converter's crawl_seeds if None
+        converters (Optional[Sequence[Type[BaseConverter]]]): the converters whose recipes are looked for, the ones of the supported sites if None
+        follow_listings (bool): if the listings linked from the pages are walked too, otherwise only the seeds and sitemaps are
+        use_sitemaps (bool): if the sitemaps in the robots.txt of each seed's site are walked
+        max_pages (Optional[int]): the most listing and sitemap pages fetched, no limit if None
+        session (Optional[requests.Session]): the session used to fetch the pages, the shared session if None
+        seen (Optional[BloomFilter]): the recipe urls already yielded, which aren't yielded again. Pass the same filter to crawl again
+            without repeats: the listings and sitemaps are still walked, so the recipes added to them since are found
+        scheduler (Optional[HostScheduler]): if given, the listings and sitemaps are fetched within its rate limits
+
+    Returns:
+        Iterator[str]: the recipe urls, each once
+    """
+    sites = [_Site(converter) for converter in (converters if converters is not None else default_converters())]
+    if seeds is None:
+        seeds = [seed for site in sites for seed in site.converter.crawl_seeds]
+    if seen is None:
+        seen = BloomFilter()
+
+    # The pages are only tracked for this crawl, they have to be walked again by the next one to find the new recipes on them
+    pages = collections.deque()
+    visited = set()
+    def visit(url: str) -> None:
+        if url not in visited:
+            visited.add(url)
+            pages.append(url)
+
+    for seed in seeds:
+        seed = urldefrag(seed)[0]
+        if use_sitemaps:
+            visit(_robots_url(seed))
+        visit(seed)
+
+    fetched = 0
+    while pages and (max_pages is None or fetched < max_pages):
+        page = pages.popleft()
+        fetched += 1
+        # A listing that can't be fetched shouldn't stop the whole crawl, the recipes are probably linked from another one too
+        try:
+            content = fetch(page, session=session, headers=DEFAULT_HEADERS, scheduler=scheduler)
+        except Exception:
+            continue
+
+        if page.endswith('/robots.txt'):
+            for sitemap in _robots_sitemaps(content):
+                visit(sitemap)
+            continue
+
+        sitemap = _parse_sitemap(content)
+        if sitemap is not None:
+            is_index, links = sitemap
+        else:
+            is_index, links = False, _page_links(page, content)
+
+        for link in links:
+            if is_index:
+                visit(link)
+                continue
+            site_kind = _classify(sites, link)
+            if site_kind == 'recipe':
+                if seen.add(link):
+                    yield link
+            elif site_kind == 'listing' and follow_listings:
+                visit(link)
+
+def _classify(sites: List[_Site], url: str) -> Optional[str]:
+    for site in sites:
+        if site.recipe is not None and site.recipe.match(url):
+            return 'recipe'
+    for site in sites:
+        if site.listing is not None and site.listing.match(url):
+            return 'listing'
+    return None
+
+def _robots_sitemaps(content: bytes) -> List[str]:
+    sitemaps = []
+    for line in content.decode('utf-8', 'replace').splitlines():
+        key, _, value = line.partition(':')
+        if key.strip().lower() == 'sitemap' and value.strip():
+            sitemaps.append(value.strip())
+    return sitemaps
+
+def _parse_sitemap(content: bytes) -> Optional[Tuple[bool, List[str]]]:
+    """Returns if it's a sitemap index and the locs in it, None if it's not a sitemap"""
+    # Sitemaps are often served gzipped as .xml.gz
+    if content[:2] == b'\x1f\x8b':
+        try:
+            content = gzip.decompress(content)
+        except OSError:
+            return None
+    if content.lstrip()[:5] not in (b'<?xml', b'<urls', b'<site'):
+        return None
+    try:
+        root = ElementTree.fromstring(content)
+    except ElementTree.ParseError:
+        return None
+    tag = root.tag.rsplit('}', 1)[-1]
+    if tag not in ('urlset', 'sitemapindex'):
+        return None
+    locs = [urldefrag(element.text.strip())[0] for element in root.iter() if element.tag.rsplit('}', 1)[-1] == 'loc' and element.text]
+    return tag == 'sitemapindex', locs
+
+def _page_links(page: str, content: bytes) -> List[str]:
+    if not content.strip():
+        return []
+    soup = BeautifulSoup(content, get_default_parser(), parse_only=make_strainer(('a',)))
+    links = []
+    for a in soup.find_all('a', href=True):
+        link = urldefrag(urljoin(page, a['href'].strip()))[0]
+        if link.startswith(('http://', 'https://')):
+            links.append(link)
+    return links
+
+def crawl_and_convert(seeds: Optional[Iterable[str]] = None, *, queue_size: int = 1000, max_workers: int = 8, convert_units: bool = True, converters: Optional[Sequence[Type[BaseConverter]]] = None, follow_listings: bool = True, use_sitemaps: bool = True, max_pages: Optional[int] = None, seen: Optional[BloomFilter] = None, session: Optional[requests.Session] = None, **converter_options) -> Iterator[BatchResult]:
+    """
+    Crawls for recipes and converts them at the same time: the crawl runs in its own thread and feeds the urls it finds
+    to convert_many through a queue. The queue is bounded, so if the conversion falls behind the crawl waits for it
+
+    Args:
+        seeds, converters, follow_listings, use_sitemaps, max_pages, seen: see crawl
+        queue_size (int): how many urls can be waiting to be converted
+        max_workers (int): how many recipes are fetched/parsed at the same time
+        convert_units (bool): if the units should be converted from metric to imperial
+        session (Optional[requests.Session]): the session used for the crawl and the conversions, the shared session if None
+        **converter_options: any other keyword arguments are passed on to the converters, a scheduler is used by the crawl too
+
+    Raises:
+        ValueError: if queue_size or max_workers is less than 1
+
+    Returns:
+        Iterator[BatchResult]: one result per recipe url, each recipe's converter is found with r2api.converter.registry
+    """
+    if queue_size < 1:
+        raise ValueError("queue_size must be at least 1")
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+
+    urls = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # The timeout is so the crawl notices when the results stop being consumed
+        while not stop.is_set():
+            try:
+                urls.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def discover() -> None:
+        try:
+            for url in crawl(seeds, converters=converters, follow_listings=follow_listings, use_sitemaps=use_sitemaps,
+                    max_pages=max_pages, session=session, seen=seen, scheduler=converter_options.get('scheduler')):
+                if not put(url):
+                    return
+        finally:
+            put(None)
+
+    thread = threading.Thread(target=discover, daemon=True)
+    thread.start()
+    try:
+        if session is not None:
+            converter_options['session'] = session
+        yield from convert_many(urls, None, max_workers=max_workers, convert_units=convert_units, **converter_options)
+    finally:
+        stop.set()
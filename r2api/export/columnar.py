@@ -0,0 +1,203 @@
+from array import array
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Union
+)
+
+from ..batch.batch_conversion import BatchResult
+from ..utilities.quantity import TO_TASTE, Quantity, parse_quantity
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy module not found, install it (pip install numpy) to export to NumPy arrays")
+    return numpy
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("pyarrow module not found, install it (pip install pyarrow) to export to Arrow or Parquet")
+    return pyarrow
+
+def numeric_quantity(quantity: Union[int, float, str, None]) -> float:
+    """
+    The quantity of an ingredient as a number
+
+    Args:
+        quantity (Union[int, float, str, None]): the quantity as the converters write it, i.e. 300, 10.56, '1/2', '1,5' or 'q.b.'
+
+    Returns:
+        float: the number, NaN if it isn't one (i.e. 'to taste', 'n/a' or '5 o 6')
+    """
+    return parse_quantity(quantity).number
+
+def is_to_taste(quantity: Union[int, float, str, Quantity, None], unit: Optional[str]) -> bool:
+    """If the ingredient has no amount, but is added to taste (q.b.): its quantity or its unit parses as TO_TASTE"""
+    return parse_quantity(quantity).kind == TO_TASTE or parse_quantity(unit).kind == TO_TASTE
+
+class IngredientTable:
+    """
+    The ingredients of many recipes flattened into columns, one row per ingredient:
+        recipe_id: the row of its recipe in recipe_urls and recipe_names
+        name: the name of the ingredient
+        quantity: the quantity as a float, NaN if it isn't a number (see numeric_quantity)
+        unit: the unit, stored as a code into units, since there are only a few different ones
+        to_taste: if it's added to taste rather than measured
+    The numeric columns are typed arrays from the array module, so even without NumPy a million recipes take a fraction
+    of the memory of their lists, and to_numpy/to_arrow make them into NumPy arrays or an Arrow table without copying them one by one
+
+    Parameters:
+        results: iterable = None -- BatchResults (i.e. from convert_many) or (url, recipe) pairs (i.e. from read_ndjson) to add
+    """
+
+    def __init__(self, results: Optional[Iterable] = None):
+        self.recipe_urls: List[Optional[str]] = []
+        self.recipe_names: List[str] = []
+        self.recipe_id = array('q')
+        self.name: List[str] = []
+        self.quantity = array('d')
+        self.unit_code = array('i')
+        self.units: List[str] = []
+        self.to_taste = array('b')
+        self._unit_codes: Dict[str, int] = {}
+        if results is not None:
+            self.extend(results)
+
+    def add(self, recipe, url: Optional[str] = None) -> int:
+        """
+        Adds the ingredients of a recipe
+
+        Args:
+            recipe: the recipe, a Recipe or a dictionary
+            url (Optional[str]): the url of the recipe
+
+        Returns:
+            int: the recipe_id of the recipe
+        """
+        recipe_id = len(self.recipe_urls)
+        self.recipe_urls.append(url)
+        self.recipe_names.append(recipe['name'])
+        for name, quantity, unit in recipe['ingredients']:
+            self.recipe_id.append(recipe_id)
+            self.name.append(name)
+            # Parsed once for both the number and if it's to taste
+            parsed = parse_quantity(quantity)
+            self.quantity.append(parsed.number)
+            code = self._unit_codes.get(unit)
+            if code is None:
+                code = self._unit_codes[unit] = len(self.units)
+                self.units.append(unit)
+            self.unit_code.append(code)
+            self.to_taste.append(is_to_taste(parsed, unit))
+        return recipe_id
+
+    def extend(self, results: Iterable) -> 'IngredientTable':
+        """Adds the recipes of BatchResults (the ones with an error are skipped) or (url, recipe) pairs"""
+        for result in results:
+            if isinstance(result, BatchResult):
+                if result.ok:
+                    self.add(result.recipe, result.url)
+            else:
+                url, recipe = result
+                self.add(recipe, url)
+        return self
+
+    def __len__(self) -> int:
+        return len(self.recipe_id)
+
+    @property
+    def unit(self) -> List[str]:
+        """The unit of every row"""
+        units = self.units
+        return [units[code] for code in self.unit_code]
+
+    def to_columns(self) -> Dict[str, Union[array, list]]:
+        """The columns without NumPy or Arrow: the arrays as they are and the strings as lists"""
+        return {
+            'recipe_id': self.recipe_id,
+            'name': self.name,
+            'quantity': self.quantity,
+            'unit': self.unit,
+            'to_taste': self.to_taste,
+        }
+
+    def to_numpy(self) -> dict:
+        """
+        The columns as NumPy arrays. The numeric ones are copied straight from the table's arrays' memory
+        (they're copies, so the table can still be added to afterwards)
+
+        Raises:
+            ImportError: if numpy isn't installed
+
+        Returns:
+            dict: recipe_id (int64), name (str), quantity (float64), unit (str), unit_code (int32, into units) and to_taste (bool)
+        """
+        numpy = _numpy()
+
+        def column(values: array, dtype):
+            # frombuffer doesn't accept an empty buffer in older versions of NumPy
+            if not values:
+                return numpy.zeros(0, dtype=dtype)
+            return numpy.frombuffer(values, dtype=dtype).copy()
+
+        unit_code = column(self.unit_code, numpy.int32)
+        return {
+            'recipe_id': column(self.recipe_id, numpy.int64),
+            'name': numpy.array(self.name, dtype=str),
+            'quantity': column(self.quantity, numpy.float64),
+            'unit': numpy.array(self.units, dtype=str)[unit_code],
+            'unit_code': unit_code,
+            'to_taste': column(self.to_taste, numpy.int8).astype(bool),
+        }
+
+    def to_arrow(self):
+        """
+        The ingredients as an Arrow table, with the unit as a dictionary column
+
+        Raises:
+            ImportError: if pyarrow isn't installed
+
+        Returns:
+            pyarrow.Table: with the columns recipe_id, name, quantity, unit and to_taste
+        """
+        pyarrow = _pyarrow()
+
+        def column(values: array, type):
+            # The array's memory is copied as it is (tobytes), rather than every value being converted on its own
+            return pyarrow.Array.from_buffers(type, len(values), [None, pyarrow.py_buffer(values.tobytes())])
+
+        return pyarrow.table({
+            'recipe_id': column(self.recipe_id, pyarrow.int64()),
+            'name': pyarrow.array(self.name, type=pyarrow.string()),
+            # NaN is kept as NaN rather than made null, the same as in NumPy
+            'quantity': column(self.quantity, pyarrow.float64()),
+            'unit': pyarrow.DictionaryArray.from_arrays(column(self.unit_code, pyarrow.int32()), pyarrow.array(self.units, type=pyarrow.string())),
+            'to_taste': column(self.to_taste, pyarrow.int8()).cast(pyarrow.bool_()),
+        })
+
+    def recipes_to_arrow(self):
+        """The recipes as an Arrow table of recipe_id, url and name, to join with to_arrow's"""
+        pyarrow = _pyarrow()
+        return pyarrow.table({
+            'recipe_id': pyarrow.array(range(len(self.recipe_urls)), type=pyarrow.int64()),
+            'url': pyarrow.array(self.recipe_urls, type=pyarrow.string()),
+            'name': pyarrow.array(self.recipe_names, type=pyarrow.string()),
+        })
+
+    def write_parquet(self, path: str, recipes_path: Optional[str] = None) -> None:
+        """
+        Writes the ingredients (and the recipes, if recipes_path is given) to Parquet files
+
+        Raises:
+            ImportError: if pyarrow isn't installed
+        """
+        _pyarrow()
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(self.to_arrow(), path)
+        if recipes_path is not None:
+            pyarrow.parquet.write_table(self.recipes_to_arrow(), recipes_path)
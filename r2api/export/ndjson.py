@@ -0,0 +1,224 @@
+import gzip
+import os
+import zlib
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type
+)
+
+from ..batch.batch_conversion import BatchResult, convert_many
+from ..converter.base_converter import BaseConverter
+from ..converter.lazy_recipe import LazyRecipe
+from .serializers import dumps, loads
+
+_READ_SIZE = 64 * 1024
+
+def _compression_of(path: str, compression: Optional[str]) -> Optional[str]:
+    if compression is None and path.endswith('.gz'):
+        return 'gzip'
+    if compression not in (None, 'gzip'):
+        raise ValueError(f"compression must be None or gzip, not {compression}")
+    return compression
+
+def _scan_plain(f, add: Callable[[bytes], None]) -> int:
+    """Passes each whole line to add as it's read and returns the end of the last one"""
+    good = 0
+    for line in f:
+        if not line.endswith(b'\n'):
+            break
+        add(line)
+        good += len(line)
+    return good
+
+def _scan_gzip(f, add: Callable[[bytes], None]) -> int:
+    """
+    Passes each line of the whole gzip members to add as it's read (every batch is its own member)
+    and returns the end of the last whole member. Only one member is held in memory at a time
+    """
+    good, position = 0, 0
+    decompressor = zlib.decompressobj(wbits=31)
+    member = []
+    try:
+        for chunk in iter(lambda: f.read(_READ_SIZE), b''):
+            data = chunk
+            while data:
+                member.append(decompressor.decompress(data))
+                if not decompressor.eof:
+                    position += len(data)
+                    break
+                position += len(data) - len(decompressor.unused_data)
+                data = decompressor.unused_data
+                good = position
+                for line in b''.join(member).splitlines(keepends=True):
+                    add(line)
+                member = []
+                decompressor = zlib.decompressobj(wbits=31)
+    except zlib.error:
+        pass
+    return good
+
+class NDJSONWriter:
+    """
+    Writes recipes to a single file, one JSON object per line: {"url": ..., "recipe": {...}}
+    The lines are written in batches, so a batch job does one write per batch_size recipes instead of one file per recipe
+
+    Parameters:
+        path: string -- the path of the file
+        compression: string = None -- 'gzip' to compress the file, which is the default if the path ends with .gz
+        batch_size: int = 100 -- how many recipes are kept before they're written
+        resume: boolean = True -- if the file exists, keep what's in it and add to it. Anything after the last batch
+            that was completely written (i.e. if the program was killed while writing) is cut off. If False, the file is overwritten
+        serializer: string = 'json' -- 'orjson' writes the same lines several times faster, but needs pip install orjson
+
+    With gzip, every batch is compressed as its own gzip member, which any gzip reader reads as one file.
+    """
+
+    def __init__(self, path: str, *, compression: Optional[str] = None, batch_size: int = 100, resume: bool = True, serializer: str = 'json'):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if serializer not in ('json', 'orjson'):
+            raise ValueError(f"serializer must be json or orjson, not {serializer}")
+        # Fails now rather than at the first batch if orjson isn't installed
+        dumps({}, serializer)
+        self.serializer = serializer
+        self.path = path
+        self.compression = _compression_of(path, compression)
+        self.batch_size = batch_size
+        self.urls: Set[str] = set()
+        self._batch: List[bytes] = []
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if resume and os.path.exists(path):
+            # Only the urls are kept, the file can hold far more recipes than fit in memory
+            def add(line: bytes) -> None:
+                self.urls.add(loads(line, serializer)['url'])
+            with open(path, 'rb') as f:
+                good = _scan_gzip(f, add) if self.compression == 'gzip' else _scan_plain(f, add)
+            self._file = open(path, 'r+b')
+            self._file.truncate(good)
+            self._file.seek(good)
+        else:
+            self._file = open(path, 'wb')
+
+    def write(self, url: str, recipe: dict) -> None:
+        """Adds the recipe, the batch is written once it has batch_size recipes"""
+        if isinstance(recipe, LazyRecipe):
+            recipe = recipe.materialize()
+        self._batch.append(dumps({'url': url, 'recipe': recipe}, self.serializer) + b'\n')
+        self.urls.add(url)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the recipes that are waiting, even if there are fewer than batch_size"""
+        if not self._batch:
+            return
+        data = b''.join(self._batch)
+        self._file.write(gzip.compress(data) if self.compression == 'gzip' else data)
+        self._file.flush()
+        self._batch = []
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> 'NDJSONWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.urls
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+def read_ndjson(path: str, *, compression: Optional[str] = None, serializer: str = 'json') -> Iterator[Tuple[str, dict]]:
+    """
+    Reads the recipes written by an NDJSONWriter, one at a time
+
+    Args:
+        path (str): the path of the file
+        compression (Optional[str]): 'gzip' if it's compressed, the default if the path ends with .gz
+        serializer (str): 'orjson' to read the lines with orjson, whichever wrote them
+
+    Returns:
+        Iterator[Tuple[str, dict]]: the url and the recipe of every line
+    """
+    opener = gzip.open if _compression_of(path, compression) == 'gzip' else open
+    with opener(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                data = loads(line, serializer)
+                yield data['url'], data['recipe']
+
+def write_ndjson(results: Iterable[BatchResult], path: str, *, compression: Optional[str] = None, batch_size: int = 100, resume: bool = True, serializer: str = 'json') -> Iterator[BatchResult]:
+    """
+    Writes the recipes of any stream of results (convert_many, convert_many_processes, crawl_and_convert...) to the file
+    as they come, yielding each result once it's been handed to the writer. Failed results are yielded but not written,
+    and with resume a url that's already in the file isn't written twice
+
+    Args:
+        results (Iterable[BatchResult]): the results to write
+        path (str): the path of the file
+        compression (Optional[str]): 'gzip' to compress the file, the default if the path ends with .gz
+        batch_size (int): how many recipes are kept before they're written
+        resume (bool): if the new recipes are added to the file, otherwise it's overwritten
+        serializer (str): 'json' or 'orjson', see NDJSONWriter
+
+    Returns:
+        Iterator[BatchResult]: the same results
+    """
+    with NDJSONWriter(path, compression=compression, batch_size=batch_size, resume=resume, serializer=serializer) as writer:
+        for result in results:
+            if result.ok and result.url not in writer:
+                writer.write(result.url, result.recipe)
+            yield result
+
+def export_ndjson(urls: Iterable[str], path: str, converter: Optional[Type[BaseConverter]] = None, *, compression: Optional[str] = None, batch_size: int = 100, resume: bool = True, serializer: str = 'json', max_workers: int = 8, **converter_options) -> Iterator[BatchResult]:
+    """
+    Converts the urls with convert_many and writes every recipe to the file as soon as it's converted (see NDJSONWriter)
+    The results are yielded as they're written, so this can be the last step of a pipeline (and the errors can be handled)
+    The recipes aren't kept in memory once they're written, but the url of every recipe in the file is (see NDJSONWriter.urls),
+    so memory use grows with the number of urls, if far more slowly than with the recipes
+
+    Args:
+        urls (Iterable[str]): the recipe urls
+        path (str): the path of the file
+        converter (Optional[Type[BaseConverter]]): the converter class used for every url, if None each url's is found with r2api.converter.registry
+        compression (Optional[str]): 'gzip' to compress the file, the default if the path ends with .gz
+        batch_size (int): how many recipes are kept before they're written
+        resume (bool): if the urls already in the file are skipped and the new recipes added to it, otherwise it's overwritten
+        serializer (str): 'json' or 'orjson', see NDJSONWriter
+        max_workers (int): how many recipes are fetched/parsed at the same time
+        **converter_options: any other keyword arguments are passed on to convert_many
+
+    Returns:
+        Iterator[BatchResult]: the result of every url that wasn't already in the file, only the recipes that were converted are written
+    """
+    with NDJSONWriter(path, compression=compression, batch_size=batch_size, resume=resume, serializer=serializer) as writer:
+        # Checked as the urls are read, so a url converted earlier in this run isn't converted again either.
+        # A url that's repeated while it's still being converted isn't in the writer yet, hence pending
+        pending: Set[str] = set()
+
+        def remaining() -> Iterator[str]:
+            for url in urls:
+                if url not in writer and url not in pending:
+                    pending.add(url)
+                    yield url
+
+        for result in convert_many(remaining(), converter, max_workers=max_workers, **converter_options):
+            pending.discard(result.url)
+            if result.ok and result.url not in writer:
+                writer.write(result.url, result.recipe)
+            yield result
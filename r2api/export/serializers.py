@@ -0,0 +1,129 @@
+import json
+from typing import Optional
+
+from ..converter.recipe import RECIPE_FIELDS as _FIELDS, to_json
+
+# The formats a recipe can be written in. orjson is JSON too, just written much faster (it needs pip install orjson),
+# msgpack is a compact binary encoding that only our own loader reads back as a recipe (it needs pip install msgpack)
+FORMATS = ('json', 'orjson', 'msgpack')
+
+# The first item of a packed recipe, so the layout can change without old files being read wrong
+_PACK_VERSION = 1
+
+def _orjson():
+    try:
+        import orjson
+    except ImportError:
+        raise ImportError("orjson module not found, install it (pip install orjson) to use the orjson format")
+    return orjson
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError("msgpack module not found, install it (pip install msgpack) to use the msgpack format")
+    return msgpack
+
+def _check_format(format: str) -> None:
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}, not {format}")
+
+def pack_recipe(recipe: dict) -> list:
+    """
+    The recipe as a list without its keys: [version, name, image, ingredients, preparation], every ingredient staying
+    a [name, quantity, unit] list. Any other keys the recipe has are put in a dictionary at the end
+
+    Args:
+        recipe (dict): the recipe
+
+    Returns:
+        list: the packed recipe
+    """
+    packed = [_PACK_VERSION, *(recipe.get(field) for field in _FIELDS)]
+    extra = {key: value for key, value in recipe.items() if key not in _FIELDS}
+    if extra:
+        packed.append(extra)
+    return packed
+
+def unpack_recipe(packed: list) -> dict:
+    """
+    The recipe from pack_recipe
+
+    Args:
+        packed (list): the packed recipe
+
+    Raises:
+        ValueError: if it wasn't packed by pack_recipe (or by a later version of it)
+
+    Returns:
+        dict: the recipe, with the ingredients as lists as they are in a converter's recipe
+    """
+    if not isinstance(packed, (list, tuple)) or not packed or packed[0] != _PACK_VERSION:
+        raise ValueError("Not a packed recipe, or packed by an unknown version")
+    recipe = dict(zip(_FIELDS, packed[1:len(_FIELDS) + 1]))
+    recipe['ingredients'] = [list(ingredient) for ingredient in recipe.get('ingredients') or []]
+    if len(packed) > len(_FIELDS) + 1:
+        recipe.update(packed[len(_FIELDS) + 1])
+    return recipe
+
+def dumps(recipe: dict, format: str = 'json', *, indent: Optional[int] = None) -> bytes:
+    """
+    Serializes a recipe
+
+    Args:
+        recipe (dict): the recipe, a Recipe or a dictionary
+        format (str): 'json', 'orjson' or 'msgpack'
+        indent (Optional[int]): the indent of the JSON, None for one line. orjson only indents by 2, so any indent is 2 with it
+
+    Raises:
+        ValueError: if the format isn't one of FORMATS
+        ImportError: if the format needs a module that isn't installed
+
+    Returns:
+        bytes: the serialized recipe, UTF-8 for JSON
+    """
+    _check_format(format)
+    if format == 'msgpack':
+        return _msgpack().packb(pack_recipe(recipe), use_bin_type=True, default=to_json)
+    if format == 'orjson':
+        orjson = _orjson()
+        return orjson.dumps(recipe, default=to_json, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(recipe, indent=indent, ensure_ascii=False, default=to_json).encode('utf-8')
+
+def loads(data: bytes, format: str = 'json') -> dict:
+    """
+    Deserializes a recipe from dumps, json and orjson are interchangeable
+
+    Args:
+        data (bytes): the serialized recipe
+        format (str): 'json', 'orjson' or 'msgpack'
+
+    Raises:
+        ValueError: if the format isn't one of FORMATS
+        ImportError: if the format needs a module that isn't installed
+
+    Returns:
+        dict: the recipe
+    """
+    _check_format(format)
+    if format == 'msgpack':
+        return unpack_recipe(_msgpack().unpackb(data, raw=False))
+    if format == 'orjson':
+        return _orjson().loads(data)
+    return json.loads(data)
+
+def read_recipe(path: str, format: Optional[str] = None) -> dict:
+    """
+    Reads a recipe written by write_recipe_to
+
+    Args:
+        path (str): the path of the file
+        format (Optional[str]): the format it was written in, if None it's msgpack if the path ends with .msgpack and JSON otherwise
+
+    Returns:
+        dict: the recipe
+    """
+    if format is None:
+        format = 'msgpack' if path.endswith('.msgpack') else 'json'
+    with open(path, 'rb') as f:
+        return loads(f.read(), format)
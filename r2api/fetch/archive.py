@@ -0,0 +1,188 @@
+import gzip
+import os
+import sqlite3
+import struct
+import threading
+from typing import (
+    Iterator,
+    Optional
+)
+
+# Every snapshot is stored as a header, the url and the compressed page, one after the other
+# The header is the magic bytes, the codec, the length of the url and the length of the compressed page
+_MAGIC = b'R2SA'
+_HEADER = struct.Struct('>4sBHQ')
+
+_CODECS = {'gzip': 0, 'zstd': 1}
+_CODEC_NAMES = {number: name for name, number in _CODECS.items()}
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstandard module not found, install it (pip install zstandard) to use zstd compression")
+    return zstandard
+
+def _compress(content: bytes, codec: str, level: Optional[int]) -> bytes:
+    if codec == 'zstd':
+        return _zstandard().ZstdCompressor(level=3 if level is None else level).compress(content)
+    return gzip.compress(content, compresslevel=6 if level is None else level)
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        return _zstandard().ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+class SnapshotArchive:
+    """
+    An archive of the original bytes of fetched pages, for replaying them later (i.e. for regression tests of the converters)
+    The pages are compressed one by one and appended to a single file. A sqlite index next to it (path + '.index')
+    holds where each url's page starts, so any page is read without reading the rest of the archive
+
+    Parameters:
+        path: string -- the path of the archive, it will be created if it doesn't exist
+        compression: string = 'gzip' -- 'gzip' or 'zstd' (which needs the zstandard package), only for the pages added from now on
+        level: int = None -- the compression level, the codec's default if None
+
+    Adding a url again appends the new page and the index points to it from then on. It can be shared between threads.
+    """
+
+    def __init__(self, path: str, *, compression: str = 'gzip', level: Optional[int] = None):
+        if compression not in _CODECS:
+            raise ValueError(f"compression must be one of {', '.join(_CODECS)}, not {compression}")
+        if compression == 'zstd':
+            # It's better to know now than after the first page has been fetched
+            _zstandard()
+        self.path = path
+        self.compression = compression
+        self.level = level
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a+b')
+        index_exists = os.path.exists(self.index_path)
+        self._index = sqlite3.connect(self.index_path, check_same_thread=False, isolation_level=None)
+        self._index.execute("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                url TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                codec INTEGER NOT NULL
+            )
+        """)
+        # If the index was lost, it's made again from the archive itself
+        if not index_exists and os.path.getsize(path) > 0:
+            self.rebuild_index()
+        else:
+            self._recover()
+
+    @property
+    def index_path(self) -> str:
+        return self.path + '.index'
+
+    def put(self, url: str, content: bytes) -> None:
+        """Compresses the page and appends it to the archive"""
+        encoded_url = url.encode('utf-8')
+        data = _compress(content, self.compression, self.level)
+        header = _HEADER.pack(_MAGIC, _CODECS[self.compression], len(encoded_url), len(data))
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell() + _HEADER.size + len(encoded_url)
+            self._file.write(header + encoded_url + data)
+            # The page has to be on disk before the index points to it
+            self._file.flush()
+            self._index.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                (url, offset, len(data), _CODECS[self.compression])
+            )
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Returns the page as it was fetched or None if it isn't in the archive"""
+        with self._lock:
+            row = self._index.execute("SELECT offset, length, codec FROM snapshots WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self._file.seek(row[0])
+            data = self._file.read(row[1])
+        return _decompress(data, _CODEC_NAMES[row[2]])
+
+    def urls(self) -> Iterator[str]:
+        """Every url in the archive, in the order they were first added"""
+        with self._lock:
+            rows = self._index.execute("SELECT url FROM snapshots ORDER BY rowid").fetchall()
+        for row in rows:
+            yield row[0]
+
+    def rebuild_index(self) -> int:
+        """
+        Makes the index again by reading the whole archive, where the same url appears more than once the last page is used
+        A snapshot that was cut off (i.e. the program was killed while writing it) and anything after it are cut off the archive,
+        so the pages added after that are read back too
+
+        Returns:
+            int: how many urls are in the index
+        """
+        with self._lock:
+            self._index.execute("DELETE FROM snapshots")
+            self._index_from(0)
+            return self._index.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+    def _recover(self) -> None:
+        """
+        Indexes the snapshots after the last one in the index and cuts off anything after them. A snapshot can be on disk
+        without being in the index if the program was killed between the two, or cut off if it was killed while writing it
+        """
+        with self._lock:
+            end = self._index.execute("SELECT MAX(offset + length) FROM snapshots").fetchone()[0] or 0
+            if end < os.path.getsize(self.path):
+                self._index_from(end)
+
+    def _index_from(self, offset: int) -> None:
+        """Indexes every whole snapshot from the offset on and truncates the archive after the last one, the lock must be held"""
+        size = os.path.getsize(self.path)
+        self._file.seek(offset)
+        rows = []
+        while True:
+            header = self._file.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                break
+            magic, codec, url_length, length = _HEADER.unpack(header)
+            if magic != _MAGIC or codec not in _CODEC_NAMES:
+                break
+            url = self._file.read(url_length)
+            start = offset + _HEADER.size + url_length
+            if len(url) < url_length or start + length > size:
+                break
+            try:
+                url = url.decode('utf-8')
+            except UnicodeDecodeError:
+                break
+            rows.append((url, start, length, codec))
+            offset = start + length
+            self._file.seek(offset)
+        # Appending after garbage would leave every later snapshot unreadable by the next rebuild
+        if offset < size:
+            self._file.truncate(offset)
+        self._index.execute("BEGIN")
+        self._index.executemany("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)", rows)
+        self._index.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+            self._index.close()
+
+    def __enter__(self) -> 'SnapshotArchive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self._index.execute("SELECT 1 FROM snapshots WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._index.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
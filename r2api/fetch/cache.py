@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import threading
+from typing import (
+    NamedTuple,
+    Optional
+)
+
+class CachedResponse(NamedTuple):
+    """The raw bytes of a cached page and the validators it was served with"""
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+    def conditional_headers(self) -> dict:
+        """The headers to ask the server if the page has changed since it was cached"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class ResponseCache:
+    """
+    A persistent cache of the raw bytes of fetched pages, keyed by URL and stored in a sqlite database
+    The ETag and Last-Modified headers are recorded so pages can be revalidated with If-None-Match/If-Modified-Since:
+    if the server answers 304 Not Modified, the cached bytes are used and the page isn't downloaded again
+
+    Parameters:
+        path: string -- the path of the sqlite database, it will be created if it doesn't exist
+        max_bytes: int = 512 MiB -- once the cached pages are larger than this, the least recently used ones are evicted
+        revalidate: boolean = True -- if False, cached pages are used without asking the server at all
+
+    It can be shared between threads.
+    """
+
+    # Rather than a timestamp (which two quick accesses can share), every access gets the next number
+    # so the least recently used page is always the one with the smallest last_access
+    _NEXT_ACCESS = "(SELECT COALESCE(MAX(last_access), 0) + 1 FROM responses)"
+
+    def __init__(self, path: str, *, max_bytes: int = 512 * 1024 * 1024, revalidate: bool = True):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.revalidate = revalidate
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                content BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                last_access INTEGER NOT NULL
+            )
+        """)
+        # The content blobs are stored in the same rows, so without a covering index
+        # summing the sizes or finding the least recently used pages would read every page
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access, size, url)")
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Returns the cached page for the url (marking it as recently used) or None if it isn't cached"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content, etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(f"UPDATE responses SET last_access = {self._NEXT_ACCESS} WHERE url = ?", (url,))
+        return CachedResponse(bytes(row[0]), row[1], row[2])
+
+    def put(self, url: str, content: bytes, *, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Stores the page and evicts the least recently used pages if the cache has grown past max_bytes"""
+        # A page that could never fit would just evict everything else
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, {self._NEXT_ACCESS})",
+                (url, sqlite3.Binary(content), etag, last_modified, len(content))
+            )
+            self._evict()
+
+    def refresh(self, url: str, *, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        The server answered 304 Not Modified for the cached page: the validators it sent replace the stored ones
+        (the ones it didn't send are kept) so the next revalidation uses them. The page itself is unchanged
+        """
+        with self._lock:
+            self._connection.execute(
+                f"UPDATE responses SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified), last_access = {self._NEXT_ACCESS} WHERE url = ?",
+                (etag, last_modified, url)
+            )
+
+    def _evict(self) -> None:
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for url, size in self._connection.execute("SELECT url, size FROM responses ORDER BY last_access ASC"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((url,))
+            total -= size
+        self._connection.executemany("DELETE FROM responses WHERE url = ?", evicted)
+
+    def delete(self, url: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM responses WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
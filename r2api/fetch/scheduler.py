@@ -0,0 +1,232 @@
+import collections
+import collections.abc
+import email.utils
+import threading
+import time
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple
+)
+from urllib.parse import urlsplit
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or '').lower()
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    The seconds to wait from a Retry-After header, which is either a number of seconds or an HTTP date
+
+    Args:
+        value (Optional[str]): the value of the header
+
+    Returns:
+        Optional[float]: the seconds to wait (0 if the date has passed), None if there was no (valid) header
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if date is None:
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+class TokenBucket:
+    """
+    A bucket of up to burst tokens that refills at rate tokens per second, a request takes one token
+    Tokens are reserved rather than waited for: if the bucket is empty, reserve still takes the token
+    (the bucket goes into debt) and returns how long to wait before sending, so every caller gets its own slot
+    Not thread safe by itself, the HostScheduler locks around it
+    """
+
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Takes a token and returns how many seconds to wait before using it"""
+        self._refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, now: float, seconds: float) -> None:
+        """No token will be available for the next seconds (on top of the ones already reserved)"""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+    def ready_in(self, now: float) -> float:
+        """How many seconds until a token is available"""
+        tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+class HostScheduler:
+    """
+    Keeps the requests to each host within a rate limit, with a token bucket per host
+    A host that answers 429 Too Many Requests (or 503 Service Unavailable) is paused for its Retry-After, or with an exponential backoff
+    if it doesn't send one, and the request is retried once the pause is over. Only that host is paused, the others carry on
+
+    Parameters:
+        rate: float = 2.0 -- how many requests per second are sent to each host
+        burst: int = 4 -- how many requests can be sent to a host at once after it's been idle
+        host_rates: dict = None -- the (rate, burst) of particular hosts, i.e. {'blog.giallozafferano.it': (0.5, 1)}
+        max_retries: int = 3 -- how many times a request that was throttled is retried before its response is returned as it is
+        backoff: float = 1.0 -- the first pause of a host that throttles without a Retry-After, doubled each time it happens again in a row
+        max_backoff: float = 300 -- the longest a host is paused, even if its Retry-After is longer
+
+    It can be shared between threads, pass it as scheduler to the converters, convert_many or fetch.
+    """
+
+    # The statuses a host throttles with
+    throttle_statuses = (429, 503)
+
+    def __init__(self, rate: float = 2.0, burst: int = 4, *, host_rates: Optional[Dict[str, Tuple[float, int]]] = None, max_retries: int = 3, backoff: float = 1.0, max_backoff: float = 300):
+        # The bucket is only made to check the settings
+        TokenBucket(rate, burst)
+        if max_retries < 0:
+            raise ValueError("max_retries can't be negative")
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._host_rates: Dict[str, Tuple[float, int]] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._strikes: Dict[str, int] = collections.defaultdict(int)
+        self._lock = threading.Lock()
+        for host, (host_rate, host_burst) in (host_rates or {}).items():
+            self.set_host_rate(host, host_rate, host_burst)
+
+    def set_host_rate(self, host: str, rate: float, burst: Optional[int] = None) -> None:
+        """Changes the rate (and burst) of one host, even while it's being fetched from"""
+        bucket = TokenBucket(rate, burst or self.burst)
+        with self._lock:
+            self._host_rates[host.lower()] = (bucket.rate, bucket.burst)
+            current = self._buckets.get(host.lower())
+            if current is not None:
+                # Reservations already made are kept
+                bucket.tokens = min(bucket.burst, current.tokens)
+                bucket.updated = current.updated
+            self._buckets[host.lower()] = bucket
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = self._host_rates.get(host, (self.rate, self.burst))
+            bucket = self._buckets[host] = TokenBucket(rate, burst)
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        """Reserves a request to the url's host and returns how many seconds to wait before sending it"""
+        with self._lock:
+            return self._bucket(host_of(url)).reserve(time.monotonic())
+
+    def wait(self, url: str) -> None:
+        """Blocks until a request can be sent to the url's host"""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def ready_in(self, url: str) -> float:
+        """How many seconds until a request could be sent to the url's host"""
+        with self._lock:
+            return self._bucket(host_of(url)).ready_in(time.monotonic())
+
+    def throttled(self, url: str, retry_after: Optional[float] = None) -> float:
+        """
+        Pauses the url's host after it throttled a request
+
+        Args:
+            url (str): the url of the request that was throttled
+            retry_after (Optional[float]): the seconds the host asked to wait for, if None the backoff is used
+
+        Returns:
+            float: how long the host is paused for
+        """
+        host = host_of(url)
+        with self._lock:
+            if retry_after is None:
+                retry_after = self.backoff * 2 ** self._strikes[host]
+            self._strikes[host] += 1
+            pause = min(retry_after, self.max_backoff)
+            self._bucket(host).pause(time.monotonic(), pause)
+            return pause
+
+    def succeeded(self, url: str) -> None:
+        """The url's host answered without throttling, so its next backoff starts over"""
+        host = host_of(url)
+        with self._lock:
+            self._strikes.pop(host, None)
+
+    def interleave(self, urls: Iterable[str], window: int = 1000) -> Iterator[str]:
+        """
+        Reorders the urls round-robin across their hosts, so one host with many urls (or one that's paused)
+        doesn't hold up the others. The next url is from the next host in turn that can be fetched from right away,
+        or, if none can, from the one that will be ready first
+
+        A list (or any sized collection) is read window ahead right away. An iterator may be slow to produce its urls
+        (i.e. fed by a crawl), so it's read ahead progressively: the first url is yielded as soon as it's read,
+        and the read ahead grows by one with each url yielded, up to window
+
+        Args:
+            urls (Iterable[str]): the urls, read no more than window ahead
+            window (int): the most urls that are read ahead to be reordered
+
+        Returns:
+            Iterator[str]: the same urls in a different order
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        # How far ahead the urls are read, a sized collection is already there to be read
+        read_ahead = window if isinstance(urls, collections.abc.Sized) else 1
+        urls = iter(urls)
+        # host -> its urls, in the order the hosts take turns
+        queues: 'collections.OrderedDict[str, collections.deque]' = collections.OrderedDict()
+        buffered = 0
+        exhausted = False
+        while True:
+            while not exhausted and buffered < read_ahead:
+                try:
+                    url = next(urls)
+                except StopIteration:
+                    exhausted = True
+                    break
+                queues.setdefault(host_of(url), collections.deque()).append(url)
+                buffered += 1
+            if not queues:
+                return
+
+            with self._lock:
+                now = time.monotonic()
+                chosen, soonest = None, None
+                for host in queues:
+                    ready_in = self._bucket(host).ready_in(now)
+                    if ready_in == 0:
+                        chosen = host
+                        break
+                    if soonest is None or ready_in < soonest:
+                        chosen, soonest = host, ready_in
+
+            host_queue = queues.pop(chosen)
+            buffered -= 1
+            read_ahead = min(window, read_ahead + 1)
+            yield host_queue.popleft()
+            # The host goes to the back of the line
+            if host_queue:
+                queues[chosen] = host_queue
@@ -0,0 +1,245 @@
+import threading
+from typing import (
+    Iterable,
+    Optional,
+    Sequence,
+    Tuple,
+    Union
+)
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .cache import ResponseCache
+from .scheduler import HostScheduler, parse_retry_after
+
+# Yes, fellow robot--err, a robot! Yes, hello. I'm a HUMAN. Please let me access your website.
+DEFAULT_HEADERS = {'User-agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:61.0) Gecko/20100101 Firefox/61.0'}
+
+Timeout = Union[None, float, Tuple[float, float]]
+
+# The statuses the shared session retries
+DEFAULT_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+
+# How much of a streamed response is read at a time while looking for the end markers
+STREAM_CHUNK_SIZE = 16 * 1024
+
+class PooledSession(requests.Session):
+    """
+    A requests.Session with a default timeout
+    Sessions keep their connections alive, so fetching many recipes from the same host
+    only pays for the TCP/TLS handshake once per pooled connection instead of once per recipe
+    """
+    def __init__(self, timeout: Timeout = None):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+def make_session(*, pool_connections: int = 10, pool_maxsize: int = 10, timeout: Timeout = 30, retries: int = 3, backoff_factor: float = 0.5, status_forcelist: Iterable[int] = DEFAULT_STATUS_FORCELIST) -> PooledSession:
+    """
+    Creates a session with a connection pool per host and retries with exponential backoff
+
+    Args:
+        pool_connections (int): how many hosts have their own pool of connections kept
+        pool_maxsize (int): how many connections are kept alive per host, should be at least the number of threads fetching
+        timeout (Union[None, float, Tuple[float, float]]): the default timeout of every request, either one number or (connect, read)
+        retries (int): how many times a failed request is retried
+        backoff_factor (float): retries wait backoff_factor * 2 ** (retry number - 1) seconds
+        status_forcelist (Iterable[int]): the HTTP statuses that are retried. A session passed to fetch with a scheduler
+            shouldn't have 429 or 503 in it, the scheduler retries those itself (see without_throttle_statuses)
+
+    Returns:
+        PooledSession: the configured session
+    """
+    session = PooledSession(timeout=timeout)
+    session.headers.update(DEFAULT_HEADERS)
+    # raise_on_status is turned off so that, as before, the last response is returned
+    # even if it still has a bad status after all the retries
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=tuple(status_forcelist),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def without_throttle_statuses(status_forcelist: Iterable[int]) -> Tuple[int, ...]:
+    """
+    The statuses without the ones a HostScheduler handles (429 and 503). A session that retries those itself
+    (with urllib3's own backoff) never lets the scheduler see them, so the host is never paused for its Retry-After
+    """
+    return tuple(status for status in status_forcelist if status not in HostScheduler.throttle_statuses)
+
+_session: Optional[requests.Session] = None
+# The session used with a scheduler, which doesn't retry the throttle statuses. It's _session itself if that was set
+_scheduled_session: Optional[requests.Session] = None
+_session_settings: dict = {}
+_session_lock = threading.Lock()
+
+def get_session(*, scheduled: bool = False) -> requests.Session:
+    """
+    Returns the session shared by every converter, creating it with the default settings the first time
+    With scheduled=True, the shared session used with a HostScheduler, which leaves retrying 429 and 503 to it
+    """
+    global _session, _scheduled_session
+    if scheduled:
+        if _scheduled_session is None:
+            with _session_lock:
+                if _scheduled_session is None:
+                    settings = dict(_session_settings)
+                    settings['status_forcelist'] = without_throttle_statuses(settings.get('status_forcelist', DEFAULT_STATUS_FORCELIST))
+                    _scheduled_session = make_session(**settings)
+        return _scheduled_session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = make_session(**_session_settings)
+    return _session
+
+def set_session(session: Optional[requests.Session]) -> None:
+    """
+    Replaces the shared session, i.e. with one that has a proxy or authentication. None resets it to the default
+    It's used with a scheduler too, so it shouldn't retry 429 or 503 itself (see without_throttle_statuses)
+    """
+    global _session, _scheduled_session, _session_settings
+    with _session_lock:
+        _session = session
+        _scheduled_session = session
+        _session_settings = {}
+
+def configure_session(**settings) -> requests.Session:
+    """
+    Replaces the shared session with a new one made with make_session(**settings) and returns it
+    The session used with a scheduler is made with the same settings, less the throttle statuses
+    """
+    global _session, _scheduled_session, _session_settings
+    session = make_session(**settings)
+    with _session_lock:
+        _session = session
+        _scheduled_session = None
+        _session_settings = settings
+    return session
+
+def fetch(url: str, *, session: Optional[requests.Session] = None, headers: Optional[dict] = None, cache: Optional[ResponseCache] = None, end_markers: Sequence[bytes] = (), scheduler: Optional[HostScheduler] = None) -> bytes:
+    """
+    Download the page at the url and return the raw bytes of the response
+
+    Args:
+        url (str): the page to be fetched
+        session (Optional[requests.Session]): the session to use, the shared session if None (get_session(scheduled=True) with a scheduler)
+        headers (Optional[dict]): extra headers sent with the request
+        cache (Optional[ResponseCache]): if given, cached pages are revalidated instead of being downloaded again
+        end_markers (Sequence[bytes]): if given, the response is streamed and the download stops
+            once every marker has been seen in order (see read_until_markers)
+        scheduler (Optional[HostScheduler]): if given, the request waits for its turn at the host, and is retried after a pause if the host throttles it
+
+    Returns:
+        bytes: the body of the response
+    """
+    if session is None:
+        session = get_session(scheduled=scheduler is not None)
+
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None:
+        if not cache.revalidate:
+            return cached.content
+        headers = {**(headers or {}), **cached.conditional_headers()}
+
+    attempt = 0
+    while True:
+        if scheduler is not None:
+            scheduler.wait(url)
+        r = session.get(url, headers=headers, stream=bool(end_markers))
+        if scheduler is None:
+            break
+        if r.status_code not in scheduler.throttle_statuses:
+            scheduler.succeeded(url)
+            break
+        # The host is paused for every request to it, not just this one
+        scheduler.throttled(url, parse_retry_after(r.headers.get('Retry-After')))
+        if attempt >= scheduler.max_retries:
+            break
+        attempt += 1
+        r.close()
+    try:
+        if cached is not None and r.status_code == 304:
+            cache.refresh(url, etag=r.headers.get('ETag'), last_modified=r.headers.get('Last-Modified'))
+            return cached.content
+        if end_markers:
+            content, complete = read_until_markers(r.iter_content(STREAM_CHUNK_SIZE), end_markers)
+        else:
+            content, complete = r.content, True
+    finally:
+        # If the download was stopped early, this drops the connection instead of reading the rest
+        r.close()
+    # A page that was cut short isn't stored, the cache must always have the whole page
+    if cache is not None and complete and r.status_code == 200:
+        cache.put(url, content, etag=r.headers.get('ETag'), last_modified=r.headers.get('Last-Modified'))
+    return content
+
+class EndMarkerScanner:
+    """
+    Looks for the end markers in a response as it's being downloaded, each marker after the previous one
+    Once the last one has been found, the content is cut at the end of the tag containing it (the first > at or after its last byte)
+    i.e. (b'recipe-steps', b'</ol>') stops right after the first </ol> that comes after recipe-steps
+    """
+    def __init__(self, end_markers: Sequence[bytes]):
+        self._buffer = bytearray()
+        self._markers = list(end_markers)
+        # Where the search for the current marker starts
+        self._position = 0
+        self._cut = None
+
+    def feed(self, chunk: bytes) -> bool:
+        """Adds the next chunk of the body and returns True once the rest of it isn't needed"""
+        self._buffer += chunk
+        while self._markers:
+            found = self._buffer.find(self._markers[0], self._position)
+            if found == -1:
+                # The marker could start in this chunk and end in the next one
+                self._position = max(self._position, len(self._buffer) - len(self._markers[0]) + 1)
+                return False
+            self._position = found + len(self._markers.pop(0))
+        end_of_tag = self._buffer.find(b'>', self._position - 1)
+        if end_of_tag != -1:
+            self._cut = end_of_tag + 1
+        return self.done
+
+    @property
+    def done(self) -> bool:
+        return self._cut is not None
+
+    @property
+    def content(self) -> bytes:
+        return bytes(self._buffer[:self._cut]) if self.done else bytes(self._buffer)
+
+def read_until_markers(chunks: Iterable[bytes], end_markers: Sequence[bytes]) -> Tuple[bytes, bool]:
+    """
+    Reads the chunks until every marker has been found (see EndMarkerScanner)
+
+    Args:
+        chunks (Iterable[bytes]): the body of the response, i.e. response.iter_content()
+        end_markers (Sequence[bytes]): the markers to look for
+
+    Returns:
+        Tuple[bytes, bool]: the content that was read and whether it is the whole body (no marker cut it short)
+    """
+    scanner = EndMarkerScanner(end_markers)
+    for chunk in chunks:
+        if scanner.feed(chunk):
+            break
+    return scanner.content, not scanner.done
+
+def cut_short(content: bytes, end_markers: Sequence[bytes]) -> bool:
+    """
+    If a page fetched with the end markers may have been cut short: the download stops as soon as every marker has been seen,
+    so a page with all of them in it (in order) probably had more after them. Such a page isn't the original, i.e. to archive
+    """
+    return bool(end_markers) and not read_until_markers((content,), end_markers)[1]
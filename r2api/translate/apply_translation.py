@@ -2,7 +2,9 @@ import json, os, copy, sys
 
 from typing import Optional
 
-def translate_data(data: dict, *, source_language: str = "it", target_language: str = "en", client: bool = False, custom_replace: Optional[dict] = None) -> dict:
+from ..converter.recipe import Recipe
+
+def translate_data(data: dict, *, source_language: str = "it", target_language: str = "en", client: bool = False, custom_replace: Optional[dict] = None, session = None) -> Recipe:
     """
     This function will take a python dictionary of the following format:
     recipe['name']: string
@@ -11,7 +13,8 @@ def translate_data(data: dict, *, source_language: str = "it", target_language:
         [string, float, string]
     recipe['preparation']: list of strings
 
-    And return a dictionary of the same format that has been translated by google translate.
+    (or a Recipe, which is what the converters make) and return a Recipe of the same format that has been translated by google translate.
+    The Recipe can still be used like the dictionary, see r2api.converter.recipe.Recipe
 
     If the client is set to true, then it is assumed that you have a service account and the GOOGLE_APPLICATION_CREDENTIALS environment variable if run offline.
     If run on a google-hosted server, this is handled by default.
@@ -22,6 +25,9 @@ def translate_data(data: dict, *, source_language: str = "it", target_language:
     For more information, consult the documentation at:
     https://cloud.google.com/docs/authentication/api-keys
 
+    The requests to the API use the shared session from r2api.fetch.session (unless a requests.Session is passed as session),
+    so the connection to Google is kept alive between calls.
+
     """
     # Occasionally, the Converter class is given rather than the recipe object
     #   this is to make lives a little easier
@@ -42,7 +48,9 @@ def translate_data(data: dict, *, source_language: str = "it", target_language:
         prep_string += f'{i} % '
 
     if not client:
-        import requests
+        from ..fetch.session import get_session
+        if session is None:
+            session = get_session()
         # An API key must be gotten from google
         API_KEY = os.environ.get('API_KEY')
 
@@ -53,10 +61,10 @@ def translate_data(data: dict, *, source_language: str = "it", target_language:
         # but must instead make get/post requests to the google API
         # To reduce the amount of requests, only two are made, using string methods
     
-        translated_ing = requests.post(
+        translated_ing = session.post(
             f"https://translation.googleapis.com/language/translate/v2/?key={API_KEY}&target={target_language}&source={source_language}&format=text&q={ing_string}"
         )
-        translated_prep = requests.post(
+        translated_prep = session.post(
             f"https://translation.googleapis.com/language/translate/v2/?key={API_KEY}&target={target_language}&source={source_language}&format=text&q={prep_string}"
         )
     else:
@@ -146,4 +154,4 @@ def translate_data(data: dict, *, source_language: str = "it", target_language:
     if skipped_steps > 0:
         deep_copy['preparation'] = deep_copy['preparation'][:-skipped_steps]
 
-    return deep_copy
\ No newline at end of file
+    return Recipe.from_dict(deep_copy)
\ No newline at end of file
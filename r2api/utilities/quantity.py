@@ -0,0 +1,162 @@
+import functools
+import math
+import re
+from fractions import Fraction
+from typing import (
+    NamedTuple,
+    Optional,
+    Union
+)
+
+# The kinds of quantity
+NUMBER = 'number'
+RANGE = 'range'
+TO_TASTE = 'to taste'
+TEXT = 'text'
+
+# The quantities (or units) that mean there's no amount, the converters write 'to taste' when they convert units and leave q.b. when they don't
+TO_TASTE_WORDS = frozenset(('to taste', 'q.b.', 'q.s.', 'qb', 'qs', 'a piacere'))
+
+_VULGAR_FRACTIONS = {
+    '¼': Fraction(1, 4),
+    '½': Fraction(1, 2),
+    '¾': Fraction(3, 4),
+    '⅓': Fraction(1, 3),
+    '⅔': Fraction(2, 3),
+}
+# A number as the recipes write it: 1,5 1.5 1/2 1 1/2 ½ or 1½
+_NUMBER = r'(?:\d+(?:[\.,]\d*)?(?:\s*[¼½¾⅓⅔])?|(?:\d+\s+)?\d+\s*/\s*\d+|[¼½¾⅓⅔])'
+_NUMBER_PATTERN = re.compile(rf'\s*({_NUMBER})\s*')
+_RANGE_PATTERN = re.compile(rf'\s*({_NUMBER})\s*[-–]\s*({_NUMBER})\s*')
+_FRACTION = re.compile(r'(?:(\d+)\s+)?(\d+)\s*/\s*(\d+)')
+
+class Quantity(NamedTuple):
+    """
+    The quantity of an ingredient, parsed once (see parse_quantity) so it doesn't have to be cast between strings and floats again
+    It's one of four kinds:
+        NUMBER: low is the exact number, i.e. Fraction(3, 2) for 1,5 or 1 1/2
+        RANGE: low and high are the two ends, i.e. 2 and 3 for 2-3
+        TO_TASTE: q.b., a piacere, ...
+        TEXT: anything else, i.e. (5 o 6
+    It's immutable and the same quantity is only parsed once, so it can be shared freely
+
+    Parameters:
+        kind: string -- NUMBER, RANGE, TO_TASTE or TEXT
+        low: Fraction = None -- the number, or the lower end of a range
+        high: Fraction = None -- the upper end of a range
+        text: string = '' -- the quantity as it was written
+        plain: boolean = False -- if the text is a number as float() reads it (300, 1.5), rather than 1,5, 1/2 or ½
+    """
+    kind: str
+    low: Optional[Fraction] = None
+    high: Optional[Fraction] = None
+    text: str = ''
+    plain: bool = False
+
+    @property
+    def number(self) -> float:
+        """The number as a float, NaN if it isn't a number (ranges included)"""
+        return float(self.low) if self.kind == NUMBER else math.nan
+
+    @property
+    def is_number(self) -> bool:
+        return self.kind == NUMBER
+
+    @property
+    def is_range(self) -> bool:
+        return self.kind == RANGE
+
+    @property
+    def is_to_taste(self) -> bool:
+        return self.kind == TO_TASTE
+
+    def __str__(self) -> str:
+        return self.text
+
+def _number(text: str) -> Optional[Fraction]:
+    # The text is one of the forms of _NUMBER
+    text = text.strip()
+    if text in _VULGAR_FRACTIONS:
+        return _VULGAR_FRACTIONS[text]
+    if text[-1] in _VULGAR_FRACTIONS:
+        # 1½
+        return _number(text[:-1]) + _VULGAR_FRACTIONS[text[-1]]
+    fraction = _FRACTION.fullmatch(text)
+    if fraction:
+        whole, numerator, denominator = fraction.groups()
+        if not int(denominator):
+            return None
+        return int(whole or 0) + Fraction(int(numerator), int(denominator))
+    return _decimal(text.replace(',', '.'))
+
+def _decimal(text: str) -> Optional[Fraction]:
+    # Whatever float() reads is a number, as it has always been for convert_units_ing, but not nan or inf
+    try:
+        as_float = float(text)
+    except ValueError:
+        return None
+    if not math.isfinite(as_float):
+        return None
+    try:
+        return Fraction(text)
+    except ValueError:
+        # i.e. 1_000 before Python 3.11, or 50.
+        return Fraction(as_float)
+
+@functools.lru_cache(maxsize=4096)
+def _parse(text: str) -> Quantity:
+    value = _decimal(text)
+    if value is not None:
+        return Quantity(NUMBER, value, text=text, plain=True)
+    if text.strip().lower() in TO_TASTE_WORDS:
+        return Quantity(TO_TASTE, text=text)
+    # Italian recipes write 1,5 for 1.5
+    value = _decimal(text.replace(',', '.')) if ',' in text else None
+    if value is not None:
+        return Quantity(NUMBER, value, text=text)
+    if _NUMBER_PATTERN.fullmatch(text):
+        value = _number(text)
+        if value is not None:
+            return Quantity(NUMBER, value, text=text)
+    ends = _RANGE_PATTERN.fullmatch(text)
+    if ends:
+        low, high = _number(ends.group(1)), _number(ends.group(2))
+        if low is not None and high is not None:
+            return Quantity(RANGE, low, high, text=text)
+    return Quantity(TEXT, text=text)
+
+def parse_quantity(quantity: Union[int, float, str, Quantity, None]) -> Quantity:
+    """
+    Parses the quantity of an ingredient, the one parser every part of r2api shares
+    The quantities of recipes repeat a lot (1, 2, 100, q.b.), so the most recent few thousand are kept and not parsed again
+
+    Args:
+        quantity (Union[int, float, str, Quantity, None]): the quantity, i.e. 300, 10.56, '1,5', '1/2', '½', '2-3', 'q.b.' or '(5 o 6'
+
+    Returns:
+        Quantity: the parsed quantity, the same one if it already is a Quantity. True, False and None are TEXT
+    """
+    if isinstance(quantity, Quantity):
+        return quantity
+    if isinstance(quantity, bool) or quantity is None:
+        return Quantity(TEXT, text=str(quantity))
+    # It's parsed by its text, so 1 and 1.0 (which are the same key to a cache) don't share a Quantity
+    return _parse(quantity if isinstance(quantity, str) else str(quantity))
+
+def format_quantity(quantity: Union[int, float, str, Quantity, None]) -> str:
+    """
+    The quantity as the recipes write it when it isn't converted: as it was written, except that a vulgar fraction
+    is written out (½ is 1/2), so the same fraction is always written the same way
+
+    Args:
+        quantity (Union[int, float, str, Quantity, None]): the quantity, parsed or not
+
+    Returns:
+        str: the quantity's text
+    """
+    parsed = parse_quantity(quantity)
+    text = parsed.text.strip()
+    if parsed.kind == NUMBER and text in _VULGAR_FRACTIONS:
+        fraction = _VULGAR_FRACTIONS[text]
+        return f"{fraction.numerator}/{fraction.denominator}"
+    return parsed.text
@@ -1,79 +1,453 @@
-import copy
+import math
 import re
-from typing import Union, List, Tuple
-
-def convert_units_ing(quantity: Union[int, float, str], unit: str) -> List[Tuple[Union[int, float, str], str]]:
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .quantity import NUMBER, RANGE, Quantity, format_quantity, parse_quantity
+
+# The conversions of an ingredient's unit, in the format:
+# key : (ratio, translated_key)
+# Unlike below, constants are not needed
+# because temperatures are not passed in
+INGREDIENT_UNITS: Dict[str, Tuple[float, str]] = {
+    'g': (0.00220462, 'lb'),
+    'gr': (0.00220462, 'lb'),
+    'grammi': (0.00220462, 'lb'),
+    'kg': (2.205, 'lb'),
+    'dl': (3.3814, 'fl oz'),
+    'l': (33.8140227, 'fl oz'),
+    'litri': (33.8140227, 'fl oz'),
+    'ml': (33.8140227 / 1000, 'fl oz'),
+    'millilitri': (33.8140227 / 1000, 'fl oz')
+}
+
+# The conversions of the units in a text (i.e. a preparation step), in the format:
+# key: (scalar, constant, unit)
+# N.B. Both temperatures and lengths are here
+TEXT_UNITS: Dict[str, Tuple[float, float, str]] = {
+    'g': (0.00220462, 0, 'lb'),
+    'gr': (0.00220462, 0, 'lb'),
+    'grammi': (0.00220462, 0, 'lb'),
+    'kg': (2.205, 0, 'lb'),
+    'dl': (3.3814, 0, 'fl oz'),
+    'l': (33.814, 0, 'fl oz'),
+    'litri': (33.814, 0, 'fl oz'),
+    'ml': (33.814 / 1000, 0, 'fl oz'),
+    'millilitri': (33.814 / 1000, 0, 'fl oz'),
+    '°': (1.8, 32, '°'),
+    'gradi': (1.8, 32, 'gradi'),
+    'c': (1.8, 32, 'F'),
+    'cm': (0.3937, 0, 'inches'),
+    'mm': (0.03937, 0, 'inches'),
+    'm': (39.37, 0, 'inches')
+}
+# What a ConversionCache keys the texts converted with TEXT_UNITS on
+_DEFAULT_UNITS_KEY = frozenset(TEXT_UNITS.items())
+
+# When there is a unit, it comes in one of two formats:
+# 1. quantityunit - i.e. 300g
+# 2. quantity(any of , . / - x)fraction(space)unit - i.e. 1,5 l
+# Regex 3 is so the expression correctly classifies something
+# as the former and the latter as the latter
+# i.e. 1,5l isn't treated as 1, as not a unit and 5l
+# amount will always be the quantity, space the space (or not) and unit the unit
+# celsius is for a monstrosity of redundancy such as '190°-200° C ': the ' C' after the degrees, if a space follows it
+#
+# It's the pattern (\d+[,\.\/]?\d*[a-zA-Z°]*[\/\-x]?\d*[,\.\/]?\d*)(\s?)([a-zA-Z°]+), but written so it takes linear time:
+# with four runs of digits in a row that could each be split anywhere, a long run of digits without a unit after it
+# (i.e. a tracking number) used to be tried every way it could be split, which took minutes for a few hundred digits
+# The unit has to be a letter (or a space then a letter), never a digit, so a run of digits is only ever useful whole:
+# (?=(?P<a>\d+))(?P=a) takes the whole run and can't give any of it back (it's an atomic group, which re doesn't have before 3.11)
+# and (?<!\d) doesn't start in the middle of a run, where it couldn't match if it didn't from the start of it
+# What's left to try is bounded by the letters and separators, so each character is only looked at a few times
+# It matches exactly what the old pattern matched
+_TEXT_PATTERN = re.compile(
+    r'(?<!\d)(?P<amount>(?=(?P<a>\d+))(?P=a)[,\.\/]?(?=(?P<c>\d*))(?P=c)[a-zA-Z°]*[\/\-x]?(?=(?P<f>\d*))(?P=f)[,\.\/]?(?=(?P<h>\d*))(?P=h))'
+    r'(?P<space>\s?)(?P<unit>[a-zA-Z°]+)(?:(?<=°)(?P<celsius> C)(?= ))?'
+)
+# How many times an amount with an unknown unit is looked into for a unit in it, as in the 180° of '180° per'
+_MAX_NESTING = 8
+# A unit (or the + of i.e. 4+) caught up in the quantity, as in the 190° of '190°-200° C '
+_EXTRA_UNIT = re.compile(r'[a-zA-Z°+]')
+# Both ends of a range, i.e. 1-2 or 1.2-5.2, the first end's digits taken whole for the same reason as above
+_RANGE = re.compile(r'(?<!\d)(?P<first>(?=(?P<a>\d+))(?P=a)[,\.\/]?(?=(?P<b>\d*))(?P=b))(?P<separator>\D)(?P<second>\d+[,\.\/]?\d*)')
+# A quantity and a unit in an ingredient's name
+_NAME_PATTERN = re.compile(r'(\d+)(\s?)(\w+)')
+
+def convert_units_ing(quantity: Union[int, float, str, Quantity], unit: str) -> Tuple[Union[int, float, str], str]:
     """
     Pass in a number and a quantity in metric units
     Returns a number and quantity in (American) imperial units
 
     Args:
-        quantity Union[int, float, str]: the quantity of an ingredient
+        quantity (Union[int, float, str, Quantity]): the quantity of an ingredient, as it was written or already parsed by parse_quantity
         unit (str): the units to be converted
 
     Raises:
         TypeError: If the quantity cannot be cast to string (i.e. is not a int/float/string)
 
     Returns:
-        List[Tuple[Union[int, float, str], str]]: [description]
+        Tuple[Union[int, float, str], str]: the quantity (a number rounded to 2 decimals, an int if it's whole,
+            if it could be converted or rounded, otherwise as format_quantity writes it) and the unit
     """
+    # The converters parse the quantity once and pass the Quantity in, anything else is parsed here
     try:
-        quantity = str(quantity)
-    except:
+        parsed = parse_quantity(quantity)
+    except Exception:
         raise TypeError(f"quantity {quantity} cannot be cast as a string")
-    try:
-        float(quantity)
-    except:
-        if '/' in quantity:
-            try:
-                # This quantity doesn't matter
-                # but if the '/' can be replaced easily
-                # that's all we care about
-                float(quantity.replace('/', '.'))
-            except:
-                return (quantity, unit)
     try:
         unit = str(unit)
     except:
-        return (quantity, unit)
-
-    # Dict is in the format:
-    # key : (ratio, translated_key)
-    # Unlike below, constants are not needed
-    # because temperatures are not passed in
-    unit_conversion: dict[str, Tuple[float, str]] = {
-        'g': (0.00220462, 'lb'),
-        'gr': (0.00220462, 'lb'),
-        'grammi': (0.00220462, 'lb'),
-        'kg': (2.205, 'lb'),
-        'dl': (3.3814, 'fl oz'),
-        'l': (33.8140227, 'fl oz'),
-        'litri': (33.8140227, 'fl oz'),
-        'ml': (33.8140227 / 1000, 'fl oz'),
-        'millilitri': (33.8140227 / 1000, 'fl oz')
-    }
-
-    unit_lower = unit.lower()
-
-    if unit_lower in unit_conversion:
-        # The quantity can sometimes contain , instead of .
-        # because decimals are written with a comma
-        quantity = quantity.replace(',', '.')
-        # There is no need for a try/except block because
-        # it will be of the proper format if it has gotten this far
-        con_q = (round(unit_conversion[unit_lower][0] * float(quantity), 2))
-        con_u = unit_conversion[unit_lower][1]
+        return (format_quantity(parsed), unit)
+
+    conversion = INGREDIENT_UNITS.get(unit.lower())
+    if conversion is None:
+        # The unit can't be converted, but a number written as float() reads it is still rounded
+        # Anything else (1,5, 1/2, q.b.) stays as it was written
+        if parsed.plain:
+            return (_whole(round(float(parsed.low), 2)), unit)
+        return (format_quantity(parsed), unit)
+
+    ratio, converted_unit = conversion
+    if parsed.kind == NUMBER:
         # Sometimes units will be something like .14 lb
         # So they will be converted to oz if they are small enough
         # Or fl oz to cups/quarts if they're large enough
-        con_q, con_u = simplify_units(con_q, con_u)
-        return con_q, con_u
+        # It's only rounded once it's simplified, so 0.5 g and 1/2 g are both 0.02 oz rather than 0.0 lb
+        return _convert_exactly(float(parsed.low), ratio, converted_unit)
+    if parsed.kind == RANGE:
+        # Both ends are converted, as in a text, and only simplified if they both end up in the same unit
+        low, high = ratio * float(parsed.low), ratio * float(parsed.high)
+        _low, low_unit = _convert_exactly(float(parsed.low), ratio, converted_unit)
+        _high, high_unit = _convert_exactly(float(parsed.high), ratio, converted_unit)
+        if low_unit == high_unit:
+            return (f"{_low}-{_high}", low_unit)
+        return (f"{_whole(round(low, 2))}-{_whole(round(high, 2))}", converted_unit)
+    return (format_quantity(parsed), unit)
+
+def _whole(quantity: float) -> Union[int, float]:
+    # 2.0 is written 2
+    return int(quantity) if float_dot_zero(quantity) else quantity
+
+def _convert_exactly(number: float, ratio: float, unit: str) -> Tuple[Union[int, float], str]:
+    """Converts the number and simplifies it, rounding only the simplified quantity"""
+    quantity, unit = simplify_units(ratio * number, unit)
+    return _whole(round(quantity, 2)), unit
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("numpy module not found, install it (pip install numpy) to convert quantities in batches")
+    return numpy
+
+def convert_units_ing_batch(quantities: Sequence[Union[int, float, str]], units: Sequence[str]):
+    """
+    Converts whole columns of ingredient quantities and units from metric to imperial units at once, with NumPy
+    The same as calling convert_units_ing on each pair (the units are converted with the same ratios and simplified as simplify_units
+    does, the others are kept), except that every quantity is a float (parsed by parse_quantity, so 1,5 and 1/2 are numbers too): NaN for those that aren't numbers, i.e. 'q.b.'
+    A quantity that isn't a number keeps its unit, as it does with convert_units_ing. That includes ranges ('2-3' kg), which
+    a float can't hold: they're NaN with their unit as it was, where convert_units_ing converts both ends ('4.41-6.62' lb)
+
+    Args:
+        quantities (Sequence[Union[int, float, str]]): the quantities, i.e. a list or a NumPy array of numbers
+        units (Sequence[str]): the unit of each quantity
+
+    Raises:
+        ImportError: if numpy isn't installed
+        ValueError: if there aren't as many units as quantities
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]: the converted quantities (float64) and units (str)
+    """
+    numpy = _numpy()
+    if isinstance(quantities, numpy.ndarray) and quantities.dtype.kind in 'iuf':
+        numbers = quantities.astype(numpy.float64)
     else:
+        numbers = numpy.fromiter((parse_quantity(quantity).number for quantity in quantities), dtype=numpy.float64, count=len(quantities))
+    units = numpy.asarray(units, dtype=str)
+    if units.shape != numbers.shape:
+        raise ValueError(f"There are {numbers.size} quantities but {units.size} units")
+
+    # Each different unit is only looked up once, then every row gets its unit's ratio (NaN if it isn't converted)
+    distinct, inverse = numpy.unique(units, return_inverse=True)
+    inverse = inverse.reshape(units.shape)
+    ratios = numpy.array([INGREDIENT_UNITS.get(unit.lower(), (math.nan, unit))[0] for unit in distinct], dtype=numpy.float64)
+    targets = numpy.array([INGREDIENT_UNITS.get(unit.lower(), (math.nan, unit))[1] for unit in distinct], dtype=str)
+    # Only the numbers are converted, a unit without a number (q.b. g) stays as it is
+    converted = ~numpy.isnan(ratios)[inverse] & ~numpy.isnan(numbers)
+    # As with convert_units_ing, the converted quantities are only rounded once they're simplified
+    pounds = numbers * numpy.nan_to_num(ratios)[inverse]
+    quantities = numpy.where(converted, pounds, numpy.round(numbers, 2))
+    units = numpy.where(converted, targets[inverse], units)
+
+    # simplify_units, for the converted ones: less than a pound is in ounces, 8 fl oz or more in cups and 32 or more in quarts
+    ounces = converted & (units == 'lb') & (quantities < 1)
+    quarts = converted & (units == 'fl oz') & (quantities >= 32)
+    cups = converted & (units == 'fl oz') & (quantities >= 8) & ~quarts
+    quantities = numpy.select(
+        [ounces, quarts, cups],
+        [quantities * 16, numpy.round(quantities / 32, 2), numpy.round(quantities / 8, 2)],
+        quantities
+    )
+    quantities = numpy.where(converted, numpy.round(quantities, 2), quantities)
+    units = numpy.select([ounces, quarts, cups], ['oz', 'quart', 'cup'], units)
+    return quantities, units
+
+
+class CacheStats(NamedTuple):
+    """The counters of a ConversionCache, as functools.lru_cache's cache_info() but with the evictions"""
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of lookups that were hits, 0 if there haven't been any"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class ConversionCache:
+    """
+    A bounded least recently used cache of converted texts, so the same sentence ("Infornate a 180° per 30 minuti")
+    is only converted the first time it's seen. Recipes repeat the same steps and ingredient names a lot,
+    so over a whole corpus most of them are hits
+
+    Parameters:
+        maxsize: int = 4096 -- the most texts kept, once it's full the least recently used one is evicted
+
+    It can be shared between threads, i.e. the workers of convert_many. The conversion itself is done outside of the lock,
+    so two threads that miss the same text at the same time both convert it, which is cheaper than making one wait.
+    It can be shared between UnitConverters too: the texts are cached along with the units they were converted with.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Tuple[str, Hashable, str], str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_or_convert(self, kind: str, text: str, convert: Callable[[str], str], *, units: Hashable = None) -> str:
+        """
+        The converted text from the cache, or converts and caches it
+
+        Args:
+            kind (str): what sort of conversion it is ('text' or 'name'), the same string converts differently as a name
+            text (str): the text to convert
+            convert (Callable[[str], str]): what converts it if it isn't cached
+            units (Hashable): the units convert converts with, the same text converts differently with other units
+
+        Returns:
+            str: the converted text
+        """
+        key = (kind, units, text)
+        with self._lock:
+            converted = self._entries.get(key)
+            if converted is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return converted
+            self._misses += 1
+
+        converted = convert(text)
+        with self._lock:
+            self._entries[key] = converted
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return converted
+
+    def stats(self) -> CacheStats:
+        """The hits, misses and evictions so far, and how many texts are cached"""
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self.maxsize)
+
+    def clear(self) -> None:
+        """Empties the cache and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class UnitConverter:
+    """
+    Converts every metric quantity and unit in a text to imperial units in a single pass: each quantity and unit is found
+    and replaced where it is, left to right, so nothing else in the text is touched and nothing is converted twice
+    The patterns are compiled once, when the module is imported, so a converter costs nothing to make
+
+    Parameters:
+        units: dict = None -- the units of a text as unit: (scalar, constant, converted unit), TEXT_UNITS if None
+        cache: ConversionCache = None -- if given, the texts and names already converted are looked up in it rather than converted again
+
+    The functions convert_units_prep and convert_units_name use a UnitConverter with the default units,
+    and no cache unless enable_conversion_cache is called.
+    """
+
+    def __init__(self, units: Optional[Dict[str, Tuple[float, float, str]]] = None, cache: Optional[ConversionCache] = None):
+        self.units = TEXT_UNITS if units is None else {unit.lower(): conversion for unit, conversion in units.items()}
+        # What the texts are cached with, so converters with different units can share a cache
+        self._units_key = _DEFAULT_UNITS_KEY if units is None else frozenset(self.units.items())
+        self.cache = cache
+
+    def convert_text(self, text: str) -> str:
+        """
+        Converts the quantities and units of a text, i.e. a preparation step
+
+        Args:
+            text (str): a generic string with convertable units/quantities within
+
+        Raises:
+            TypeError: if text is not a string
+
+        Returns:
+            str: the generic string with converted units/quantities
+        """
+        if not isinstance(text, str):
+            raise TypeError("text to convert must be a string")
+        if self.cache is not None:
+            return self.cache.get_or_convert('text', text, self._convert_text, units=self._units_key)
+        return self._convert_text(text)
+
+    def _convert_text(self, text: str) -> str:
+        return _TEXT_PATTERN.sub(self._replace_text, text)
+
+    def _replace_text(self, match, depth: int = 0) -> str:
+        amount, space, unit, celsius = match.group('amount', 'space', 'unit', 'celsius')
+        conversion = self.units.get(unit.lower())
+        if conversion is None:
+            # There is ONE circumstance where the regex makes an error
+            # If there is something like "180° per", where 180° gets caught up
+            # as the quantity and per as the unit, so the quantity on its own may still have a unit in it
+            # Each time the unit isn't known a letter comes off the amount and it's gone over again,
+            # so a long run of letters is only looked into _MAX_NESTING times, otherwise it would take quadratic time (or hit the recursion limit)
+            if depth >= _MAX_NESTING:
+                return match.group()
+            converted_amount = _TEXT_PATTERN.sub(lambda nested: self._replace_text(nested, depth + 1), amount)
+            return f"{converted_amount}{space}{unit}{celsius or ''}"
+
+        scalar, constant, converted_unit = conversion
+        # We are replacing , with . so it can be converted to a float
+        amount_punctuation_replaced = amount.replace(',', '.')
+        # On the rare occasion we get a monstrosity of redundancy such as:
+        # '190°-200° C ', we identify the three groups as:
+        # 1. '190°-200'
+        # 2. ''
+        # 3. '°'
+        # See the problem? It's the ° in group 1. We need to get rid of it
+        extra_unit = _EXTRA_UNIT.search(amount)
+        if extra_unit:
+            amount_punctuation_replaced = amount_punctuation_replaced.replace(extra_unit.group(), '')
+
         try:
-            quantity = round(float(quantity), 2)
-        finally:
-            return (quantity, unit)
+            # This is the simplest case: that it's something like 1,5 (now 1.5)
+            # So we can just make it into a float
+            number = float(amount_punctuation_replaced)
+        except ValueError:
+            # It's not a , but something else such as - as in 2-3
+            # Therefore we are preserving the two digits as separate entities
+            # But otherwise doing the same action
+            # If it isn't a range either (i.e. 1/2/), it's left as it is rather than stopping the whole text
+            ends = _RANGE.search(amount_punctuation_replaced)
+            if ends is None:
+                return match.group()
+            first, separator, second = ends.group('first', 'separator', 'second')
+            try:
+                first = round((float(first) * scalar) + constant, 2)
+                second = round((float(second) * scalar) + constant, 2)
+            except ValueError:
+                return match.group()
+            _first, first_unit = simplify_units(first, converted_unit)
+            _second, second_unit = simplify_units(second, converted_unit)
+            # In the rare circumstance that simplify_units will give different units
+            # for a range, we ignore the converison but must dot zero it manually
+            # because simplify_units does it usually
+            if first_unit == second_unit:
+                first, second, converted_unit = _first, _second, first_unit
+            else:
+                if float_dot_zero(first):
+                    first = int(first)
+                if float_dot_zero(second):
+                    second = int(second)
+            converted_amount = f"{first}{separator}{second}"
+        else:
+            # The converted quantity is equal to the float times the scalar plus the constant
+            # simplified so we don't have 0.14 lb
+            converted_amount, converted_unit = simplify_units(round((number * scalar) + constant, 2), converted_unit)
+
+        converted = f"{converted_amount}{space}{converted_unit}"
+        # It seems to be only with temperature, but sometimes we get both degrees and a unit marking
+        if celsius:
+            converted += ' F' if converted_unit.endswith('°') else celsius
+        return converted
+
+    def convert_name(self, name: str) -> str:
+        """
+        Converts a quantity and unit in a string that has not been parsed as an ingredient, i.e. an ingredient's name
+
+        Args:
+            name (str): a generic string of text that contains convertable quantity and units
+
+        Raises:
+            TypeError: if name is not a string
+
+        Returns:
+            str: the same string of text but with units and quantities converted
+        """
+        if not isinstance(name, str):
+            raise TypeError("name of ingredient must be a string")
+        # A name is converted with the units of convert_units_ing whatever this converter's are, so every converter shares them
+        if self.cache is not None:
+            return self.cache.get_or_convert('name', name, self._convert_name)
+        return self._convert_name(name)
+
+    def _convert_name(self, name: str) -> str:
+        return _NAME_PATTERN.sub(self._replace_name, name)
+
+    def _replace_name(self, match) -> str:
+        quantity, space, unit = match.groups()
+        converted_quantity, converted_unit = convert_units_ing(quantity, unit)
+        # If there hasn't been any conversion, the text stays as it is
+        if quantity != converted_quantity and unit != converted_unit:
+            return f"{converted_quantity}{space}{converted_unit}"
+        return match.group()
+
+# The converter the functions below use
+_converter = UnitConverter()
+
+def enable_conversion_cache(maxsize: int = 4096) -> ConversionCache:
+    """
+    Puts a ConversionCache in front of convert_units_prep and convert_units_name, replacing the one there may already be
+    It's shared by every thread, so the workers of convert_many all fill and use the same one
 
+    Args:
+        maxsize (int): the most texts kept
+
+    Returns:
+        ConversionCache: the cache, to read its stats()
+    """
+    _converter.cache = ConversionCache(maxsize)
+    return _converter.cache
+
+def disable_conversion_cache() -> None:
+    """Stops convert_units_prep and convert_units_name using a cache"""
+    _converter.cache = None
+
+def conversion_cache_stats() -> Optional[CacheStats]:
+    """The stats of the cache of convert_units_prep and convert_units_name, None if it isn't enabled"""
+    cache = _converter.cache
+    return None if cache is None else cache.stats()
 
 def convert_units_name(name: str) -> str:
     """
@@ -89,29 +463,7 @@ def convert_units_name(name: str) -> str:
     Returns:
         str: the same string of text but with units and quantities converted
     """
-    if not isinstance(name, str):
-        raise TypeError("name of ingredient must be a string")
-
-    # If a unit gets put into the name, this method seeks to find it
-    # The regex is pretty simple
-    regex = r'(\d+)\s?(\w+)'
-    for match in re.findall(regex, name):
-        # This is later used to match the replaced/replacing text strings
-        convertable_quantity, convertable_unit = match[0], match[1]
-        converted_quantity, converted_unit = convert_units_ing(
-            match[0],
-            match[1]
-        )
-
-        # If there hasn't been any conversion, there is no need to proceed
-        # This is here to double check that we're not needlessly converting units
-        if convertable_quantity != converted_quantity and convertable_unit != converted_unit:
-            # The replace method requires two strings, however the converted_quantity
-            # Has been cast to float for other purposes
-            name = name \
-                .replace(convertable_quantity, str(converted_quantity)) \
-                .replace(convertable_unit, converted_unit)
-    return name
+    return _converter.convert_name(name)
 
 
 def convert_units_prep(prep: str) -> str:
@@ -121,140 +473,13 @@ def convert_units_prep(prep: str) -> str:
     Args:
         prep (str): a generic string with convertable units/quantities within
 
+    Raises:
+        TypeError: if prep is not a string
+
     Returns:
         str: the generic string with converted units/quantities
     """
-    # We'll make a copy so we don't have any side effects
-    # Because we'll be doing some replacing if we have a hit
-    return_string = copy.deepcopy(prep)
-
-    # this dictionary is of the format:
-    # key: (scalar, constant, unit)
-    # N.B. Both temperatures and lengths are here
-    unit_conversions: dict[str, Tuple[float, str]] = {
-        'g': (0.00220462, 0, 'lb'),
-        'gr': (0.00220462, 0, 'lb'),
-        'grammi': (0.00220462, 0, 'lb'),
-        'kg': (2.205, 0, 'lb'),
-        'dl': (3.3814, 0, 'fl oz'),
-        'l': (33.814, 0, 'fl oz'),
-        'litri': (33.814, 0, 'fl oz'),
-        'ml': (33.814 / 1000, 0, 'fl oz'),
-        'millilitri': (33.814 / 1000, 0, 'fl oz'),
-        '°': (1.8, 32, '°'),
-        'gradi': (1.8, 32, 'gradi'),
-        'c': (1.8, 32, 'F'),
-        'cm': (0.3937, 0, 'inches'),
-        'mm': (0.03937, 0, 'inches'),
-        'm': (39.37, 0, 'inches')
-    }
-    # When there is a unit, it comes in one of two formats:
-    # 1. quantityunit - i.e. 300g
-    # 2. quantity(any of , . / - x)fraction(space)unit - i.e. 1,5 l
-    # Regex 3 is so the expression correctly classifies something
-    # as the former and the latter as the latter
-    # i.e. 1,5l isn't treated as 1, as not a unit and 5l
-    # group(1) will always be the quantity, group(2) always the unit
-    regex = '(\d+[,\.\/]?\d*[a-zA-Z°]*[\/\-x]?\d*[,\.\/]?\d*)(\s?)([a-zA-Z°]+)'
-
-    match = re.findall(regex, return_string)
-    # it's possible that there are multiple unit conversions in one line
-    # i.e. 'mettere 1,5 l di crema con 300g di pollo'
-    if len(match) > 0:
-        # looping through every match
-        for group in match:
-            # we will get lots of false positives
-            # they'll get ignored if they're not
-            # of the appropriate form
-            if group[2].lower() in unit_conversions:
-                unit_lower = group[2].lower()
-                # The unit is just the converted unit name and the simplest to replace
-                conv_unit = unit_conversions[unit_lower][2]
-                # We are doing the same replacement that we did above
-                # replacing , with . so it can be converted to a float
-                amount_punctuation_replaced = group[0].replace(',', '.')
-                extra_units = re.search('[a-zA-Z°+]', group[0])
-
-                # On the rare occasion we get a monstrosity of redundancy such as:
-                # '190°-200° C ', we identify the three groups as:
-                # 1. '190°-200'
-                # 2. ''
-                # 3. '°'
-                # See the problem? It's the ° in group 1. We need to get rid of it
-                if extra_units:
-                    amount_punctuation_replaced = amount_punctuation_replaced.replace(extra_units.group(), '')
-
-                try:
-                    # This is the simplest case: that it's something like 1,5 (now 1.5)
-                    # So we can just make it into a float
-                    amount = float(amount_punctuation_replaced)
-                    # The converted quantity is equal to the float times the scalar plus the constant
-                    conv_amount = round(
-                        (amount * unit_conversions[unit_lower][0]) + unit_conversions[unit_lower][1], 2)
-                    # We are passing it to the same function to simplify it so we don't have 0.14 lb
-                    # Unfortunately we have to repeat it once for every different situation
-                    conv_amount, conv_unit = simplify_units(
-                        conv_amount, conv_unit)
-                # Except occurs if it's not a , but something else
-                # such as - as in 2-3
-                except:
-                    # Therefore we are preserving the two digits as separate entities
-                    # But otherwise doing the same action
-                    # This regex should capture both 1-2 and 1.2-5.2
-                    digits = re.findall(
-                        '(\d+[,\.\/]?\d*)(\D)(\d+[,\.\/]?\d*)', amount_punctuation_replaced)[0]
-                    # So we split them up into two digits
-                    first_digit = round((float(
-                        digits[0]) * unit_conversions[unit_lower][0]) + unit_conversions[unit_lower][1], 2)
-                    second_digit = round((float(
-                        digits[2]) * unit_conversions[unit_lower][0]) + unit_conversions[unit_lower][1], 2)
-                    _first_digit, first_conv_unit = simplify_units(
-                        first_digit, conv_unit)
-                    _second_digit, second_conv_unit = simplify_units(
-                        second_digit, conv_unit)
-                    # In the rare circumstance that simplify_units will give different units
-                    # for a range, we ignore the converison but must dot zero it manually
-                    # because simplify_units does it usually
-                    if first_conv_unit == second_conv_unit:
-                        first_digit = _first_digit
-                        second_digit = _second_digit
-                        conv_unit = first_conv_unit  # Whichever of the two
-                    else:
-                        if float_dot_zero(first_digit):
-                            first_digit = int(first_digit)
-                        if float_dot_zero(second_digit):
-                            second_digit = int(second_digit)
-                    conv_amount = f"{first_digit}{digits[1]}{second_digit}"
-                    # In this case, we are giving the
-                    # average of the numbers; this could be improved
-
-                # Now that we've done the conversions, we need to replace the original text
-                # with the converted, so we're making a string to find the original and do this
-
-                # Forming the string:
-                # N.B. Sometimes we need to replace 1,5 l and sometimes 1,5l
-                # group[1] will always be either a space or not - for what we need
-                replaced_seq = f"{group[0]}{group[1]}{group[2]}"
-                replacing_seq = f"{conv_amount}{group[1]}{conv_unit}"
-                return_string = return_string.replace(
-                    replaced_seq, replacing_seq)
-
-                # It seems to be only with temperature, but sometimes we get both degrees and
-                # a unit marking. Hence the need for this line
-                if return_string.find("° C "):
-                    return_string = return_string.replace("° C ", "° F ")
-            else:
-                # There is ONE circumstance where the regex makes an error
-                # If there is something like "180° per", where 180° gets caught up
-                # as group[0], where an easier solution is to recurse and see if
-                # the recursion produced a different route
-                # I would be more cautious about this except this method isn't too costly
-                _prep = convert_units_prep(group[0])
-                # This line is somewhat superfluous -- any change will trigger it, even if it
-                # isn't correct -- but I think it elucidates the logic
-                if prep != prep.replace(group[0], _prep):
-                    return_string = return_string.replace(group[0], _prep)
-    return return_string
+    return _converter.convert_text(prep)
 
 
 def simplify_units(quantity: Union[int, float], unit: str) -> Tuple[Union[int, float], str]:
@@ -309,7 +534,5 @@ def float_dot_zero(qt: float) -> bool:
     Returns:
         bool: if the float ends in .0
     """
-    if isinstance(qt, float):
-        return str(qt).endswith('.0')
-    else:
-        return False
+    # str(qt) would end in .0 for a whole float, but it's written with an exponent from 1e16 (1e+16)
+    return isinstance(qt, float) and qt.is_integer() and abs(qt) < 1e16
@@ -1,3 +1,4 @@
+import re
 import setuptools
 
 requirements = []
@@ -8,9 +9,13 @@ with open("requirements.txt", "r") as fh:
 with open("README.md", "r") as fh:
     long_description = fh.read()
 
+# The version lives in the package so the recipe cache can tell which version made a recipe
+with open("r2api/version.py", "r") as fh:
+    version = re.search(r'__version__ = "(.+)"', fh.read()).group(1)
+
 setuptools.setup(
     name="r2api",
-    version="0.2.1",
+    version=version,
     author="Benyakir Horowitz",
     author_email="benyakir.horowitz@gmail.com",
     description="A small package to translate an Italian recipe and its units into English and imperial units using Google Translate",
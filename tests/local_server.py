@@ -0,0 +1,53 @@
+"""The local HTTP server the tests that fetch pages run against, and a helper to run a coroutine"""
+import os
+import asyncio
+import posixpath
+import threading
+import unittest
+import urllib.parse
+from http.server import HTTPServer, BaseHTTPRequestHandler, SimpleHTTPRequestHandler
+from socketserver import ThreadingMixIn
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_soups = os.path.join(file_path, "soups")
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """A request handler that doesn't log every request to stderr"""
+    def log_message(self, format, *args):
+        pass
+
+class SoupHandler(SimpleHTTPRequestHandler):
+    """Serves the files in tests/soups whatever the working directory (SimpleHTTPRequestHandler's directory needs Python 3.7)"""
+    def translate_path(self, path):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(path).path)
+        return os.path.join(path_to_soups, posixpath.basename(path))
+
+    def log_message(self, format, *args):
+        pass
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+class LocalServerTestCase(unittest.TestCase):
+    """Runs a server with the class's handler on a random local port while its tests run, at base_url"""
+    handler = SoupHandler
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingServer(('127.0.0.1', 0), cls.handler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+def run(coroutine):
+    """Runs the coroutine on a new event loop (asyncio.run needs Python 3.7)"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
@@ -0,0 +1,106 @@
+import sys
+import os
+import random
+import re
+import time
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.utilities.unit_conversion as uc
+import r2api.converter.giallo_zafferano as gz
+
+# The pattern convert_units_prep used before it was made linear, only ever used here on short texts
+OLD_TEXT_PATTERN = re.compile(r'(\d+[,\.\/]?\d*[a-zA-Z°]*[\/\-x]?\d*[,\.\/]?\d*)(\s?)([a-zA-Z°]+)(?:(?<=°)( C)(?= ))?')
+
+# Texts that make a backtracking regex crawl: long runs of digits with nothing after them,
+# runs of letters, separators and spaces, and the sort of thing inline base64 or tracking strings are made of
+ADVERSARIAL = (
+    ('digits', lambda n: '1' * n),
+    ('digits then a letter', lambda n: '1' * n + 'a'),
+    ('digits then a space', lambda n: '1' * n + ' '),
+    ('a digit then letters', lambda n: '1' + 'a' * n),
+    ('a digit then letters then a digit', lambda n: '1' + 'a' * n + '1'),
+    ('digits, letters and digits', lambda n: '1' * n + 'g' * n + '1' * n + ' x'),
+    ('separated digits', lambda n: '1,' * n),
+    ('fractions', lambda n: '1/' * n),
+    ('ranges', lambda n: '1-' * n),
+    ('times', lambda n: '1x' * n),
+    ('degrees', lambda n: '1°' * n),
+    ('grams', lambda n: '1g' * n),
+    ('spaced digits', lambda n: '1 ' * n),
+    ('digits and separators', lambda n: ('1' * 50 + '.') * (n // 50)),
+    ('brackets', lambda n: '(' * n),
+    ('unclosed bracket', lambda n: '(' + 'a' * n),
+    ('closing brackets', lambda n: '(' + ')' * n),
+    ('base64', lambda n: ''.join(random.Random(n).choice('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/') for _ in range(n))),
+)
+
+# What each one is run through
+FUNCTIONS = (
+    ('convert_units_prep', uc.convert_units_prep),
+    ('convert_units_name', uc.convert_units_name),
+    ('GZConverter quantity and unit', gz._QUANTITY_UNIT_PATTERN.search),
+)
+
+# A few hundred digits used to take minutes, these are tens of thousands in well under the limit
+SIZE = 20000
+TIME_LIMIT = 2.0
+
+def timed(function, text: str) -> float:
+    start = time.perf_counter()
+    function(text)
+    return time.perf_counter() - start
+
+class Linear(unittest.TestCase):
+    def test_time_limit(self):
+        """Every adversarial text should be gone through within the time limit"""
+        for name, make in ADVERSARIAL:
+            text = make(SIZE)
+            for function_name, function in FUNCTIONS:
+                self.assertLess(timed(function, text), TIME_LIMIT, f"{function_name} on {name}")
+
+    def test_nested_units(self):
+        """A long run of unknown units after a number shouldn't be gone over once per letter (or hit the recursion limit)"""
+        text = '1' + 'ab' * SIZE + ' '
+        self.assertLess(timed(uc.convert_units_prep, text), TIME_LIMIT)
+        self.assertEqual(uc.convert_units_prep(text), text)
+
+    def test_still_converts(self):
+        """A unit after a long run of digits should still be converted"""
+        self.assertEqual(uc.convert_units_prep('a' * SIZE + ' 300g'), 'a' * SIZE + f" {round(300 * .00220462, 2) * 16}oz")
+
+class Fuzz(unittest.TestCase):
+    alphabet = '0123456789,./-x °Cgcmlaper'
+
+    def texts(self, count: int, length: int):
+        generator = random.Random(0)
+        for _ in range(count):
+            yield ''.join(generator.choice(self.alphabet) for _ in range(generator.randint(1, length)))
+
+    def test_same_matches(self):
+        """The linear pattern should match exactly what the old pattern matched"""
+        for text in self.texts(5000, 14):
+            old = [(match.span(), match.groups()) for match in OLD_TEXT_PATTERN.finditer(text)]
+            new = [(match.span(), match.group('amount', 'space', 'unit', 'celsius')) for match in uc._TEXT_PATTERN.finditer(text)]
+            self.assertEqual(old, new, text)
+
+    def test_no_errors(self):
+        """Any text should be converted to a string, never raise (i.e. 1/1/ cm isn't a number or a range)"""
+        for text in self.texts(5000, 30):
+            self.assertIsInstance(uc.convert_units_prep(text), str, text)
+            self.assertIsInstance(uc.convert_units_name(text), str, text)
+        self.assertEqual(uc.convert_units_prep('1/1/ cm'), '1/1/ cm')
+
+@unittest.skipUnless(os.environ.get('R2API_BENCHMARKS'), "set R2API_BENCHMARKS=1 to run the benchmarks")
+class Benchmark(unittest.TestCase):
+    def test_sizes(self):
+        """The time of each adversarial text as it gets longer, which should grow linearly"""
+        size = int(os.environ.get('R2API_BENCHMARK_PAGES', 100)) * 1000
+        print()
+        for name, make in ADVERSARIAL:
+            times = [timed(uc.convert_units_prep, make(n)) for n in (size // 4, size // 2, size)]
+            print(f"{name}: " + ', '.join(f"{n} {seconds * 1000:.1f}ms" for n, seconds in zip((size // 4, size // 2, size), times)))
+
+if __name__ == '__main__':
+    unittest.main()
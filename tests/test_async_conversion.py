@@ -0,0 +1,91 @@
+import sys
+import os
+import json
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.batch.async_conversion as ac
+import r2api.fetch.cache as fc
+import r2api.converter.giallo_zafferano as gz
+import r2api.converter.molliche_di_zucchero as mz
+from local_server import LocalServerTestCase, run
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_gz_json = os.path.join(file_path, "recipes/GZRecipe.json")
+path_to_mz_json = os.path.join(file_path, "recipes/MZRecipe.json")
+
+with open(path_to_gz_json, 'r') as f:
+    gz_json = json.load(f)
+with open(path_to_mz_json, 'r') as f:
+    mz_json = json.load(f)
+
+async def collect(async_iterator):
+    return [item async for item in async_iterator]
+
+class KnownValues(LocalServerTestCase):
+    def test_aconvert(self):
+        """aconvert should give the same recipe as the synchronous converter"""
+        converter = run(ac.aconvert(f"{self.base_url}/GZSoup.html", gz.GZConverter))
+        self.assertIsInstance(converter, gz.GZConverter)
+        self.assertEqual(converter['ingredients'], gz_json['ingredients'])
+        self.assertEqual(converter['preparation'], gz_json['preparation'])
+
+    def test_aconvert_many(self):
+        """aconvert_many should give one result per url"""
+        urls = [f"{self.base_url}/MZSoup.html"] * 6
+        results = run(collect(ac.aconvert_many(urls, mz.MZConverter, concurrency=2)))
+        self.assertEqual(len(results), 6)
+        for result in results:
+            self.assertTrue(result.ok)
+            self.assertEqual(result.recipe['ingredients'], mz_json['ingredients'])
+
+    def test_aiohttp_cache_off_loop(self):
+        """With an aiohttp session, the (sqlite) cache should be used in the executor, not on the event loop"""
+        try:
+            import aiohttp
+        except ImportError:
+            self.skipTest("aiohttp isn't installed")
+        threads = []
+
+        class RecordingCache(fc.ResponseCache):
+            def get(self, url):
+                threads.append(threading.get_ident())
+                return super().get(url)
+
+            def put(self, url, content, **kwargs):
+                threads.append(threading.get_ident())
+                return super().put(url, content, **kwargs)
+
+        async def fetch_twice(cache):
+            async with aiohttp.ClientSession() as session:
+                first = await ac.afetch(f"{self.base_url}/GZSoup.html", gz.GZConverter, session=session, cache=cache)
+                second = await ac.afetch(f"{self.base_url}/GZSoup.html", gz.GZConverter, session=session, cache=cache)
+            return threading.get_ident(), first, second
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RecordingCache(os.path.join(directory, 'responses.sqlite'), revalidate=False)
+            loop_thread, first, second = run(fetch_twice(cache))
+            cache.close()
+        self.assertEqual(first, second)
+        # get, put, then get again
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(loop_thread, threads)
+
+class IncorrectInput(LocalServerTestCase):
+    def test_errors_per_url(self):
+        """An error on one url should be captured in its result and not stop the batch"""
+        urls = [f"{self.base_url}/GZSoup.html", f"{self.base_url}/FCSoup.html"]
+        results = run(collect(ac.aconvert_many(urls, gz.GZConverter)))
+        results = {result.url: result for result in results}
+        self.assertTrue(results[urls[0]].ok)
+        self.assertFalse(results[urls[1]].ok)
+
+    def test_bad_concurrency(self):
+        """aconvert_many should raise a ValueError if concurrency is less than 1"""
+        self.assertRaises(ValueError, run, collect(ac.aconvert_many([], gz.GZConverter, concurrency=0)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import sys
+import os
+import json
+import queue
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.batch.batch_conversion as bc
+import r2api.converter.giallo_zafferano as gz
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_soup = os.path.join(file_path, "soups/GZSoup.html")
+path_to_json = os.path.join(file_path, "recipes/GZRecipe.json")
+
+path_to_wrong_soup = os.path.join(file_path, "soups/FCSoup.html")
+path_to_missing_soup = os.path.join(file_path, "soups/DoesNotExist.html")
+
+with open(path_to_json, 'r') as f:
+    gz_json = json.load(f)
+
+class KnownValues(unittest.TestCase):
+    def test_results_per_url(self):
+        """convert_many should give one result per url, with the same recipe as the converter"""
+        urls = [path_to_soup] * 5
+        results = list(bc.convert_many(urls, gz.GZConverter, max_workers=3, read_from_file=True))
+        self.assertEqual(len(results), 5)
+        for result in results:
+            self.assertTrue(result.ok)
+            self.assertEqual(result.url, path_to_soup)
+            self.assertEqual(result.recipe['ingredients'], gz_json['ingredients'])
+
+    def test_generator_input(self):
+        """convert_many should accept a generator of urls larger than the pool"""
+        urls = (path_to_soup for _ in range(10))
+        results = list(bc.convert_many(urls, gz.GZConverter, max_workers=2, read_from_file=True))
+        self.assertEqual(len(results), 10)
+
+    def test_queue_input(self):
+        """With a queue, a finished result shouldn't wait for the next url to be put in it"""
+        urls = queue.Queue()
+        urls.put(path_to_soup)
+        results = bc.convert_many(urls, gz.GZConverter, max_workers=2, read_from_file=True)
+        # Nothing else is in the queue, so this would block forever if it waited for a url before yielding
+        self.assertTrue(next(results).ok)
+        urls.put(path_to_soup)
+        self.assertTrue(next(results).ok)
+        urls.put(None)
+        self.assertEqual(list(results), [])
+
+class IncorrectInput(unittest.TestCase):
+    def test_errors_per_url(self):
+        """An error on one url should be captured in its result and not stop the batch"""
+        urls = [path_to_soup, path_to_wrong_soup, path_to_missing_soup, path_to_soup]
+        results = list(bc.convert_many(urls, gz.GZConverter, max_workers=2, read_from_file=True))
+        self.assertEqual(len(results), 4)
+        by_url = {}
+        for result in results:
+            by_url.setdefault(result.url, []).append(result)
+        self.assertTrue(all(r.ok for r in by_url[path_to_soup]))
+        self.assertIsNone(by_url[path_to_wrong_soup][0].recipe)
+        self.assertIsInstance(by_url[path_to_missing_soup][0].error, FileNotFoundError)
+
+    def test_bad_max_workers(self):
+        """convert_many should raise a ValueError if max_workers is less than 1"""
+        self.assertRaises(ValueError, list, bc.convert_many([path_to_soup], gz.GZConverter, max_workers=0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import sys
+import os
+import json
+import math
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.export.columnar as co
+import r2api.batch.batch_conversion as bc
+import r2api.converter.recipe as rt
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_gz_json = os.path.join(file_path, "recipes/GZRecipe.json")
+path_to_rm_json = os.path.join(file_path, "recipes/RMRecipe1.json")
+
+with open(path_to_gz_json, 'r') as f:
+    gz_json = json.load(f)
+with open(path_to_rm_json, 'r') as f:
+    rm_json = json.load(f)
+
+gz_url = "https://ricette.giallozafferano.it/Zuppa-di-ceci.html"
+rm_url = "https://blog.giallozafferano.it/primipiattiricette/ricetta/"
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+def table() -> co.IngredientTable:
+    return co.IngredientTable([
+        bc.BatchResult(gz_url, rt.Recipe.from_dict(gz_json), None),
+        bc.BatchResult("https://example.com", None, ValueError()),
+        (rm_url, rm_json),
+    ])
+
+class QuantityValues(unittest.TestCase):
+    def test_numeric_quantity(self):
+        """Numbers, decimal commas and fractions should be numbers, anything else NaN"""
+        known_values = (
+            (300, 300.0),
+            (10.56, 10.56),
+            ('2', 2.0),
+            ('1,5', 1.5),
+            ('1/2', 0.5),
+            ('1 1/2', 1.5),
+            ('½', 0.5),
+        )
+        for quantity, number in known_values:
+            self.assertEqual(co.numeric_quantity(quantity), number, quantity)
+        for quantity in ('to taste', 'q.b.', 'n/a', '5 o 6', '1/0', '', None, True):
+            self.assertTrue(math.isnan(co.numeric_quantity(quantity)), quantity)
+
+    def test_to_taste(self):
+        """An ingredient is to taste if its quantity or its unit says so"""
+        self.assertTrue(co.is_to_taste('q.b.', 'n/a'))
+        self.assertTrue(co.is_to_taste('n/a', 'to taste'))
+        self.assertTrue(co.is_to_taste('A piacere', ''))
+        self.assertFalse(co.is_to_taste(300, 'g'))
+
+class TableValues(unittest.TestCase):
+    def test_rows(self):
+        """Every ingredient of the recipes without an error should be a row"""
+        ingredients = table()
+        self.assertEqual(len(ingredients), len(gz_json['ingredients']) + len(rm_json['ingredients']))
+        self.assertEqual(ingredients.recipe_urls, [gz_url, rm_url])
+        self.assertEqual(ingredients.recipe_names, [gz_json['name'], rm_json['name']])
+        columns = ingredients.to_columns()
+        self.assertEqual(set(columns), {'recipe_id', 'name', 'quantity', 'unit', 'to_taste'})
+        self.assertEqual(columns['recipe_id'].typecode, 'q')
+        self.assertEqual(columns['quantity'].typecode, 'd')
+
+        for row, (name, quantity, unit) in enumerate(gz_json['ingredients']):
+            self.assertEqual(columns['recipe_id'][row], 0)
+            self.assertEqual(columns['name'][row], name)
+            self.assertEqual(columns['unit'][row], unit)
+            self.assertEqual(bool(columns['to_taste'][row]), co.is_to_taste(quantity, unit))
+            if not isinstance(quantity, str):
+                self.assertEqual(columns['quantity'][row], quantity)
+        self.assertEqual(columns['recipe_id'][-1], 1)
+
+    def test_units(self):
+        """Each unit should be stored once"""
+        ingredients = table()
+        self.assertEqual(len(ingredients.units), len(set(ingredients.units)))
+        self.assertEqual(len(ingredients.unit_code), len(ingredients))
+
+    def test_empty(self):
+        """An empty table should have empty columns"""
+        ingredients = co.IngredientTable()
+        self.assertEqual(len(ingredients), 0)
+        self.assertEqual(ingredients.to_columns()['unit'], [])
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_numpy(self):
+        """The NumPy columns should be typed and match the table"""
+        ingredients = table()
+        columns = ingredients.to_numpy()
+        self.assertEqual(columns['recipe_id'].dtype, numpy.int64)
+        self.assertEqual(columns['quantity'].dtype, numpy.float64)
+        self.assertEqual(columns['to_taste'].dtype, bool)
+        self.assertEqual(list(columns['unit']), ingredients.unit)
+        self.assertEqual(int(columns['to_taste'].sum()), sum(ingredients.to_taste))
+        # The table can still be added to
+        ingredients.add(gz_json)
+        self.assertEqual(len(co.IngredientTable().to_numpy()['quantity']), 0)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_arrow(self):
+        """The Arrow table should hold the same columns as the table, and be written to Parquet as it is"""
+        ingredients = table()
+        arrow = ingredients.to_arrow()
+        self.assertEqual(arrow.num_rows, len(ingredients))
+        self.check_arrow(arrow, ingredients)
+        self.assertEqual(ingredients.recipes_to_arrow().column('url').to_pylist(), [gz_url, rm_url])
+        directory = tempfile.mkdtemp()
+        try:
+            ingredients.write_parquet(os.path.join(directory, 'ingredients.parquet'), os.path.join(directory, 'recipes.parquet'))
+            import pyarrow.parquet
+            self.check_arrow(pyarrow.parquet.read_table(os.path.join(directory, 'ingredients.parquet')), ingredients)
+            recipes = pyarrow.parquet.read_table(os.path.join(directory, 'recipes.parquet'))
+            self.assertEqual(recipes.column('recipe_id').to_pylist(), [0, 1])
+            self.assertEqual(recipes.column('url').to_pylist(), [gz_url, rm_url])
+            self.assertEqual(recipes.column('name').to_pylist(), [gz_json['name'], rm_json['name']])
+        finally:
+            shutil.rmtree(directory)
+
+    def check_arrow(self, arrow, ingredients):
+        columns = ingredients.to_columns()
+        self.assertEqual(arrow.column('recipe_id').to_pylist(), list(columns['recipe_id']))
+        self.assertEqual(arrow.column('name').to_pylist(), columns['name'])
+        self.assertEqual(arrow.column('unit').to_pylist(), columns['unit'])
+        self.assertEqual(arrow.column('to_taste').to_pylist(), [bool(value) for value in columns['to_taste']])
+        # NaN isn't equal to itself, so the quantities are compared as text
+        self.assertEqual([repr(value) for value in arrow.column('quantity').to_pylist()], [repr(value) for value in columns['quantity']])
+        self.assertIn(True, arrow.column('to_taste').to_pylist())
+        self.assertIn('nan', [repr(value) for value in arrow.column('quantity').to_pylist()])
+
+    @unittest.skipIf(numpy is not None, "numpy is installed")
+    def test_missing_numpy(self):
+        """Without numpy installed, to_numpy should raise an ImportError"""
+        self.assertRaises(ImportError, table().to_numpy)
+
+    @unittest.skipIf(pyarrow is not None, "pyarrow is installed")
+    def test_missing_pyarrow(self):
+        """Without pyarrow installed, to_arrow should raise an ImportError"""
+        self.assertRaises(ImportError, table().to_arrow)
+
+if __name__ == '__main__':
+    unittest.main()
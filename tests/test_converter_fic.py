@@ -45,6 +45,17 @@ class KnownValues(unittest.TestCase):
                     parsed_ing[idx][0] = parsed_ing[idx][0].replace(find, '')
             self.assertEqual(fic_json['ingredients'][idx], parsed_ing[idx])
 
+    def test_raw_quantities(self):
+        """Without convert_units, the quantities should stay as they were written"""
+        ingredient_soup = bs4.BeautifulSoup(
+            '<li class="wpurp-recipe-ingredient"><span class="wpurp-recipe-ingredient-quantity">½</span>'
+            '<span class="wpurp-recipe-ingredient-unit">cucchiaino</span><span class="wpurp-recipe-ingredient-name">Sale</span></li>'
+            '<li class="wpurp-recipe-ingredient"><span class="wpurp-recipe-ingredient-quantity">300</span>'
+            '<span class="wpurp-recipe-ingredient-unit">g</span><span class="wpurp-recipe-ingredient-name">Farina</span></li>',
+            'html.parser'
+        )
+        self.assertEqual(fcc.get_ingredients(ingredient_soup, convert_units=False), [['Sale', '½', 'cucchiaino'], ['Farina', '300', 'g']])
+
     def test_preparation_identification(self):
         """get_preparation should give known results for known values"""
         parsed_prep = fcc.get_preparation(soup)
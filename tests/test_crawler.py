@@ -0,0 +1,172 @@
+import sys
+import os
+import gzip
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.crawl.bloom as bloom
+import r2api.crawl.crawler as crawler
+import r2api.converter.giallo_zafferano as gz
+import r2api.converter.registry as registry
+from local_server import LocalServerTestCase, QuietHandler
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_soup = os.path.join(file_path, "soups/GZSoup.html")
+
+with open(path_to_soup, 'rb') as f:
+    gz_page = f.read()
+
+class LocalGZConverter(gz.GZConverter):
+    """The GZConverter for the recipes on the local server"""
+    recipe_url_pattern = r'^http://127\.0\.0\.1:\d+/recipes/[\w-]+\.html$'
+    listing_url_pattern = r'^http://127\.0\.0\.1:\d+/category/\w+$'
+
+def links(*hrefs):
+    return ('<html><body>' + ''.join(f'<a href="{href}">link</a>' for href in hrefs) + '</body></html>').encode()
+
+class SiteHandler(QuietHandler):
+    """A small site: robots.txt points to a sitemap index, which points to a gzipped sitemap, which lists recipes and a category"""
+    requested = []
+    # Recipes added to the secondi category, to find them on a later crawl
+    added = []
+
+    def do_GET(self):
+        base = f"http://{self.headers['Host']}"
+        SiteHandler.requested.append(self.path)
+        pages = {
+            '/robots.txt': f"User-agent: *\nDisallow: /admin\nSitemap: {base}/sitemap_index.xml\n".encode(),
+            '/sitemap_index.xml': (
+                '<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f'<sitemap><loc>{base}/sitemap-1.xml.gz</loc></sitemap></sitemapindex>'
+            ).encode(),
+            '/sitemap-1.xml.gz': gzip.compress((
+                '<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f'<url><loc>{base}/recipes/a.html</loc></url><url><loc>{base}/recipes/b.html</loc></url>'
+                f'<url><loc>{base}/category/primi</loc></url></urlset>'
+            ).encode()),
+            '/category/primi': links('/recipes/b.html', '../recipes/c.html#comments', '/category/secondi', 'https://example.com/recipes/x.html', '/about', 'mailto:someone@example.com'),
+            '/category/secondi': links('/recipes/d.html', '/category/primi', '/recipes/missing.html', *SiteHandler.added),
+        }
+        if self.path in pages:
+            body = pages[self.path]
+        elif self.path.startswith('/recipes/') and self.path != '/recipes/missing.html':
+            body = gz_page
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class CrawlerTestCase(LocalServerTestCase):
+    handler = SiteHandler
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        registry.register_converter('127.0.0.1', LocalGZConverter)
+
+    @classmethod
+    def tearDownClass(cls):
+        registry.unregister_converter('127.0.0.1')
+        super().tearDownClass()
+
+    def setUp(self):
+        SiteHandler.requested = []
+        SiteHandler.added = []
+
+    def recipe(self, name: str) -> str:
+        return f"{self.base_url}/recipes/{name}.html"
+
+class KnownValues(CrawlerTestCase):
+    def test_crawl(self):
+        """Every recipe should be found once, through the sitemaps and the categories"""
+        urls = list(crawler.crawl([f"{self.base_url}/"], converters=[LocalGZConverter]))
+        self.assertEqual(urls, [self.recipe(name) for name in ('a', 'b', 'c', 'd', 'missing')])
+        # Every page is fetched once, the recipes aren't fetched at all
+        self.assertEqual(sorted(SiteHandler.requested), sorted([
+            '/robots.txt', '/', '/sitemap_index.xml', '/sitemap-1.xml.gz', '/category/primi', '/category/secondi'
+        ]))
+
+    def test_without_listings(self):
+        """Without following the listings, only the recipes in the sitemaps should be found"""
+        urls = list(crawler.crawl([f"{self.base_url}/"], converters=[LocalGZConverter], follow_listings=False))
+        self.assertEqual(urls, [self.recipe('a'), self.recipe('b')])
+
+    def test_without_sitemaps(self):
+        """Without the sitemaps, only the recipes linked from the seed and its listings should be found"""
+        urls = list(crawler.crawl([f"{self.base_url}/category/primi"], converters=[LocalGZConverter], use_sitemaps=False))
+        self.assertEqual(urls, [self.recipe(name) for name in ('b', 'c', 'd', 'missing')])
+
+    def test_max_pages(self):
+        """No more than max_pages pages should be fetched"""
+        list(crawler.crawl([f"{self.base_url}/category/primi"], converters=[LocalGZConverter], use_sitemaps=False, max_pages=1))
+        self.assertEqual(SiteHandler.requested, ['/category/primi'])
+
+    def test_seen(self):
+        """Crawling again with the same filter should only find the recipes added since, walking the same pages again"""
+        seen = bloom.BloomFilter(capacity=1000)
+        self.assertEqual(len(list(crawler.crawl([f"{self.base_url}/"], converters=[LocalGZConverter], seen=seen))), 5)
+        SiteHandler.requested = []
+        SiteHandler.added = ['/recipes/e.html']
+        self.assertEqual(list(crawler.crawl([f"{self.base_url}/"], converters=[LocalGZConverter], seen=seen)), [self.recipe('e')])
+        self.assertIn('/category/secondi', SiteHandler.requested)
+        self.assertEqual(list(crawler.crawl([f"{self.base_url}/"], converters=[LocalGZConverter], seen=seen)), [])
+
+    def test_crawl_and_convert(self):
+        """The recipes found should be converted as they're found, with an error for the one that can't be"""
+        results = {result.url: result for result in crawler.crawl_and_convert(
+            [f"{self.base_url}/"], converters=[LocalGZConverter], queue_size=1, max_workers=2)}
+        self.assertEqual(set(results), {self.recipe(name) for name in ('a', 'b', 'c', 'd', 'missing')})
+        self.assertFalse(results[self.recipe('missing')].ok)
+        expected = gz.GZConverter(path_to_soup, read_from_file=True).recipe
+        for name in ('a', 'b', 'c', 'd'):
+            self.assertEqual(results[self.recipe(name)].recipe, expected)
+
+    def test_stop_early(self):
+        """Closing the results early should stop the crawl"""
+        results = crawler.crawl_and_convert([f"{self.base_url}/"], converters=[LocalGZConverter], queue_size=1, max_workers=1)
+        self.assertTrue(next(results).url.startswith(self.base_url))
+        results.close()
+
+class KnownQualities(unittest.TestCase):
+    def test_bloom_filter(self):
+        """Everything added should be in the filter and the false positives should be around the error rate"""
+        seen = bloom.BloomFilter(capacity=10000, error_rate=0.01)
+        added = [f"https://example.com/{i}" for i in range(10000)]
+        self.assertTrue(all(seen.add(url) for url in added[:10]))
+        for url in added:
+            seen.add(url)
+        self.assertTrue(all(url in seen for url in added))
+        self.assertFalse(seen.add(added[0]))
+        false_positives = sum(f"https://example.org/{i}" in seen for i in range(10000))
+        self.assertLess(false_positives, 300)
+        self.assertGreater(len(seen), 9800)
+
+    def test_default_converters(self):
+        """Every supported site should be crawled by default and have seeds and a recipe pattern"""
+        for converter in crawler.default_converters():
+            with self.subTest(converter=converter.__name__):
+                self.assertTrue(converter.crawl_seeds)
+                self.assertTrue(converter.recipe_url_pattern)
+        sites = [crawler._Site(converter) for converter in crawler.default_converters()]
+        self.assertEqual(crawler._classify(sites, "https://ricette.giallozafferano.it/Zuppa-di-ceci.html"), 'recipe')
+        self.assertEqual(crawler._classify(sites, "https://www.fattoincasadabenedetta.it/ricetta/riso-al-latte-al-forno/"), 'recipe')
+        self.assertEqual(crawler._classify(sites, "https://blog.giallozafferano.it/mollichedizucchero/torta-sofficissima/"), 'recipe')
+        self.assertEqual(crawler._classify(sites, "https://blog.giallozafferano.it/mollichedizucchero/category/dolci/"), 'listing')
+        self.assertEqual(crawler._classify(sites, "https://www.giallozafferano.it/ricette-cat/Primi/"), 'listing')
+        self.assertIsNone(crawler._classify(sites, "https://blog.giallozafferano.it/someoneelse/torta/"))
+
+class IncorrectInput(unittest.TestCase):
+    def test_bad_settings(self):
+        """Bad settings should raise a ValueError"""
+        self.assertRaises(ValueError, bloom.BloomFilter, capacity=0)
+        self.assertRaises(ValueError, bloom.BloomFilter, error_rate=1)
+        self.assertRaises(ValueError, next, crawler.crawl_and_convert([], queue_size=0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.fetch.cache as fc
+import r2api.fetch.session as fs
+import r2api.converter.giallo_zafferano as gz
+from local_server import LocalServerTestCase, QuietHandler
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_soup = os.path.join(file_path, "soups/GZSoup.html")
+path_to_json = os.path.join(file_path, "recipes/GZRecipe.json")
+
+with open(path_to_soup, 'rb') as f:
+    gz_soup = f.read()
+with open(path_to_json, 'r') as f:
+    gz_json = json.load(f)
+
+class ConditionalHandler(QuietHandler):
+    """Serves the GZ soup with an ETag (and /dated with a Last-Modified) and answers 304 if it hasn't changed"""
+    protocol_version = 'HTTP/1.1'
+    statuses = []
+    validators = []
+    etag = '"v1"'
+    last_modified = 'Wed, 21 Oct 2015 07:28:00 GMT'
+
+    def do_GET(self):
+        ConditionalHandler.validators.append(self.headers.get('If-None-Match'))
+        if self.path == '/dated':
+            not_modified = self.headers.get('If-Modified-Since') == self.last_modified
+            validator = ('Last-Modified', self.last_modified)
+        elif self.path == '/rotating':
+            # Answers 304 to either ETag, with the new one
+            not_modified = self.headers.get('If-None-Match') in (self.etag, '"v2"')
+            validator = ('ETag', '"v2"' if not_modified else self.etag)
+        else:
+            not_modified = self.headers.get('If-None-Match') == self.etag
+            validator = ('ETag', self.etag)
+        if not_modified:
+            ConditionalHandler.statuses.append(304)
+            self.send_response(304)
+            if self.path == '/rotating':
+                self.send_header(*validator)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        ConditionalHandler.statuses.append(200)
+        self.send_response(200)
+        self.send_header(*validator)
+        self.send_header('Content-Length', str(len(gz_soup)))
+        self.end_headers()
+        self.wfile.write(gz_soup)
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'responses.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+class KnownValues(LocalServerTestCase, CacheTestCase):
+    handler = ConditionalHandler
+
+    def setUp(self):
+        super().setUp()
+        ConditionalHandler.statuses = []
+        ConditionalHandler.validators = []
+
+    def test_etag_revalidation(self):
+        """A cached page should be revalidated with If-None-Match and reused on a 304"""
+        cache = fc.ResponseCache(self.path)
+        url = f"{self.base_url}/recipe"
+        self.assertEqual(fs.fetch(url, cache=cache), gz_soup)
+        self.assertEqual(fs.fetch(url, cache=cache), gz_soup)
+        self.assertEqual(ConditionalHandler.statuses, [200, 304])
+        self.assertEqual(cache.get(url).etag, '"v1"')
+
+    def test_last_modified_revalidation(self):
+        """A cached page should be revalidated with If-Modified-Since and reused on a 304"""
+        cache = fc.ResponseCache(self.path)
+        url = f"{self.base_url}/dated"
+        fs.fetch(url, cache=cache)
+        self.assertEqual(fs.fetch(url, cache=cache), gz_soup)
+        self.assertEqual(ConditionalHandler.statuses, [200, 304])
+
+    def test_refreshed_validators(self):
+        """The validators sent with a 304 should replace the cached ones and be used for the next revalidation"""
+        cache = fc.ResponseCache(self.path)
+        url = f"{self.base_url}/rotating"
+        for _ in range(3):
+            self.assertEqual(fs.fetch(url, cache=cache), gz_soup)
+        self.assertEqual(ConditionalHandler.statuses, [200, 304, 304])
+        self.assertEqual(ConditionalHandler.validators, [None, '"v1"', '"v2"'])
+        self.assertEqual(cache.get(url), fc.CachedResponse(gz_soup, '"v2"', None))
+
+    def test_refresh(self):
+        """refresh should only replace the validators it's given"""
+        cache = fc.ResponseCache(self.path)
+        cache.put('a', b'page', etag='"v1"', last_modified='date')
+        cache.refresh('a', etag='"v2"')
+        self.assertEqual(cache.get('a'), fc.CachedResponse(b'page', '"v2"', 'date'))
+        cache.refresh('a')
+        self.assertEqual(cache.get('a'), fc.CachedResponse(b'page', '"v2"', 'date'))
+
+    def test_persistence(self):
+        """The cache should survive being closed and reopened"""
+        url = f"{self.base_url}/recipe"
+        cache = fc.ResponseCache(self.path)
+        fs.fetch(url, cache=cache)
+        cache.close()
+        converter = gz.GZConverter(url, cache=fc.ResponseCache(self.path))
+        self.assertEqual(converter['ingredients'], gz_json['ingredients'])
+        self.assertEqual(ConditionalHandler.statuses, [200, 304])
+
+    def test_no_revalidation(self):
+        """With revalidate=False, a cached page should be used without any request"""
+        url = f"{self.base_url}/recipe"
+        cache = fc.ResponseCache(self.path, revalidate=False)
+        fs.fetch(url, cache=cache)
+        fs.fetch(url, cache=cache)
+        self.assertEqual(ConditionalHandler.statuses, [200])
+
+class KnownQualities(CacheTestCase):
+    def test_lru_eviction(self):
+        """Once past max_bytes, the least recently used pages should be evicted"""
+        cache = fc.ResponseCache(self.path, max_bytes=25)
+        cache.put('a', b'0123456789')
+        cache.put('b', b'0123456789')
+        # Reading a makes b the least recently used
+        cache.get('a')
+        cache.put('c', b'0123456789')
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertLessEqual(cache.total_bytes(), 25)
+
+    def test_too_large(self):
+        """A page larger than max_bytes should not be cached"""
+        cache = fc.ResponseCache(self.path, max_bytes=5)
+        cache.put('a', b'0123456789')
+        self.assertEqual(len(cache), 0)
+
+    def test_conditional_headers(self):
+        """conditional_headers should only contain the validators that are known"""
+        self.assertEqual(fc.CachedResponse(b'', None, None).conditional_headers(), {})
+        self.assertEqual(
+            fc.CachedResponse(b'', '"x"', 'date').conditional_headers(),
+            {'If-None-Match': '"x"', 'If-Modified-Since': 'date'}
+        )
+
+class IncorrectInput(CacheTestCase):
+    def test_bad_max_bytes(self):
+        """ResponseCache should raise a ValueError if max_bytes is less than 1"""
+        self.assertRaises(ValueError, fc.ResponseCache, self.path, max_bytes=0)
+
+if __name__ == '__main__':
+    unittest.main()
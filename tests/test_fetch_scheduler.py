@@ -0,0 +1,181 @@
+import sys
+import os
+import time
+import threading
+import unittest
+import email.utils
+
+import requests
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.fetch.scheduler as sc
+import r2api.fetch.session as fs
+import r2api.batch.batch_conversion as bc
+import r2api.converter.giallo_zafferano as gz
+from local_server import LocalServerTestCase, QuietHandler
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_soup = os.path.join(file_path, "soups/GZSoup.html")
+
+with open(path_to_soup, 'rb') as f:
+    gz_page = f.read()
+
+class ThrottlingHandler(QuietHandler):
+    """/throttled answers 429 with a Retry-After of 1 second to every other request, everything else is the GZ soup"""
+    lock = threading.Lock()
+    throttled = 0
+    requests = []
+
+    def do_GET(self):
+        with ThrottlingHandler.lock:
+            ThrottlingHandler.requests.append((self.path, time.monotonic()))
+            throttle = self.path == '/throttled' and ThrottlingHandler.throttled % 2 == 0
+            if self.path == '/throttled':
+                ThrottlingHandler.throttled += 1
+        if throttle:
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '4')
+            self.end_headers()
+            self.wfile.write(b'slow')
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(gz_page)))
+        self.end_headers()
+        self.wfile.write(gz_page)
+
+class ThrottlingTestCase(LocalServerTestCase):
+    handler = ThrottlingHandler
+
+    def setUp(self):
+        ThrottlingHandler.throttled = 0
+        ThrottlingHandler.requests = []
+        # A session without retries, so the scheduler sees the 429s
+        self.session = requests.Session()
+
+    def tearDown(self):
+        self.session.close()
+
+class KnownValues(unittest.TestCase):
+    def test_token_bucket(self):
+        """A bucket should allow burst requests at once, then one every 1 / rate seconds"""
+        bucket = sc.TokenBucket(rate=10, burst=3)
+        now = bucket.updated
+        self.assertEqual([bucket.reserve(now) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(bucket.reserve(now), 0.1)
+        self.assertAlmostEqual(bucket.reserve(now), 0.2)
+        self.assertAlmostEqual(bucket.ready_in(now), 0.3)
+        # After a second it has refilled, but no more than burst
+        self.assertEqual(bucket.ready_in(now + 1), 0)
+        self.assertAlmostEqual(bucket.reserve(now + 10), 0)
+        self.assertAlmostEqual(bucket.tokens, 2)
+
+    def test_parse_retry_after(self):
+        """Retry-After should be read as seconds or as an HTTP date"""
+        self.assertEqual(sc.parse_retry_after('120'), 120)
+        in_a_minute = email.utils.formatdate(time.time() + 60, usegmt=True)
+        self.assertAlmostEqual(sc.parse_retry_after(in_a_minute), 60, delta=2)
+        self.assertEqual(sc.parse_retry_after(email.utils.formatdate(time.time() - 60, usegmt=True)), 0)
+        self.assertIsNone(sc.parse_retry_after(None))
+        self.assertIsNone(sc.parse_retry_after('soon'))
+
+    def test_hosts(self):
+        """Every host should have its own bucket, with its own rate if it has one"""
+        scheduler = sc.HostScheduler(rate=1, burst=2, host_rates={'blog.giallozafferano.it': (1, 1)})
+        self.assertEqual(scheduler.reserve("https://ricette.giallozafferano.it/1.html"), 0)
+        self.assertEqual(scheduler.reserve("https://ricette.giallozafferano.it/2.html"), 0)
+        self.assertGreater(scheduler.reserve("https://ricette.giallozafferano.it/3.html"), 0.9)
+        self.assertEqual(scheduler.reserve("https://blog.giallozafferano.it/mollichedizucchero/1/"), 0)
+        self.assertGreater(scheduler.reserve("https://blog.giallozafferano.it/allacciateilgrembiule/1/"), 0.9)
+        self.assertEqual(scheduler.reserve("https://www.fattoincasadabenedetta.it/ricetta/1/"), 0)
+
+    def test_throttled(self):
+        """A throttled host should be paused for its Retry-After or an exponential backoff, up to max_backoff"""
+        scheduler = sc.HostScheduler(backoff=1, max_backoff=5)
+        url = "https://ricette.giallozafferano.it/1.html"
+        self.assertEqual(scheduler.throttled(url), 1)
+        self.assertEqual(scheduler.throttled(url), 2)
+        self.assertEqual(scheduler.throttled(url), 4)
+        self.assertEqual(scheduler.throttled(url), 5)
+        self.assertGreater(scheduler.ready_in(url), 11)
+        self.assertEqual(scheduler.ready_in("https://blog.giallozafferano.it/1/"), 0)
+        scheduler.succeeded(url)
+        self.assertEqual(scheduler.throttled(url, 3), 3)
+        self.assertEqual(scheduler.throttled(url), 2)
+
+    def test_interleave(self):
+        """The urls should take turns by host, and a paused host should go last"""
+        scheduler = sc.HostScheduler(rate=100, burst=100)
+        urls = ["http://a/1", "http://a/2", "http://a/3", "http://b/1", "http://c/1", "http://b/2"]
+        self.assertEqual(list(scheduler.interleave(urls)), ["http://a/1", "http://b/1", "http://c/1", "http://a/2", "http://b/2", "http://a/3"])
+        scheduler.throttled("http://a/1", 10)
+        self.assertEqual(list(scheduler.interleave(urls)), ["http://b/1", "http://c/1", "http://b/2", "http://a/1", "http://a/2", "http://a/3"])
+        self.assertEqual(list(scheduler.interleave(urls, window=1)), urls)
+
+    def test_interleave_iterator(self):
+        """An iterator should be read ahead progressively, so the first url comes out as soon as it's read"""
+        scheduler = sc.HostScheduler(rate=100, burst=100)
+        read = []
+        def urls():
+            for url in ["http://a/1", "http://a/2", "http://a/3", "http://b/1", "http://c/1", "http://b/2"]:
+                read.append(url)
+                yield url
+        interleaved = scheduler.interleave(urls())
+        self.assertEqual(next(interleaved), "http://a/1")
+        self.assertEqual(read, ["http://a/1"])
+        self.assertEqual(sorted(interleaved), ["http://a/2", "http://a/3", "http://b/1", "http://b/2", "http://c/1"])
+        self.assertEqual(len(read), 6)
+
+class Fetching(ThrottlingTestCase):
+    def test_rate(self):
+        """Fetches to a host should be spaced by 1 / rate after the burst"""
+        scheduler = sc.HostScheduler(rate=10, burst=1)
+        for _ in range(4):
+            fs.fetch(f"{self.base_url}/page", session=self.session, scheduler=scheduler)
+        times = [sent for _, sent in ThrottlingHandler.requests]
+        self.assertGreaterEqual(times[-1] - times[0], 0.25)
+
+    def test_retry_after(self):
+        """A 429 should pause the host for its Retry-After and then be retried"""
+        scheduler = sc.HostScheduler(rate=100, burst=10)
+        start = time.monotonic()
+        content = fs.fetch(f"{self.base_url}/throttled", session=self.session, scheduler=scheduler)
+        self.assertEqual(content, gz_page)
+        self.assertGreaterEqual(time.monotonic() - start, 0.9)
+        self.assertEqual([path for path, _ in ThrottlingHandler.requests], ['/throttled', '/throttled'])
+
+    def test_shared_session(self):
+        """Without a session, a scheduled fetch should use a shared session that leaves the 429s to the scheduler"""
+        scheduler = sc.HostScheduler(rate=100, burst=10)
+        content = fs.fetch(f"{self.base_url}/throttled", scheduler=scheduler)
+        self.assertEqual(content, gz_page)
+        self.assertEqual(len(ThrottlingHandler.requests), 2)
+        self.assertIn(429, fs.get_session().get_adapter(self.base_url).max_retries.status_forcelist)
+        self.assertNotIn(429, fs.get_session(scheduled=True).get_adapter(self.base_url).max_retries.status_forcelist)
+        self.assertNotIn(503, fs.get_session(scheduled=True).get_adapter(self.base_url).max_retries.status_forcelist)
+
+    def test_no_retries(self):
+        """Once the retries are used up, the throttled response should be returned as it is"""
+        scheduler = sc.HostScheduler(max_retries=0)
+        self.assertEqual(fs.fetch(f"{self.base_url}/throttled", session=self.session, scheduler=scheduler), b'slow')
+
+    def test_convert_many(self):
+        """convert_many should pass the scheduler on to the converters"""
+        scheduler = sc.HostScheduler(rate=100, burst=10)
+        urls = [f"{self.base_url}/throttled", f"{self.base_url}/page"]
+        results = list(bc.convert_many(urls, gz.GZConverter, max_workers=2, session=self.session, scheduler=scheduler))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(len(ThrottlingHandler.requests), 3)
+
+class IncorrectInput(unittest.TestCase):
+    def test_bad_settings(self):
+        """Rates that aren't positive, bursts under 1 and negative retries should raise a ValueError"""
+        self.assertRaises(ValueError, sc.HostScheduler, rate=0)
+        self.assertRaises(ValueError, sc.HostScheduler, burst=0)
+        self.assertRaises(ValueError, sc.HostScheduler, max_retries=-1)
+        self.assertRaises(ValueError, sc.HostScheduler().set_host_rate, 'example.com', -1)
+        self.assertRaises(ValueError, list, sc.HostScheduler().interleave([], window=0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import sys
+import os
+import json
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.fetch.session as fs
+import r2api.converter.giallo_zafferano as gz
+from local_server import LocalServerTestCase, QuietHandler
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_soup = os.path.join(file_path, "soups/GZSoup.html")
+path_to_json = os.path.join(file_path, "recipes/GZRecipe.json")
+
+with open(path_to_soup, 'rb') as f:
+    gz_soup = f.read()
+with open(path_to_json, 'r') as f:
+    gz_json = json.load(f)
+
+class RecipeHandler(QuietHandler):
+    """Serves the GZ soup, except /flaky which fails with a 503 every other request"""
+    protocol_version = 'HTTP/1.1'
+    requests_seen = []
+    flaky_calls = 0
+
+    def do_GET(self):
+        RecipeHandler.requests_seen.append((self.path, self.headers.get('User-agent'), self.client_address[1]))
+        if self.path == '/flaky':
+            RecipeHandler.flaky_calls += 1
+            if RecipeHandler.flaky_calls % 2 == 1:
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(gz_soup)))
+        self.end_headers()
+        self.wfile.write(gz_soup)
+
+class RecipeTestCase(LocalServerTestCase):
+    handler = RecipeHandler
+
+    def setUp(self):
+        RecipeHandler.requests_seen = []
+
+class KnownQualities(unittest.TestCase):
+    def test_make_session_pools(self):
+        """make_session should mount an adapter with the configured pool sizes and retries"""
+        session = fs.make_session(pool_connections=3, pool_maxsize=7, retries=5, backoff_factor=0.1, timeout=2)
+        adapter = session.get_adapter('https://ricette.giallozafferano.it/')
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual(adapter.max_retries.total, 5)
+        self.assertEqual(adapter.max_retries.backoff_factor, 0.1)
+        self.assertEqual(session.timeout, 2)
+        self.assertEqual(session.headers['User-agent'], fs.DEFAULT_HEADERS['User-agent'])
+
+    def test_shared_session(self):
+        """get_session should return the same session until it is replaced"""
+        first = fs.get_session()
+        self.assertIs(first, fs.get_session())
+        replacement = fs.configure_session(pool_maxsize=2)
+        try:
+            self.assertIs(replacement, fs.get_session())
+            self.assertIsNot(first, fs.get_session())
+        finally:
+            fs.set_session(None)
+        self.assertIsNotNone(fs.get_session())
+
+class KnownValues(RecipeTestCase):
+    def test_keep_alive(self):
+        """Fetching several pages with one session should reuse the same connection"""
+        session = fs.make_session()
+        for _ in range(3):
+            self.assertEqual(fs.fetch(f"{self.base_url}/recipe", session=session), gz_soup)
+        client_ports = {port for _, _, port in RecipeHandler.requests_seen}
+        self.assertEqual(len(client_ports), 1)
+
+    def test_retry(self):
+        """A request answered with a 503 should be retried"""
+        session = fs.make_session(backoff_factor=0)
+        self.assertEqual(fs.fetch(f"{self.base_url}/flaky", session=session), gz_soup)
+
+    def test_converter_session(self):
+        """A converter should fetch with the session it is given and its own headers"""
+        session = fs.make_session()
+        converter = gz.GZConverter(f"{self.base_url}/recipe", session=session)
+        self.assertEqual(converter['ingredients'], gz_json['ingredients'])
+        self.assertEqual(RecipeHandler.requests_seen[-1][1], gz.GZConverter.headers['User-agent'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.fetch.session as fs
+import r2api.converter.giallo_zafferano as gz
+import r2api.converter.fatto_in_casa as fic
+import r2api.converter.molliche_di_zucchero as mz
+import r2api.converter.allacciate_il_grembiule as ag
+import r2api.converter.ricette_di_max as rm
+from local_server import LocalServerTestCase, QuietHandler
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_soups = os.path.join(file_path, "soups")
+
+# Comments, footers and ad scripts that real pages have after the recipe
+# GZ pages also have more gz-content-recipe sections after the preparation
+junk_tail = b'<div class="gz-content-recipe gz-mBottom4x"><p>Conservazione</p></div><footer>' + b'<script>var ad = "' + b'x' * 200000 + b'";</script>' * 20 + b'</footer>'
+
+class TailHandler(QuietHandler):
+    """Serves the soups with a large tail of junk inserted before </body>"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        with open(os.path.join(path_to_soups, self.path.lstrip('/')), 'rb') as f:
+            content = f.read().replace(b'</body>', junk_tail + b'</body>')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        try:
+            self.wfile.write(content)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, which is the point
+            pass
+
+class KnownValues(LocalServerTestCase):
+    handler = TailHandler
+    converters = (
+        (gz.GZConverter, 'GZSoup.html'),
+        (fic.FCConverter, 'FCSoup.html'),
+        (mz.MZConverter, 'MZSoup.html'),
+        (ag.AGConverter, 'AGSoup1.html'),
+        (ag.AGConverter, 'AGSoup2.html'),
+    )
+
+    def test_streamed_recipes(self):
+        """A streamed page should give the same recipe as the whole page while stopping before the junk"""
+        for converter, soup in self.converters:
+            url = f"{self.base_url}/{soup}"
+            full = converter(url)
+            streamed = converter(url, stream=True)
+            self.assertEqual(full.recipe, streamed.recipe, soup)
+            self.assertLess(len(converter.fetch(url, stream=True)), len(junk_tail), soup)
+
+    def test_no_markers(self):
+        """Without end markers, stream=True should read the whole page"""
+        url = f"{self.base_url}/RMSoup1.html"
+        self.assertEqual(rm.RMConverter.fetch(url, stream=True), rm.RMConverter.fetch(url))
+
+class KnownQualities(unittest.TestCase):
+    def test_markers_in_order(self):
+        """Each marker should only be looked for after the previous one"""
+        content, complete = fs.read_until_markers([b'<ol>a</ol><div class="steps"><ol>b</ol>c'], (b'steps', b'</ol>'))
+        self.assertEqual(content, b'<ol>a</ol><div class="steps"><ol>b</ol>')
+        self.assertFalse(complete)
+
+    def test_split_marker(self):
+        """A marker split between two chunks should still be found, and the cut should be at the end of its tag"""
+        chunks = [b'<p>x</p><div class="reci', b'pe-st', b'eps" id="a', b'">rest', b' of the page']
+        content, complete = fs.read_until_markers(chunks, (b'recipe-steps',))
+        self.assertEqual(content, b'<p>x</p><div class="recipe-steps" id="a">')
+        self.assertFalse(complete)
+
+    def test_repeated_marker(self):
+        """A repeated marker should need as many occurrences"""
+        chunks = [b'<i class="m">1</i><i class="m">2</i>', b'<i class="m">3</i>']
+        content, complete = fs.read_until_markers(chunks, (b'"m"',) * 3)
+        self.assertEqual(content, b'<i class="m">1</i><i class="m">2</i><i class="m">')
+
+    def test_marker_missing(self):
+        """If a marker never shows up, the whole body should be returned"""
+        content, complete = fs.read_until_markers([b'abc', b'def'], (b'zzz',))
+        self.assertEqual(content, b'abcdef')
+        self.assertTrue(complete)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import sys
+import os
+import json
+import subprocess
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+package_path = os.path.dirname(file_path)
+
+# The cumulative import time of r2api, in microseconds, that the test fails above
+# It is far above what it takes now (under a millisecond) so a slow CI machine won't fail it,
+# but importing bs4, requests and the converters again would
+import_budget = int(os.environ.get('R2API_IMPORT_BUDGET_US', 20000))
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *options, '-c', code], cwd=package_path,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+def imported_after(code: str) -> set:
+    """The r2api, bs4 and requests modules imported after running the code in a fresh interpreter"""
+    result = run_python(code + "\nimport sys, json\nprint(json.dumps([m for m in sys.modules if m.split('.')[0] in ('r2api', 'bs4', 'requests')]))")
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+@unittest.skipIf(sys.version_info < (3, 7), "r2api is only imported lazily on Python 3.7 and newer")
+class KnownQualities(unittest.TestCase):
+    def test_import(self):
+        """Importing r2api shouldn't import anything else from it, nor bs4 or requests"""
+        self.assertEqual(imported_after("import r2api"), {'r2api', 'r2api.version'})
+
+    def test_unit_conversion_only(self):
+        """Using the unit conversion shouldn't import bs4, requests or the converters"""
+        modules = imported_after("import r2api\nr2api.convert_units_prep('200 g')")
+        self.assertIn('r2api.utilities.unit_conversion', modules)
+        self.assertFalse({'bs4', 'requests', 'r2api.converter'} & modules)
+
+    def test_only_chosen_converter(self):
+        """Finding the converter of a url should only import that converter"""
+        modules = imported_after("import r2api\nr2api.converter_for('https://ricette.giallozafferano.it/Zuppa-di-ceci.html')")
+        self.assertIn('r2api.converter.giallo_zafferano', modules)
+        self.assertFalse({
+            'r2api.converter.fatto_in_casa',
+            'r2api.converter.molliche_di_zucchero',
+            'r2api.converter.allacciate_il_grembiule',
+            'r2api.converter.ricette_di_max',
+        } & modules)
+
+    def test_names(self):
+        """Every name in __all__ should still be importable from r2api"""
+        import r2api
+        for name in r2api.__all__:
+            with self.subTest(name=name):
+                self.assertIsNotNone(getattr(r2api, name))
+        self.assertIn('GZConverter', dir(r2api))
+        self.assertRaises(AttributeError, getattr, r2api, 'NotAConverter')
+
+    def test_import_time_budget(self):
+        """python -X importtime -c 'import r2api' should stay within the budget (the fastest of 3 runs)"""
+        timings = []
+        for _ in range(3):
+            result = run_python("import r2api", '-X', 'importtime')
+            for line in result.stderr.splitlines():
+                # import time: self [us] | cumulative | imported package
+                parts = [part.strip() for part in line.split('|')]
+                if len(parts) == 3 and parts[2] == 'r2api':
+                    timings.append(int(parts[1]))
+        self.assertEqual(len(timings), 3)
+        self.assertLess(min(timings), import_budget, f"importing r2api took {min(timings)}us")
+
+if __name__ == '__main__':
+    unittest.main()
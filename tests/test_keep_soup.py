@@ -0,0 +1,97 @@
+import sys
+import os
+import gc
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.converter.giallo_zafferano as gz
+import r2api.converter.fatto_in_casa as fic
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_soup = os.path.join(file_path, "soups/GZSoup.html")
+
+with open(path_to_soup, 'rb') as f:
+    gz_page = f.read()
+
+def traced_memory_of(count: int, **converter_options) -> int:
+    """How many bytes are still allocated after making count converters and keeping all of them"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        converters = [gz.GZConverter(path_to_soup, content=gz_page, **converter_options) for _ in range(count)]
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del converters
+    return current
+
+class KnownValues(unittest.TestCase):
+    def test_same_recipe(self):
+        """Releasing the soup shouldn't change the recipe"""
+        kept = gz.GZConverter(path_to_soup, read_from_file=True)
+        released = gz.GZConverter(path_to_soup, read_from_file=True, keep_soup=False)
+        self.assertIsNone(released.soup)
+        self.assertEqual(released.recipe, kept.recipe)
+        lazy = gz.GZConverter(path_to_soup, content=gz_page, keep_soup=False, lazy=True)
+        self.assertIsNone(lazy.soup)
+        self.assertEqual(lazy.recipe, kept.recipe)
+
+    def test_lazy_parses_once(self):
+        """A lazy recipe without the soup should parse the page again only once, for the first field accessed"""
+        class CountingGZConverter(gz.GZConverter):
+            def _parse(self, content):
+                self.parses = getattr(self, 'parses', 0) + 1
+                return super()._parse(content)
+
+        kept = gz.GZConverter(path_to_soup, content=gz_page)
+        lazy = CountingGZConverter(path_to_soup, content=gz_page, keep_soup=False, lazy=True)
+        self.assertEqual(lazy.parses, 1)
+        self.assertEqual(lazy.recipe['name'], kept.recipe['name'])
+        self.assertEqual(lazy.parses, 2)
+        for key in ('image', 'ingredients', 'preparation'):
+            self.assertTrue(lazy.recipe.is_computed(key))
+        self.assertEqual(lazy.recipe, kept.recipe)
+        self.assertEqual(lazy.parses, 2)
+
+    def test_write_soup_to(self):
+        """A released soup should be written exactly as the kept one, from text or bytes and strained or not"""
+        directory = tempfile.mkdtemp()
+        try:
+            for options in ({'read_from_file': True}, {'content': gz_page}, {'read_from_file': True, 'strain': False}):
+                with self.subTest(**options):
+                    kept_path = os.path.join(directory, 'kept.html')
+                    released_path = os.path.join(directory, 'released.html')
+                    gz.GZConverter(path_to_soup, **options).write_soup_to(kept_path)
+                    gz.GZConverter(path_to_soup, keep_soup=False, **options).write_soup_to(released_path)
+                    with open(kept_path, 'r') as kept, open(released_path, 'r') as released:
+                        self.assertEqual(released.read(), kept.read())
+        finally:
+            shutil.rmtree(directory)
+
+    def test_get_soup(self):
+        """get_soup should parse the page again without keeping it"""
+        converter = fic.FCConverter(os.path.join(file_path, "soups/FCSoup.html"), read_from_file=True, keep_soup=False)
+        soup = converter.get_soup()
+        self.assertEqual(converter.get_title(soup), converter['name'])
+        self.assertIsNone(converter.soup)
+        self.assertIsNone(gz.GZConverter.from_recipe(path_to_soup, {}).get_soup())
+        self.assertRaises(ValueError, gz.GZConverter.from_recipe(path_to_soup, {}).write_soup_to, os.devnull)
+
+class KnownQualities(unittest.TestCase):
+    def test_bounded_memory(self):
+        """Without their soups, a batch of converters should take a fraction of the memory and grow by little more than the compressed page each"""
+        kept = traced_memory_of(25)
+        released = traced_memory_of(25, keep_soup=False)
+        released_twice = traced_memory_of(50, keep_soup=False)
+        self.assertLess(released * 4, kept)
+        # Per converter: the recipe, the compressed page and the converter itself
+        per_converter = (released_twice - released) / 25
+        self.assertLess(per_converter, len(gz_page))
+
+if __name__ == '__main__':
+    unittest.main()
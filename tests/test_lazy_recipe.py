@@ -0,0 +1,96 @@
+import sys
+import os
+import json
+import copy
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.converter.lazy_recipe as lr
+import r2api.converter.giallo_zafferano as gz
+import r2api.converter.recipe_cache as rc
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_soup = os.path.join(file_path, "soups/GZSoup.html")
+
+class CountingGZConverter(gz.GZConverter):
+    """Counts how often the ingredients and the preparation are parsed"""
+    def __init__(self, *args, **kwargs):
+        self.calls = {'ingredients': 0, 'preparation': 0}
+        super().__init__(*args, **kwargs)
+
+    def get_ingredients(self, soup, convert_units=True):
+        self.calls['ingredients'] += 1
+        return super().get_ingredients(soup, convert_units)
+
+    def get_preparation(self, soup, convert_units=True):
+        self.calls['preparation'] += 1
+        return super().get_preparation(soup, convert_units)
+
+class KnownValues(unittest.TestCase):
+    def test_same_recipe(self):
+        """A lazy recipe should be equal to the eager one"""
+        eager = gz.GZConverter(path_to_soup, read_from_file=True)
+        lazy = gz.GZConverter(path_to_soup, read_from_file=True, lazy=True)
+        self.assertIsInstance(lazy.recipe, lr.LazyRecipe)
+        self.assertEqual(lazy.recipe, eager.recipe)
+        self.assertEqual(lazy.recipe.materialize(), eager.recipe)
+        self.assertIs(type(lazy.recipe.materialize()), dict)
+
+    def test_only_accessed_fields(self):
+        """Only the fields that are accessed should be computed, and only once"""
+        converter = CountingGZConverter(path_to_soup, read_from_file=True, lazy=True)
+        self.assertTrue(converter['name'])
+        self.assertTrue(converter['image'])
+        self.assertEqual(list(converter.keys()), ['name', 'image', 'ingredients', 'preparation'])
+        self.assertIn('preparation', converter.recipe)
+        self.assertEqual(len(converter.recipe), 4)
+        self.assertEqual(converter.calls, {'ingredients': 0, 'preparation': 0})
+        converter['ingredients']
+        converter['ingredients']
+        self.assertEqual(converter.calls, {'ingredients': 1, 'preparation': 0})
+
+    def test_write_recipe_to(self):
+        """write_recipe_to should write every field"""
+        eager = gz.GZConverter(path_to_soup, read_from_file=True)
+        lazy = gz.GZConverter(path_to_soup, read_from_file=True, lazy=True)
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'recipe.json')
+            lazy.write_recipe_to(path)
+            with open(path, 'r') as f:
+                self.assertEqual(json.load(f), eager.recipe)
+        finally:
+            shutil.rmtree(directory)
+        lazy = gz.GZConverter(path_to_soup, read_from_file=True, lazy=True)
+        self.assertEqual(copy.deepcopy(lazy.recipe), eager.recipe)
+
+class KnownQualities(unittest.TestCase):
+    def test_set_and_delete(self):
+        """A field that's set shouldn't be computed and a deleted field should be gone"""
+        recipe = lr.LazyRecipe({'a': lambda: 1, 'b': lambda: 1 / 0})
+        recipe['b'] = 2
+        recipe['c'] = 3
+        self.assertEqual(dict(recipe.items()), {'a': 1, 'b': 2, 'c': 3})
+        del recipe['a']
+        self.assertNotIn('a', recipe)
+        self.assertEqual(list(recipe), ['b', 'c'])
+        self.assertEqual(recipe.get('a', 'missing'), 'missing')
+        self.assertRaises(KeyError, lambda: recipe['a'])
+
+    def test_recipe_cache(self):
+        """With a recipe cache, the whole recipe should be parsed and cached"""
+        directory = tempfile.mkdtemp()
+        try:
+            cache = rc.RecipeCache(os.path.join(directory, 'recipes.sqlite'))
+            converter = CountingGZConverter(path_to_soup, read_from_file=True, lazy=True, recipe_cache=cache)
+            self.assertEqual(converter.calls, {'ingredients': 1, 'preparation': 1})
+            self.assertEqual(cache.get(path_to_soup, CountingGZConverter), converter.recipe)
+            cache.close()
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import sys
+import os
+import json
+import gzip
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.export.ndjson as nd
+import r2api.converter.giallo_zafferano as gz
+import r2api.batch.batch_conversion as bc
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_gz_soup = os.path.join(file_path, "soups/GZSoup.html")
+path_to_gz_json = os.path.join(file_path, "recipes/GZRecipe.json")
+
+with open(path_to_gz_json, 'r') as f:
+    gz_json = json.load(f)
+
+def recipe_url(number: int) -> str:
+    return f"https://ricette.giallozafferano.it/Ricetta-{number}.html"
+
+class NDJSONTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'recipes.ndjson')
+        self.gz_path = os.path.join(self.directory, 'recipes.ndjson.gz')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+class KnownValues(NDJSONTestCase):
+    def test_round_trip(self):
+        """Every recipe should be one line of JSON with its url, read back in the order it was written"""
+        with nd.NDJSONWriter(self.path) as writer:
+            for number in range(5):
+                writer.write(recipe_url(number), gz_json)
+        with open(self.path, encoding='utf-8') as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0]), {'url': recipe_url(0), 'recipe': gz_json})
+        self.assertEqual(list(nd.read_ndjson(self.path)), [(recipe_url(number), gz_json) for number in range(5)])
+
+    def test_gzip(self):
+        """A .gz path should be compressed, every batch as its own member, and still read as one file"""
+        with nd.NDJSONWriter(self.gz_path, batch_size=2) as writer:
+            for number in range(5):
+                writer.write(recipe_url(number), gz_json)
+        with gzip.open(self.gz_path, 'rt', encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 5)
+        self.assertEqual([url for url, _ in nd.read_ndjson(self.gz_path)], [recipe_url(number) for number in range(5)])
+
+    def test_batches(self):
+        """Nothing should be written until a batch is full or the writer is flushed"""
+        writer = nd.NDJSONWriter(self.path, batch_size=3)
+        writer.write(recipe_url(0), gz_json)
+        writer.write(recipe_url(1), gz_json)
+        self.assertEqual(os.path.getsize(self.path), 0)
+        writer.write(recipe_url(2), gz_json)
+        self.assertEqual(len(list(nd.read_ndjson(self.path))), 3)
+        writer.write(recipe_url(3), gz_json)
+        writer.flush()
+        self.assertEqual(len(list(nd.read_ndjson(self.path))), 4)
+        writer.close()
+
+    def test_write_ndjson(self):
+        """The results should be passed through, and only the recipes of the ones that didn't fail written"""
+        results = [bc.BatchResult(recipe_url(0), gz_json, None), bc.BatchResult(recipe_url(1), None, ValueError())]
+        self.assertEqual(list(nd.write_ndjson(results, self.path)), results)
+        self.assertEqual(list(nd.read_ndjson(self.path)), [(recipe_url(0), gz_json)])
+
+    def test_export_ndjson(self):
+        """export_ndjson should convert and write every url"""
+        urls = [path_to_gz_soup, path_to_gz_soup + "?again"]
+        results = {result.url: result for result in nd.export_ndjson(urls, self.path, gz.GZConverter, read_from_file=True)}
+        self.assertTrue(results[urls[0]].ok)
+        self.assertFalse(results[urls[1]].ok)
+        self.assertEqual(list(nd.read_ndjson(self.path)), [(path_to_gz_soup, gz_json)])
+
+class Resume(NDJSONTestCase):
+    def write(self, path, numbers, **options):
+        with nd.NDJSONWriter(path, **options) as writer:
+            for number in numbers:
+                writer.write(recipe_url(number), gz_json)
+
+    def test_resume(self):
+        """A writer on an existing file should know its urls and add to it, or start over with resume=False"""
+        self.write(self.path, range(3))
+        with nd.NDJSONWriter(self.path) as writer:
+            self.assertEqual(len(writer), 3)
+            self.assertIn(recipe_url(2), writer)
+            writer.write(recipe_url(3), gz_json)
+        self.assertEqual(len(list(nd.read_ndjson(self.path))), 4)
+        self.write(self.path, [9], resume=False)
+        self.assertEqual([url for url, _ in nd.read_ndjson(self.path)], [recipe_url(9)])
+
+    def test_truncated_line(self):
+        """A line that was only partly written should be cut off"""
+        self.write(self.path, range(3))
+        with open(self.path, 'ab') as f:
+            f.write(b'{"url": "https://ricette.giallozafferano.it/Ric')
+        with nd.NDJSONWriter(self.path) as writer:
+            self.assertEqual(len(writer), 3)
+            writer.write(recipe_url(3), gz_json)
+        self.assertEqual([url for url, _ in nd.read_ndjson(self.path)], [recipe_url(number) for number in range(4)])
+
+    def test_truncated_gzip(self):
+        """A gzipped batch that was only partly written should be cut off, the whole batches before it kept"""
+        self.write(self.gz_path, range(4), batch_size=2)
+        size = os.path.getsize(self.gz_path)
+        self.write(self.gz_path, range(4, 6), batch_size=2)
+        with open(self.gz_path, 'r+b') as f:
+            f.truncate(size + 20)
+        with nd.NDJSONWriter(self.gz_path) as writer:
+            self.assertEqual(len(writer), 4)
+            self.assertNotIn(recipe_url(4), writer)
+            writer.write(recipe_url(4), gz_json)
+        self.assertGreater(os.path.getsize(self.gz_path), size)
+        self.assertEqual([url for url, _ in nd.read_ndjson(self.gz_path)], [recipe_url(number) for number in range(5)])
+
+    def test_resume_streams(self):
+        """Resuming should only keep the urls, not every line of the file"""
+        self.write(self.path, range(300))
+        tracemalloc.start()
+        try:
+            writer = nd.NDJSONWriter(self.path)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        writer.close()
+        self.assertEqual(len(writer), 300)
+        self.assertLess(peak, os.path.getsize(self.path) / 4)
+
+    def test_export_skips_written(self):
+        """The urls already in the file shouldn't be converted again"""
+        self.write(self.path, [0])
+        urls = [recipe_url(0), path_to_gz_soup]
+        results = list(nd.export_ndjson(urls, self.path, gz.GZConverter, read_from_file=True))
+        self.assertEqual([result.url for result in results], [path_to_gz_soup])
+        self.assertEqual(len(list(nd.read_ndjson(self.path))), 2)
+
+    def test_export_repeated_url(self):
+        """A url repeated while it's still being converted should only be converted and written once"""
+        urls = [path_to_gz_soup] * 5
+        results = list(nd.export_ndjson(urls, self.path, gz.GZConverter, max_workers=4, read_from_file=True))
+        self.assertEqual([result.url for result in results], [path_to_gz_soup])
+        self.assertEqual(list(nd.read_ndjson(self.path)), [(path_to_gz_soup, gz_json)])
+
+class BadInput(NDJSONTestCase):
+    def test_bad_options(self):
+        """An unknown compression or an empty batch should raise a ValueError"""
+        self.assertRaises(ValueError, nd.NDJSONWriter, self.path, compression='bz2')
+        self.assertRaises(ValueError, nd.NDJSONWriter, self.path, batch_size=0)
+
+if __name__ == '__main__':
+    unittest.main()
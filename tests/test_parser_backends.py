@@ -0,0 +1,106 @@
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.converter.parsers as parsers
+import r2api.converter.giallo_zafferano as gz
+import r2api.converter.fatto_in_casa as fic
+import r2api.converter.molliche_di_zucchero as mz
+import r2api.converter.allacciate_il_grembiule as ag
+import r2api.converter.ricette_di_max as rm
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+
+# Every soup in tests/soups with the converter for it
+soups = (
+    (gz.GZConverter, "soups/GZSoup.html"),
+    (fic.FCConverter, "soups/FCSoup.html"),
+    (mz.MZConverter, "soups/MZSoup.html"),
+    (ag.AGConverter, "soups/AGSoup1.html"),
+    (ag.AGConverter, "soups/AGSoup2.html"),
+    (rm.RMConverter, "soups/RMSoup1.html"),
+    (rm.RMConverter, "soups/RMSoup2.html"),
+    (rm.RMConverter, "soups/RMSoup3.html"),
+)
+
+class KnownValues(unittest.TestCase):
+    def test_parser_matrix(self):
+        """Every soup should give the identical recipe with every installed parser"""
+        for converter, soup in soups:
+            path = os.path.join(file_path, soup)
+            expected = converter(path, read_from_file=True, parser='html.parser').recipe
+            for parser in parsers.available_parsers():
+                with self.subTest(soup=soup, parser=parser):
+                    self.assertEqual(converter(path, read_from_file=True, parser=parser).recipe, expected)
+
+    @unittest.skipUnless('lxml' in parsers.available_parsers(), "lxml is not installed")
+    def test_lxml_is_used(self):
+        """A parser passed in should be the one building the soup"""
+        converter = gz.GZConverter(os.path.join(file_path, "soups/GZSoup.html"), read_from_file=True, parser='lxml')
+        self.assertEqual(converter.soup.builder.NAME, 'lxml')
+
+class Straining(unittest.TestCase):
+    def test_strained_matrix(self):
+        """The strained soup should give the same recipe as the whole page with every installed parser"""
+        for converter, soup in soups:
+            path = os.path.join(file_path, soup)
+            expected = converter(path, read_from_file=True, strain=False).recipe
+            for parser in parsers.available_parsers():
+                with self.subTest(soup=soup, parser=parser):
+                    self.assertEqual(converter(path, read_from_file=True, parser=parser).recipe, expected)
+
+    def test_strained_soup(self):
+        """Only the elements in parse_only should be built into the soup"""
+        path = os.path.join(file_path, "soups/FCSoup.html")
+        full = fic.FCConverter(path, read_from_file=True, strain=False)
+        strained = fic.FCConverter(path, read_from_file=True)
+        self.assertLess(len(strained.soup.find_all(True)), len(full.soup.find_all(True)))
+        self.assertEqual({tag.name for tag in strained.soup.children}, {'title', 'img', 'li'})
+        self.assertIsNone(strained.soup.find('script'))
+
+    def test_selectors(self):
+        """A selector should match on the tag name and the class or the id"""
+        strainer = parsers.SelectorStrainer(('title', 'div.recipe-steps', 'img#top-img'))
+        self.assertTrue(strainer.match_tag('title', {}))
+        self.assertTrue(strainer.match_tag('div', {'class': 'recipe-steps wide'}))
+        self.assertTrue(strainer.match_tag('div', {'class': ['wide', 'recipe-steps']}))
+        self.assertFalse(strainer.match_tag('div', {'class': 'recipe-steps-wide'}))
+        self.assertFalse(strainer.match_tag('div', None))
+        self.assertTrue(strainer.match_tag('img', {'id': 'top-img'}))
+        self.assertFalse(strainer.match_tag('img', {'id': 'other'}))
+        self.assertIsNone(parsers.make_strainer(()))
+        self.assertIs(parsers.make_strainer(('title',)), parsers.make_strainer(('title',)))
+
+class KnownQualities(unittest.TestCase):
+    def tearDown(self):
+        parsers.set_default_parser('html.parser')
+
+    def test_default_parser(self):
+        """html.parser should be the default and always be available"""
+        self.assertEqual(parsers.get_default_parser(), 'html.parser')
+        self.assertIn('html.parser', parsers.available_parsers())
+        self.assertEqual(gz.GZConverter.get_parser(), 'html.parser')
+
+    def test_auto(self):
+        """auto should pick the fastest installed parser"""
+        parsers.set_default_parser('auto')
+        self.assertEqual(parsers.get_default_parser(), parsers.available_parsers()[-1])
+
+    def test_precedence(self):
+        """A parser passed in should win over the converter's, which should win over the default"""
+        class HTMLParserGZConverter(gz.GZConverter):
+            parser = 'html.parser'
+        parsers.set_default_parser('auto')
+        self.assertEqual(HTMLParserGZConverter.get_parser(), 'html.parser')
+        self.assertEqual(HTMLParserGZConverter.get_parser('auto'), parsers.available_parsers()[-1])
+
+class IncorrectInput(unittest.TestCase):
+    def test_bad_parser(self):
+        """An unsupported parser should raise a ValueError"""
+        self.assertRaises(ValueError, parsers.set_default_parser, 'selectolax')
+        self.assertRaises(ValueError, gz.GZConverter, os.path.join(file_path, "soups/GZSoup.html"), read_from_file=True, parser='html5lib')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import functools
+import unittest
+import multiprocessing
+import concurrent.futures
+from unittest import mock
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.batch.process_conversion as pc
+import r2api.batch.batch_conversion as bc
+import r2api.converter.recipe_cache as rc
+import r2api.converter.giallo_zafferano as gz
+import r2api.converter.fatto_in_casa as fic
+import r2api.converter.molliche_di_zucchero as mz
+import r2api.converter.parsers as parsers
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_gz_soup = os.path.join(file_path, "soups/GZSoup.html")
+path_to_fc_soup = os.path.join(file_path, "soups/FCSoup.html")
+path_to_mz_soup = os.path.join(file_path, "soups/MZSoup.html")
+
+class ParserRecordingConverter(gz.GZConverter):
+    """Sends back the parser the worker process used along with the recipe"""
+    def _recipe_dict(self):
+        return dict(super()._recipe_dict(), parser=self.get_parser())
+
+class KnownValues(unittest.TestCase):
+    def test_same_recipes(self):
+        """The recipes should be the same plain dictionaries as convert_many's"""
+        paths = [path_to_gz_soup] * 5
+        expected = list(bc.convert_many(paths, gz.GZConverter, read_from_file=True))
+        results = list(pc.convert_many_processes(paths, gz.GZConverter, fetch_workers=2, parse_workers=2, read_from_file=True))
+        self.assertEqual(len(results), 5)
+        for result in results:
+            self.assertTrue(result.ok)
+            self.assertIs(type(result.recipe), dict)
+            self.assertEqual(result.recipe, expected[0].recipe)
+
+    def test_options(self):
+        """Parsing options should reach the converters in the worker processes"""
+        results = list(pc.convert_many_processes([path_to_fc_soup], fic.FCConverter, parse_workers=1,
+            read_from_file=True, convert_units=False, strain=False, lazy=True))
+        self.assertEqual(results[0].recipe, fic.FCConverter(path_to_fc_soup, read_from_file=True, convert_units=False).recipe)
+
+    @unittest.skipUnless('lxml' in parsers.available_parsers(), "lxml is not installed")
+    @unittest.skipIf(sys.version_info < (3, 7), "ProcessPoolExecutor's mp_context needs Python 3.7")
+    def test_default_parser(self):
+        """The workers should use the default parser set in this process, even when they're spawned rather than forked"""
+        spawned = functools.partial(concurrent.futures.ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+        parsers.set_default_parser('lxml')
+        try:
+            with mock.patch.object(pc, 'ProcessPoolExecutor', spawned):
+                results = list(pc.convert_many_processes([path_to_gz_soup], ParserRecordingConverter, parse_workers=1, read_from_file=True))
+        finally:
+            parsers.set_default_parser('html.parser')
+        self.assertTrue(results[0].ok, results[0].error)
+        self.assertEqual(results[0].recipe['parser'], 'lxml')
+
+    def test_errors(self):
+        """A page that can't be read or parsed should be an error for that url only"""
+        paths = [path_to_gz_soup, os.path.join(file_path, "soups/missing.html"), path_to_mz_soup]
+        results = {result.url: result for result in pc.convert_many_processes(paths, gz.GZConverter, parse_workers=1, read_from_file=True)}
+        self.assertTrue(results[path_to_gz_soup].ok)
+        self.assertIsInstance(results[paths[1]].error, FileNotFoundError)
+        # The MZ page has none of what the GZConverter looks for
+        self.assertFalse(results[path_to_mz_soup].ok)
+
+    def test_recipe_cache(self):
+        """Recipes should be put in and taken from the recipe cache in this process"""
+        directory = tempfile.mkdtemp()
+        try:
+            cache = rc.RecipeCache(os.path.join(directory, 'recipes.sqlite'))
+            first = list(pc.convert_many_processes([path_to_gz_soup], gz.GZConverter, parse_workers=1, read_from_file=True, recipe_cache=cache))
+            self.assertEqual(cache.get(path_to_gz_soup, gz.GZConverter), first[0].recipe)
+            cache.put('not-a-file', gz.GZConverter, True, {'name': 'cached'})
+            second = list(pc.convert_many_processes(['not-a-file'], gz.GZConverter, parse_workers=1, read_from_file=True, recipe_cache=cache))
+            self.assertEqual(second[0].recipe, {'name': 'cached'})
+            cache.close()
+        finally:
+            shutil.rmtree(directory)
+
+class IncorrectInput(unittest.TestCase):
+    def test_bad_workers(self):
+        """Less than one worker should raise a ValueError"""
+        self.assertRaises(ValueError, next, pc.convert_many_processes([], gz.GZConverter, fetch_workers=0))
+        self.assertRaises(ValueError, next, pc.convert_many_processes([], gz.GZConverter, parse_workers=0))
+
+@unittest.skipUnless(os.environ.get('R2API_BENCHMARKS'), "set R2API_BENCHMARKS=1 to run the benchmarks")
+class Benchmark(unittest.TestCase):
+    def test_scaling(self):
+        """Converting the same pages with 1, 2, 4 and 8 parse workers (as many as there are cores), compared to convert_many"""
+        paths = [path_to_gz_soup, path_to_fc_soup, path_to_mz_soup] * int(os.environ.get('R2API_BENCHMARK_PAGES', 100))
+        converters = {path_to_gz_soup: gz.GZConverter, path_to_fc_soup: fic.FCConverter, path_to_mz_soup: mz.MZConverter}
+
+        start = time.perf_counter()
+        for path in paths:
+            converters[path](path, read_from_file=True)
+        baseline = time.perf_counter() - start
+        print(f"\n{len(paths)} pages, one thread: {baseline:.2f}s")
+
+        timings = {}
+        cores = os.cpu_count() or 1
+        for workers in (1, 2, 4, 8):
+            if workers > cores:
+                break
+            start = time.perf_counter()
+            for path, converter in converters.items():
+                results = list(pc.convert_many_processes([p for p in paths if p == path], converter, parse_workers=workers, read_from_file=True))
+                self.assertTrue(all(result.ok for result in results))
+            timings[workers] = time.perf_counter() - start
+            print(f"{workers} parse workers: {timings[workers]:.2f}s ({baseline / timings[workers]:.1f}x)")
+        if 2 in timings:
+            self.assertLess(timings[2], timings[1])
+
+if __name__ == '__main__':
+    unittest.main()
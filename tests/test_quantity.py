@@ -0,0 +1,130 @@
+import sys
+import os
+import json
+import math
+import unittest
+from fractions import Fraction
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.utilities.quantity as qt
+import r2api.utilities.unit_conversion as uc
+import r2api.converter.recipe as rt
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_gz_json = os.path.join(file_path, "recipes/GZRecipe.json")
+
+with open(path_to_gz_json, 'r') as f:
+    gz_json = json.load(f)
+
+class KnownValues(unittest.TestCase):
+    known_values = (
+        (300, (qt.NUMBER, Fraction(300), None, True)),
+        (10.56, (qt.NUMBER, Fraction('10.56'), None, True)),
+        ('2', (qt.NUMBER, Fraction(2), None, True)),
+        ('1,5', (qt.NUMBER, Fraction(3, 2), None, False)),
+        ('1/2', (qt.NUMBER, Fraction(1, 2), None, False)),
+        ('1 1/2', (qt.NUMBER, Fraction(3, 2), None, False)),
+        ('⅓', (qt.NUMBER, Fraction(1, 3), None, False)),
+        ('1½', (qt.NUMBER, Fraction(3, 2), None, False)),
+        ('2-3', (qt.RANGE, Fraction(2), Fraction(3), False)),
+        ('1,5 - 2', (qt.RANGE, Fraction(3, 2), Fraction(2), False)),
+        ('q.b.', (qt.TO_TASTE, None, None, False)),
+        ('A piacere', (qt.TO_TASTE, None, None, False)),
+        ('(5 o 6', (qt.TEXT, None, None, False)),
+        ('1/0', (qt.TEXT, None, None, False)),
+        ('nan', (qt.TEXT, None, None, False)),
+        ('', (qt.TEXT, None, None, False)),
+    )
+
+    def test_parse_known_values(self):
+        """parse_quantity should give known quantities for known values, keeping the text as it was written"""
+        for quantity, (kind, low, high, plain) in self.known_values:
+            parsed = qt.parse_quantity(quantity)
+            self.assertEqual((parsed.kind, parsed.low, parsed.high, parsed.plain), (kind, low, high, plain), quantity)
+            self.assertEqual(parsed.text, str(quantity))
+
+    def test_number(self):
+        """number should be the float of a number, NaN otherwise"""
+        self.assertEqual(qt.parse_quantity('1,5').number, 1.5)
+        self.assertTrue(math.isnan(qt.parse_quantity('2-3').number))
+        self.assertTrue(math.isnan(qt.parse_quantity('q.b.').number))
+
+    def test_not_quantities(self):
+        """True and None aren't numbers, and 1 and 1.0 shouldn't share a quantity"""
+        self.assertEqual(qt.parse_quantity(True).kind, qt.TEXT)
+        self.assertEqual(qt.parse_quantity(None).kind, qt.TEXT)
+        self.assertEqual(qt.parse_quantity(1).text, '1')
+        self.assertEqual(qt.parse_quantity(1.0).text, '1.0')
+
+    def test_parsed_once(self):
+        """The same text should give the same Quantity, which is immutable, and a Quantity should be parsed as itself"""
+        parsed = qt.parse_quantity('1,5')
+        self.assertIs(qt.parse_quantity('1,5'), parsed)
+        self.assertIs(qt.parse_quantity(parsed), parsed)
+        self.assertRaises(AttributeError, setattr, parsed, 'low', Fraction(2))
+
+class Conversion(unittest.TestCase):
+    def test_legacy_values(self):
+        """convert_units_ing should give the same values whether it's given the text or the Quantity"""
+        known_values = (
+            (('300', 'g'), (round(300 * .00220462 * 16, 2), 'oz')),
+            (('2,7', 'kg'), (round(2.7 * 2.205, 2), 'lb')),
+            ((2, 'cucchiai'), (2.0, 'cucchiai')),
+            (('1,5', 'cucchiai'), ('1,5', 'cucchiai')),
+            (('q.b.', 'n/a'), ('q.b.', 'n/a')),
+            (('(5 o 6', 'n/a'), ('(5 o 6', 'n/a')),
+        )
+        for (quantity, unit), result in known_values:
+            self.assertEqual(uc.convert_units_ing(quantity, unit), result)
+            self.assertEqual(uc.convert_units_ing(qt.parse_quantity(quantity), unit), result)
+
+    def test_fractions_and_ranges(self):
+        """A fraction or a range with a unit that's converted should be converted, rather than raise"""
+        self.assertEqual(uc.convert_units_ing('1/2', 'kg'), (round(0.5 * 2.205, 2), 'lb'))
+        self.assertEqual(uc.convert_units_ing('2-3', 'kg'), (f"{round(2 * 2.205, 2)}-{round(3 * 2.205, 2)}", 'lb'))
+        # 0.66 lb is simplified to ounces, 1.1 lb isn't, so neither is
+        self.assertEqual(uc.convert_units_ing('300-500', 'g'), (f"{round(300 * .00220462, 2)}-{round(500 * .00220462, 2)}", 'lb'))
+        self.assertEqual(uc.convert_units_ing('q.b.', 'g'), ('q.b.', 'g'))
+
+    def test_one_rounding(self):
+        """A quantity should only be rounded once it's simplified, so the same amount converts the same however it's written"""
+        self.assertEqual(uc.convert_units_ing('1 1/2', 'g'), (round(1.5 * .00220462 * 16, 2), 'oz'))
+        self.assertNotEqual(uc.convert_units_ing('1 1/2', 'g')[0], 0)
+        for written in ('0.5', '0,5', '1/2', '½'):
+            with self.subTest(written=written):
+                self.assertEqual(uc.convert_units_ing(written, 'g'), (round(0.5 * .00220462 * 16, 2), 'oz'))
+        self.assertEqual(uc.convert_units_ing('300', 'g'), (round(300 * .00220462 * 16, 2), 'oz'))
+        self.assertEqual(uc.convert_units_ing(300, 'g'), uc.convert_units_ing('300', 'g'))
+
+    def test_whole_numbers(self):
+        """A whole number should come back as an int, converted or not"""
+        self.assertIs(type(uc.convert_units_ing('2', 'cucchiai')[0]), int)
+        self.assertIs(type(uc.convert_units_ing('1', 'kg')[0]), float)
+        self.assertIs(type(uc.convert_units_ing('1000', 'ml')[0]), float)
+        self.assertEqual(uc.convert_units_ing('4', 'l'), (4.23, 'quart'))
+
+    def test_format_quantity(self):
+        """A quantity should be written as it was, with a vulgar fraction written out"""
+        self.assertEqual(qt.format_quantity('½'), '1/2')
+        self.assertEqual(qt.format_quantity(qt.parse_quantity(' ¾ ')), '3/4')
+        self.assertEqual(qt.format_quantity('1,5'), '1,5')
+        self.assertEqual(qt.format_quantity('q.b.'), 'q.b.')
+        self.assertEqual(uc.convert_units_ing('½', 'n/a'), ('1/2', 'n/a'))
+
+    def test_float_dot_zero(self):
+        """float_dot_zero should be True for whole floats that aren't written with an exponent"""
+        self.assertTrue(uc.float_dot_zero(2.0))
+        self.assertFalse(uc.float_dot_zero(2.5))
+        self.assertFalse(uc.float_dot_zero(1e16))
+        self.assertFalse(uc.float_dot_zero(2))
+        self.assertFalse(uc.float_dot_zero(float('nan')))
+
+    def test_ingredient(self):
+        """An ingredient's parsed_quantity should be its quantity parsed, and it should still be written as it was"""
+        ingredient = rt.Recipe.from_dict(gz_json)['ingredients'][0]
+        self.assertEqual(ingredient.parsed_quantity, qt.parse_quantity(gz_json['ingredients'][0][1]))
+        self.assertEqual(ingredient.to_list(), gz_json['ingredients'][0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.converter.recipe_cache as rc
+import r2api.converter.giallo_zafferano as gz
+import r2api.converter.molliche_di_zucchero as mz
+import r2api.batch.batch_conversion as bc
+import r2api.batch.async_conversion as ac
+from local_server import run
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_soup = os.path.join(file_path, "soups/GZSoup.html")
+path_to_json = os.path.join(file_path, "recipes/GZRecipe.json")
+
+with open(path_to_json, 'r') as f:
+    gz_json = json.load(f)
+
+class RecipeCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'recipes.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+class KnownValues(RecipeCacheTestCase):
+    def test_cache_hit(self):
+        """A cached recipe should be returned without reading or parsing the page"""
+        cache = rc.RecipeCache(self.path)
+        first = gz.GZConverter(path_to_soup, read_from_file=True, recipe_cache=cache)
+        self.assertIsNotNone(first.soup)
+        # The path doesn't have to exist anymore, it's only the key
+        second = gz.GZConverter(path_to_soup, read_from_file=True, recipe_cache=rc.RecipeCache(self.path))
+        self.assertIsNone(second.soup)
+        self.assertEqual(second['ingredients'], gz_json['ingredients'])
+        self.assertEqual(second.recipe, first.recipe)
+
+    def test_key(self):
+        """The key should depend on the url, the converter class and convert_units"""
+        key = rc.RecipeCache.key(path_to_soup, gz.GZConverter, True)
+        self.assertEqual(key, rc.RecipeCache.key(path_to_soup, gz.GZConverter, True))
+        self.assertNotEqual(key, rc.RecipeCache.key(path_to_soup, gz.GZConverter, False))
+        self.assertNotEqual(key, rc.RecipeCache.key(path_to_soup, mz.MZConverter, True))
+        self.assertNotEqual(key, rc.RecipeCache.key(path_to_soup + '?', gz.GZConverter, True))
+
+    def test_convert_units_miss(self):
+        """A recipe cached with convert_units should not be returned without it"""
+        cache = rc.RecipeCache(self.path)
+        cache.put(path_to_soup, gz.GZConverter, True, {'name': 'cached'})
+        self.assertIsNone(cache.get(path_to_soup, gz.GZConverter, False))
+        self.assertEqual(cache.get(path_to_soup, gz.GZConverter, True), {'name': 'cached'})
+
+    def test_batch(self):
+        """convert_many should use the recipe cache"""
+        cache = rc.RecipeCache(self.path)
+        cache.put('not-a-file', gz.GZConverter, True, {'name': 'cached'})
+        results = list(bc.convert_many(['not-a-file'], gz.GZConverter, read_from_file=True, recipe_cache=cache))
+        self.assertTrue(results[0].ok)
+        self.assertEqual(results[0].recipe['name'], 'cached')
+
+    def test_async(self):
+        """aconvert should return a cached recipe without fetching"""
+        cache = rc.RecipeCache(self.path)
+        cache.put('http://127.0.0.1:1/nowhere', gz.GZConverter, True, {'name': 'cached'})
+        converter = run(ac.aconvert('http://127.0.0.1:1/nowhere', gz.GZConverter, recipe_cache=cache))
+        self.assertIsInstance(converter, gz.GZConverter)
+        self.assertEqual(converter['name'], 'cached')
+
+class KnownQualities(RecipeCacheTestCase):
+    def test_ttl(self):
+        """An expired recipe should not be returned"""
+        cache = rc.RecipeCache(self.path, ttl=0.05)
+        cache.put('a', gz.GZConverter, True, {'name': 'a'})
+        self.assertIsNotNone(cache.get('a', gz.GZConverter, True))
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('a', gz.GZConverter, True))
+        self.assertEqual(len(cache), 0)
+
+    def test_max_entries(self):
+        """Once there are more than max_entries recipes, the least recently used should be evicted"""
+        cache = rc.RecipeCache(self.path, max_entries=2)
+        cache.put('a', gz.GZConverter, True, {'name': 'a'})
+        cache.put('b', gz.GZConverter, True, {'name': 'b'})
+        cache.get('a', gz.GZConverter, True)
+        cache.put('c', gz.GZConverter, True, {'name': 'c'})
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get('a', gz.GZConverter, True))
+        self.assertIsNone(cache.get('b', gz.GZConverter, True))
+        self.assertIsNotNone(cache.get('c', gz.GZConverter, True))
+
+    def test_shared_database(self):
+        """Caches sharing a database should agree on how many recipes there are and evict accordingly"""
+        first = rc.RecipeCache(self.path, max_entries=3)
+        second = rc.RecipeCache(self.path, max_entries=3)
+        for name in 'abcdef':
+            cache = first if name in 'ace' else second
+            cache.put(name, gz.GZConverter, True, {'name': name})
+            # Putting a recipe again replaces it rather than adding one
+            cache.put(name, gz.GZConverter, True, {'name': name})
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 3)
+        for name in 'abc':
+            self.assertIsNone(first.get(name, gz.GZConverter, True))
+        for name in 'def':
+            self.assertEqual(second.get(name, gz.GZConverter, True), {'name': name})
+        first.clear()
+        self.assertEqual(len(second), 0)
+
+    def test_existing_database(self):
+        """A database made before the count was stored should be counted once when it is opened"""
+        cache = rc.RecipeCache(self.path)
+        cache.put('a', gz.GZConverter, True, {'name': 'a'})
+        cache.put('b', gz.GZConverter, True, {'name': 'b'})
+        cache._connection.execute("DROP TABLE recipe_count")
+        cache.close()
+        self.assertEqual(len(rc.RecipeCache(self.path)), 2)
+
+    def test_fingerprint(self):
+        """The converter fingerprint should be a stable sha1 hex digest"""
+        self.assertEqual(rc.converter_fingerprint(gz.GZConverter), rc.converter_fingerprint(gz.GZConverter))
+        self.assertEqual(len(rc.converter_fingerprint(gz.GZConverter)), 40)
+
+class IncorrectInput(RecipeCacheTestCase):
+    def test_bad_settings(self):
+        """RecipeCache should raise a ValueError for a non-positive ttl or max_entries"""
+        self.assertRaises(ValueError, rc.RecipeCache, self.path, ttl=0)
+        self.assertRaises(ValueError, rc.RecipeCache, self.path, max_entries=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import sys
+import os
+import copy
+import glob
+import json
+import pickle
+import tracemalloc
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.converter.recipe as rt
+import r2api.converter.giallo_zafferano as gz
+import r2api.export.serializers as se
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_gz_soup = os.path.join(file_path, "soups/GZSoup.html")
+path_to_gz_json = os.path.join(file_path, "recipes/GZRecipe.json")
+
+with open(path_to_gz_json, 'r') as f:
+    gz_json = json.load(f)
+
+# Every recipe in tests/recipes, the corpus of the memory tests
+corpus = []
+for path in sorted(glob.glob(os.path.join(file_path, "recipes/*.json"))):
+    with open(path, 'r') as f:
+        corpus.append(json.load(f))
+
+def loaded(count: int) -> list:
+    """count recipes from the corpus, each loaded from its JSON with its own strings, as a page or a line of NDJSON is"""
+    return [json.loads(json.dumps(corpus[i % len(corpus)])) for i in range(count)]
+
+def allocated(make) -> int:
+    """The bytes still allocated by what make returns"""
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        kept = make()
+        size = tracemalloc.get_traced_memory()[0] - start
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+class IngredientValues(unittest.TestCase):
+    def test_like_a_list(self):
+        """An ingredient should be read, changed and unpacked as the [name, quantity, unit] list it is"""
+        ingredient = rt.Ingredient("Ceci secchi", 10.56, "oz")
+        self.assertIsInstance(ingredient, list)
+        self.assertEqual(ingredient[0], "Ceci secchi")
+        self.assertEqual(ingredient[-1], "oz")
+        self.assertEqual(ingredient[:2], ["Ceci secchi", 10.56])
+        self.assertRaises(IndexError, lambda: ingredient[3])
+        name, quantity, unit = ingredient
+        self.assertEqual((name, quantity, unit), ("Ceci secchi", 10.56, "oz"))
+        ingredient[1] = 11
+        self.assertEqual(ingredient.quantity, 11)
+        ingredient.unit = "lb"
+        self.assertEqual(ingredient[2], "lb")
+        self.assertEqual(len(ingredient), 3)
+        self.assertIn("lb", ingredient)
+
+    def test_equality(self):
+        """An ingredient should be == to the list or tuple with the same items, either way around"""
+        ingredient = rt.Ingredient("Carote", 1, "n/a")
+        self.assertEqual(ingredient, ["Carote", 1, "n/a"])
+        self.assertEqual(["Carote", 1, "n/a"], ingredient)
+        self.assertEqual(ingredient, ("Carote", 1, "n/a"))
+        self.assertEqual(ingredient, rt.Ingredient("Carote", 1, "n/a"))
+        self.assertNotEqual(ingredient, ["Carote", 2, "n/a"])
+        self.assertNotEqual(ingredient, ["Carote", 1])
+        self.assertNotEqual(ingredient, "Carote")
+
+    def test_slots(self):
+        """An ingredient shouldn't have a __dict__"""
+        self.assertFalse(hasattr(rt.Ingredient("Carote", 1, "n/a"), '__dict__'))
+        self.assertFalse(hasattr(rt.Recipe(), '__dict__'))
+
+class RecipeValues(unittest.TestCase):
+    def setUp(self):
+        self.recipe = rt.Recipe.from_dict(gz_json)
+
+    def test_like_a_dict(self):
+        """A recipe should be read and changed as the dictionary it is, other keys included"""
+        self.assertIsInstance(self.recipe, dict)
+        self.assertEqual(self.recipe['name'], gz_json['name'])
+        self.assertEqual(self.recipe.name, gz_json['name'])
+        self.assertEqual(list(self.recipe.keys()), ['name', 'image', 'ingredients', 'preparation'])
+        self.assertEqual(dict(self.recipe.items()), gz_json)
+        self.assertEqual(self.recipe.get('servings', 4), 4)
+        self.assertIn('ingredients', self.recipe)
+        self.assertEqual(len(self.recipe), 4)
+        self.assertEqual(self.recipe, gz_json)
+        self.assertEqual(gz_json, self.recipe)
+        self.recipe['ingredients'] = [["Sale", "q.b.", "n/a"]]
+        self.assertIsInstance(self.recipe['ingredients'][0], rt.Ingredient)
+        self.recipe.update(ingredients=[["Pepe", "q.b.", "n/a"]])
+        self.assertIsInstance(self.recipe.ingredients[0], rt.Ingredient)
+        self.assertRaises(KeyError, lambda: self.recipe['servings'])
+        self.recipe['source'] = "https://ricette.giallozafferano.it/Zuppa-di-ceci.html"
+        self.assertEqual(list(self.recipe)[-1], 'source')
+        del self.recipe['source']
+        self.assertNotIn('source', self.recipe)
+
+    def test_from_dict(self):
+        """from_dict should keep any other keys and fill in the missing fields"""
+        recipe = rt.Recipe.from_dict({**gz_json, 'source': 'GZ'})
+        self.assertEqual(recipe['source'], 'GZ')
+        self.assertEqual(rt.Recipe.from_dict({'name': 'Zuppa'}), {'name': 'Zuppa', 'image': '', 'ingredients': [], 'preparation': []})
+
+    def test_to_dict(self):
+        """json should serialize the recipe as it is, to_dict should be the plain dictionary"""
+        plain = self.recipe.to_dict()
+        self.assertIs(type(plain), dict)
+        self.assertIs(type(plain['ingredients'][0]), list)
+        self.assertEqual(plain, gz_json)
+        self.assertEqual(json.loads(json.dumps(self.recipe)), gz_json)
+        self.assertEqual(json.loads(json.dumps(self.recipe, default=rt.to_json)), gz_json)
+        self.assertRaises(TypeError, json.dumps, object(), default=rt.to_json)
+        self.assertEqual(se.loads(se.dumps(self.recipe)), gz_json)
+
+    def test_copies(self):
+        """A recipe should survive copy, deepcopy and pickle"""
+        self.assertEqual(copy.deepcopy(self.recipe), gz_json)
+        self.assertEqual(pickle.loads(pickle.dumps(self.recipe)), gz_json)
+        shallow = self.recipe.copy()
+        shallow['ingredients'].append(["Sale", "q.b.", "n/a"])
+        self.assertEqual(self.recipe, gz_json)
+
+    def test_converter(self):
+        """The converters should make a Recipe equal to the JSON of the recipe, and write_recipe_to should write the JSON"""
+        converter = gz.GZConverter(path_to_gz_soup, read_from_file=True)
+        self.assertIsInstance(converter.recipe, rt.Recipe)
+        self.assertEqual(json.loads(json.dumps(converter.recipe)), gz_json)
+        self.assertIsInstance(converter['ingredients'][0], rt.Ingredient)
+        self.assertEqual(converter.recipe, gz_json)
+        self.assertEqual(converter._recipe_dict(), gz_json)
+        self.assertEqual(list(converter.keys()), list(gz_json.keys()))
+
+    def test_lazy(self):
+        """A lazy recipe's ingredients should be Ingredients too"""
+        converter = gz.GZConverter(path_to_gz_soup, read_from_file=True, lazy=True)
+        self.assertIsInstance(converter['ingredients'][0], rt.Ingredient)
+        self.assertEqual(converter.recipe, gz_json)
+
+class Memory(unittest.TestCase):
+    def test_smaller(self):
+        """Recipes of Ingredients should take less memory than plain dictionaries of lists, since the ingredients share their strings"""
+        count = 1000
+        as_dicts = allocated(lambda: loaded(count))
+        as_recipes = allocated(lambda: [rt.Recipe.from_dict(recipe) for recipe in loaded(count)])
+        self.assertLess(as_recipes, as_dicts * 0.8)
+
+        lists = allocated(lambda: [json.loads('["Ceci secchi", 10.56, "oz"]') for _ in range(10000)])
+        ingredients = allocated(lambda: [rt.Ingredient(*json.loads('["Ceci secchi", 10.56, "oz"]')) for _ in range(10000)])
+        self.assertLess(ingredients, lists * 0.6)
+
+    def test_shared_strings(self):
+        """Ingredients with the same name, unit or quantity should point to the same strings, even if they were set later"""
+        first = rt.Ingredient(''.join(["Farina ", "00"]), ''.join(["q.", "b."]), ''.join(["n/", "a"]))
+        second = rt.Ingredient("Farina 00", "q.b.", "n/a")
+        for a, b in zip(first, second):
+            self.assertIs(a, b)
+        first.unit = ''.join(["o", "z"])
+        second[2] = "oz"
+        self.assertIs(first.unit, second.unit)
+
+@unittest.skipUnless(os.environ.get('R2API_BENCHMARKS'), "set R2API_BENCHMARKS=1 to run the benchmarks")
+class Benchmark(unittest.TestCase):
+    def test_memory(self):
+        """The memory of many recipes as dictionaries of lists and as Recipes of Ingredients"""
+        count = int(os.environ.get('R2API_BENCHMARK_PAGES', 100)) * 100
+        as_dicts = allocated(lambda: loaded(count))
+        as_recipes = allocated(lambda: [rt.Recipe.from_dict(recipe) for recipe in loaded(count)])
+        print(f"\n{count} recipes of the {len(corpus)} in tests/recipes: dictionaries {as_dicts / 2 ** 20:.1f}MiB, "
+              f"Recipes {as_recipes / 2 ** 20:.1f}MiB ({1 - as_recipes / as_dicts:.0%} less)")
+        self.assertLess(as_recipes, as_dicts * 0.8)
+
+if __name__ == '__main__':
+    unittest.main()
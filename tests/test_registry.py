@@ -0,0 +1,131 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api
+import r2api.converter.registry as registry
+import r2api.batch.batch_conversion as batch
+import r2api.batch.async_conversion as ac
+from local_server import LocalServerTestCase, run
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_gz_json = os.path.join(file_path, "recipes/GZRecipe.json")
+
+with open(path_to_gz_json, 'r') as f:
+    gz_json = json.load(f)
+
+# A converter made outside of r2api, only imported once a url of its site is converted
+third_party_module = '''
+from r2api.converter.base_converter import BaseConverter
+
+class ThirdPartyConverter(BaseConverter):
+    def get_title(self, soup):
+        return soup.find('title').text
+    def get_image(self, soup):
+        return ''
+    def get_ingredients(self, soup, convert_units=True):
+        return []
+    def get_preparation(self, soup, convert_units=True):
+        return []
+'''
+
+class KnownValues(unittest.TestCase):
+    def test_dispatch(self):
+        """Every site should be dispatched to its converter"""
+        urls = (
+            ("https://ricette.giallozafferano.it/Zuppa-di-ceci.html", r2api.GZConverter),
+            ("https://www.fattoincasadabenedetta.it/ricetta/riso-al-latte-al-forno/", r2api.FCConverter),
+            ("http://fattoincasadabenedetta.it/ricetta/riso-al-latte-al-forno/", r2api.FCConverter),
+            ("https://blog.giallozafferano.it/mollichedizucchero/torta-sofficissima/", r2api.MZConverter),
+            ("https://blog.giallozafferano.it/allacciateilgrembiule/uova-alla-garibaldina/", r2api.AGConverter),
+            ("https://BLOG.giallozafferano.it/primipiattiricette/parmigiana-di-melanzane-della-nonna/", r2api.RMConverter),
+        )
+        for url, converter in urls:
+            with self.subTest(url=url):
+                self.assertIs(registry.converter_for(url), converter)
+
+    def test_third_party(self):
+        """A converter registered as 'module:Class' should only be imported when it's first needed"""
+        directory = tempfile.mkdtemp()
+        sys.path.insert(0, directory)
+        try:
+            with open(os.path.join(directory, 'r2api_third_party.py'), 'w') as f:
+                f.write(third_party_module)
+            registry.register_converter('www.example.com', 'r2api_third_party:ThirdPartyConverter', '/recipes/')
+            self.assertNotIn('r2api_third_party', sys.modules)
+            self.assertRaises(ValueError, registry.converter_for, "https://example.com/recipes-old/1")
+            converter = registry.converter_for("https://example.com/recipes/1")
+            self.assertIn('r2api_third_party', sys.modules)
+            self.assertEqual(converter.__name__, 'ThirdPartyConverter')
+            self.assertIs(registry.converter_for("https://example.com/recipes/2"), converter)
+        finally:
+            registry.unregister_converter('example.com', '/recipes')
+            sys.path.remove(directory)
+            sys.modules.pop('r2api_third_party', None)
+            shutil.rmtree(directory)
+        self.assertRaises(ValueError, registry.converter_for, "https://example.com/recipes/1")
+
+    def test_longest_prefix(self):
+        """A more specific prefix should win over the whole host"""
+        registry.register_converter('example.org', r2api.GZConverter)
+        registry.register_converter('example.org', r2api.MZConverter, 'blog')
+        try:
+            self.assertIs(registry.converter_for("https://example.org/blog/1"), r2api.MZConverter)
+            self.assertIs(registry.converter_for("https://example.org/1"), r2api.GZConverter)
+        finally:
+            registry.unregister_converter('example.org')
+            registry.unregister_converter('example.org', 'blog')
+
+class Dispatching(LocalServerTestCase):
+    """Serves the files in tests/soups on a random local port, registered as a Giallo Zafferano site"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        registry.register_converter('127.0.0.1', r2api.GZConverter)
+
+    @classmethod
+    def tearDownClass(cls):
+        registry.unregister_converter('127.0.0.1')
+        super().tearDownClass()
+
+    def test_convert(self):
+        """r2api.convert should use the converter of the url's site"""
+        converter = r2api.convert(f"{self.base_url}/GZSoup.html")
+        self.assertIsInstance(converter, r2api.GZConverter)
+        self.assertEqual(converter['ingredients'], gz_json['ingredients'])
+
+    def test_convert_many(self):
+        """convert_many without a converter should dispatch every url, an unknown site is an error for that url only"""
+        results = {result.url: result for result in batch.convert_many([f"{self.base_url}/GZSoup.html", "https://example.net/1"])}
+        self.assertTrue(results[f"{self.base_url}/GZSoup.html"].ok)
+        self.assertIsInstance(results["https://example.net/1"].error, ValueError)
+
+    def test_aconvert(self):
+        """aconvert without a converter should dispatch the url"""
+        converter = run(ac.aconvert(f"{self.base_url}/GZSoup.html"))
+        self.assertIsInstance(converter, r2api.GZConverter)
+        self.assertEqual(converter['preparation'], gz_json['preparation'])
+
+class IncorrectInput(unittest.TestCase):
+    def test_unknown_site(self):
+        """A url without a registered converter should raise a ValueError"""
+        self.assertRaises(ValueError, r2api.convert, "https://example.net/recipe")
+        self.assertRaises(ValueError, registry.converter_for, "https://blog.giallozafferano.it/someoneelse/recipe")
+        self.assertRaises(ValueError, registry.converter_for, "not a url")
+
+    def test_bad_registration(self):
+        """A converter that's neither a class nor 'module:Class' should raise a ValueError, a class that isn't a converter a TypeError"""
+        self.assertRaises(ValueError, registry.register_converter, 'example.net', 'r2api.converter')
+        registry.register_converter('example.net', 'fractions:Fraction')
+        try:
+            self.assertRaises(TypeError, registry.converter_for, "https://example.net/recipe")
+        finally:
+            registry.unregister_converter('example.net')
+
+if __name__ == '__main__':
+    unittest.main()
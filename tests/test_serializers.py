@@ -0,0 +1,138 @@
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.export.serializers as se
+import r2api.export.ndjson as nd
+import r2api.converter.giallo_zafferano as gz
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_gz_soup = os.path.join(file_path, "soups/GZSoup.html")
+path_to_gz_json = os.path.join(file_path, "recipes/GZRecipe.json")
+
+with open(path_to_gz_json, 'r') as f:
+    gz_json = json.load(f)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+class SerializerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+class KnownValues(SerializerTestCase):
+    def test_json(self):
+        """A recipe should come back the same from JSON, indented or not"""
+        self.assertEqual(se.loads(se.dumps(gz_json)), gz_json)
+        self.assertEqual(se.loads(se.dumps(gz_json, indent=4)), gz_json)
+        self.assertNotIn(b'\n', se.dumps(gz_json))
+
+    def test_pack(self):
+        """A packed recipe should be a list without the keys, and any other keys should be kept"""
+        packed = se.pack_recipe(gz_json)
+        self.assertEqual(packed, [1, gz_json['name'], gz_json['image'], gz_json['ingredients'], gz_json['preparation']])
+        self.assertEqual(se.unpack_recipe(packed), gz_json)
+        recipe = dict(gz_json, servings=4)
+        self.assertEqual(se.unpack_recipe(se.pack_recipe(recipe)), recipe)
+        # Ingredients come back as lists even if a packer turned them into tuples
+        packed[3] = [tuple(ingredient) for ingredient in packed[3]]
+        self.assertEqual(se.unpack_recipe(packed), gz_json)
+
+    def test_write_recipe_to(self):
+        """write_recipe_to should still write indented JSON by default, which read_recipe reads back"""
+        path = os.path.join(self.directory, 'recipe.json')
+        gz.GZConverter(path_to_gz_soup, read_from_file=True).write_recipe_to(path)
+        with open(path) as f:
+            self.assertEqual(f.read(), json.dumps(gz_json, indent=4))
+        self.assertEqual(se.read_recipe(path), gz_json)
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_orjson(self):
+        """orjson should write JSON that the standard library reads as the same recipe"""
+        self.assertEqual(json.loads(se.dumps(gz_json, 'orjson')), gz_json)
+        self.assertEqual(se.loads(se.dumps(gz_json), 'orjson'), gz_json)
+        path = os.path.join(self.directory, 'recipe.json')
+        gz.GZConverter(path_to_gz_soup, read_from_file=True).write_recipe_to(path, format='orjson')
+        with open(path) as f:
+            self.assertEqual(json.load(f), gz_json)
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_ndjson_orjson(self):
+        """An NDJSON file written with orjson should be read the same by either serializer"""
+        path = os.path.join(self.directory, 'recipes.ndjson')
+        with nd.NDJSONWriter(path, serializer='orjson') as writer:
+            writer.write("https://ricette.giallozafferano.it/Zuppa-di-ceci.html", gz_json)
+        self.assertEqual(list(nd.read_ndjson(path)), list(nd.read_ndjson(path, serializer='orjson')))
+        with nd.NDJSONWriter(path, serializer='orjson') as writer:
+            self.assertEqual(len(writer), 1)
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack(self):
+        """A recipe should come back the same from msgpack, smaller than its JSON"""
+        data = se.dumps(gz_json, 'msgpack')
+        self.assertLess(len(data), len(se.dumps(gz_json)))
+        self.assertEqual(se.loads(data, 'msgpack'), gz_json)
+        path = os.path.join(self.directory, 'recipe.msgpack')
+        gz.GZConverter(path_to_gz_soup, read_from_file=True).write_recipe_to(path, format='msgpack')
+        self.assertEqual(se.read_recipe(path), gz_json)
+
+class BadInput(SerializerTestCase):
+    def test_unknown_format(self):
+        """An unknown format should raise a ValueError without touching the file"""
+        path = os.path.join(self.directory, 'recipe.json')
+        with open(path, 'w') as f:
+            f.write('{}')
+        self.assertRaises(ValueError, se.dumps, gz_json, 'yaml')
+        self.assertRaises(ValueError, gz.GZConverter(path_to_gz_soup, read_from_file=True).write_recipe_to, path, format='yaml')
+        with open(path) as f:
+            self.assertEqual(f.read(), '{}')
+        self.assertRaises(ValueError, nd.NDJSONWriter, os.path.join(self.directory, 'recipes.ndjson'), serializer='msgpack')
+
+    def test_not_packed(self):
+        """Anything that isn't a packed recipe should raise a ValueError"""
+        self.assertRaises(ValueError, se.unpack_recipe, gz_json)
+        self.assertRaises(ValueError, se.unpack_recipe, [2, 'name'])
+
+    @unittest.skipIf(msgpack is not None, "msgpack is installed")
+    def test_missing_msgpack(self):
+        """Without msgpack installed, the msgpack format should raise an ImportError"""
+        self.assertRaises(ImportError, se.dumps, gz_json, 'msgpack')
+
+@unittest.skipUnless(os.environ.get('R2API_BENCHMARKS'), "set R2API_BENCHMARKS=1 to run the benchmarks")
+class Benchmark(unittest.TestCase):
+    def test_formats(self):
+        """Serializing the same recipe with every installed format, compared to json.dumps with indent=4"""
+        count = int(os.environ.get('R2API_BENCHMARK_PAGES', 100)) * 100
+
+        start = time.perf_counter()
+        for _ in range(count):
+            json.dumps(gz_json, indent=4)
+        baseline = time.perf_counter() - start
+        print(f"\n{count} recipes, json.dumps(indent=4): {baseline:.2f}s, {len(json.dumps(gz_json, indent=4))} bytes")
+
+        formats = ['json'] + (['orjson'] if orjson is not None else []) + (['msgpack'] if msgpack is not None else [])
+        for format in formats:
+            start = time.perf_counter()
+            for _ in range(count):
+                se.dumps(gz_json, format)
+            timing = time.perf_counter() - start
+            print(f"{format}: {timing:.2f}s ({baseline / timing:.1f}x), {len(se.dumps(gz_json, format))} bytes")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath('../'))
+
+import r2api.fetch.archive as sa
+import r2api.fetch.session as fs
+import r2api.converter.giallo_zafferano as gz
+import r2api.converter.fatto_in_casa as fic
+import r2api.batch.async_conversion as ac
+from local_server import run
+
+file_path = os.path.abspath(os.path.dirname(__file__))
+path_to_gz_soup = os.path.join(file_path, "soups/GZSoup.html")
+path_to_fc_soup = os.path.join(file_path, "soups/FCSoup.html")
+path_to_gz_json = os.path.join(file_path, "recipes/GZRecipe.json")
+
+with open(path_to_gz_soup, 'rb') as f:
+    gz_page = f.read()
+with open(path_to_fc_soup, 'rb') as f:
+    fc_page = f.read()
+with open(path_to_gz_json, 'r') as f:
+    gz_json = json.load(f)
+
+gz_url = "https://ricette.giallozafferano.it/Zuppa-di-ceci.html"
+fc_url = "https://www.fattoincasadabenedetta.it/ricetta/pasta-al-forno-con-polpette-di-ricotta/"
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class ArchiveTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'snapshots.r2a')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+class KnownValues(ArchiveTestCase):
+    def test_round_trip(self):
+        """A page should come back exactly as it was added, compressed in the archive"""
+        with sa.SnapshotArchive(self.path) as archive:
+            archive.put(gz_url, gz_page)
+            archive.put(fc_url, fc_page)
+            self.assertEqual(archive.get(gz_url), gz_page)
+            self.assertEqual(archive.get(fc_url), fc_page)
+            self.assertIsNone(archive.get("https://example.com"))
+            self.assertEqual(list(archive.urls()), [gz_url, fc_url])
+        self.assertLess(os.path.getsize(self.path), (len(gz_page) + len(fc_page)) / 2)
+
+    def test_persistence(self):
+        """The archive should be read again when it's opened again, with the last page added for a url"""
+        archive = sa.SnapshotArchive(self.path)
+        archive.put(gz_url, b'old')
+        archive.put(gz_url, gz_page)
+        archive.close()
+        archive = sa.SnapshotArchive(self.path)
+        self.assertEqual(len(archive), 1)
+        self.assertIn(gz_url, archive)
+        self.assertEqual(archive.get(gz_url), gz_page)
+        archive.close()
+
+    def test_rebuild_index(self):
+        """A lost index should be made again from the archive, ignoring a snapshot that was cut off"""
+        archive = sa.SnapshotArchive(self.path)
+        archive.put(gz_url, gz_page)
+        archive.put(fc_url, fc_page)
+        archive.close()
+        os.remove(self.path + '.index')
+        with open(self.path, 'ab') as f:
+            f.write(b'R2SA\x00\x00\x05http:')
+        archive = sa.SnapshotArchive(self.path)
+        self.assertEqual(len(archive), 2)
+        self.assertEqual(archive.get(fc_url), fc_page)
+        archive.close()
+
+    def test_torn_snapshot(self):
+        """A snapshot cut off while writing should be cut off the archive when it's opened, so the ones added after it are kept"""
+        archive = sa.SnapshotArchive(self.path)
+        archive.put(gz_url, gz_page)
+        archive.close()
+        size = os.path.getsize(self.path)
+        with open(self.path, 'ab') as f:
+            f.write(b'R2SA\x00\x00\x05http:')
+        archive = sa.SnapshotArchive(self.path)
+        self.assertEqual(os.path.getsize(self.path), size)
+        archive.put(fc_url, fc_page)
+        self.assertEqual(archive.rebuild_index(), 2)
+        self.assertEqual(archive.get(fc_url), fc_page)
+        archive.close()
+
+    def test_unindexed_snapshot(self):
+        """A snapshot written without making it to the index should be indexed when the archive is opened"""
+        archive = sa.SnapshotArchive(self.path)
+        archive.put(gz_url, gz_page)
+        archive.put(fc_url, fc_page)
+        archive._index.execute("DELETE FROM snapshots WHERE url = ?", (fc_url,))
+        archive.close()
+        with sa.SnapshotArchive(self.path) as archive:
+            self.assertEqual(archive.get(fc_url), fc_page)
+            self.assertEqual(archive.get(gz_url), gz_page)
+
+    @unittest.skipIf(zstandard is None, "zstandard is not installed")
+    def test_zstd(self):
+        """zstd and gzip snapshots can be in the same archive"""
+        with sa.SnapshotArchive(self.path) as archive:
+            archive.put(gz_url, gz_page)
+        with sa.SnapshotArchive(self.path, compression='zstd') as archive:
+            archive.put(fc_url, fc_page)
+            self.assertEqual(archive.get(gz_url), gz_page)
+            self.assertEqual(archive.get(fc_url), fc_page)
+
+class Converters(ArchiveTestCase):
+    def test_record_and_replay(self):
+        """A converter should add the page it got to the archive and read it back with read_from_file"""
+        with sa.SnapshotArchive(self.path) as archive:
+            recorded = gz.GZConverter(gz_url, content=gz_page, archive=archive)
+            fic.FCConverter(fc_url, content=fc_page.decode('utf-8'), archive=archive)
+            replayed = gz.GZConverter(gz_url, read_from_file=True, archive=archive)
+            self.assertEqual(replayed.recipe, recorded.recipe)
+            self.assertEqual(replayed['ingredients'], gz_json['ingredients'])
+            self.assertEqual(archive.get(fc_url), fc_page)
+
+    def test_streamed(self):
+        """A page cut short by the end markers shouldn't be archived"""
+        cut, complete = fs.read_until_markers((fc_page,), fic.FCConverter.end_markers)
+        self.assertFalse(complete)
+        with sa.SnapshotArchive(self.path) as archive:
+            fic.FCConverter(fc_url, content=cut, archive=archive, stream=True)
+            self.assertNotIn(fc_url, archive)
+
+    def test_aconvert(self):
+        """aconvert should read the page from the archive rather than fetching it"""
+        with sa.SnapshotArchive(self.path) as archive:
+            archive.put(gz_url, gz_page)
+            converter = run(ac.aconvert(gz_url, read_from_file=True, archive=archive))
+            self.assertEqual(converter['preparation'], gz_json['preparation'])
+
+class IncorrectInput(ArchiveTestCase):
+    def test_missing_url(self):
+        """Replaying a url that isn't in the archive should raise a KeyError"""
+        with sa.SnapshotArchive(self.path) as archive:
+            self.assertRaises(KeyError, gz.GZConverter, gz_url, read_from_file=True, archive=archive)
+
+    def test_bad_compression(self):
+        """An unknown compression should raise a ValueError and zstd without zstandard an ImportError"""
+        self.assertRaises(ValueError, sa.SnapshotArchive, self.path, compression='brotli')
+        if zstandard is None:
+            self.assertRaises(ImportError, sa.SnapshotArchive, self.path, compression='zstd')
+
+if __name__ == '__main__':
+    unittest.main()
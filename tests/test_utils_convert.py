@@ -1,16 +1,24 @@
 import sys
 import os
+import math
+import threading
+import time
 import unittest
 
 sys.path.append(os.path.abspath('../'))
 
 import r2api.utilities.unit_conversion as uc
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 class KnownValues(unittest.TestCase):
     known_values_ing = (
-        (('300', 'g'), (round(300 * .00220462, 2) * 16, 'oz')),
+        (('300', 'g'), (round(300 * .00220462 * 16, 2), 'oz')),
         (('2,7', 'kg'), (round(2.7 * 2.205, 2), 'lb')),
-        (('1.5', 'litri'), (round(round(1.5 * 33.814, 2) / 32, 2), 'quart')),
+        (('1.5', 'litri'), (round(1.5 * 33.8140227 / 32, 2), 'quart')),
         (('(5 o 6','n/a'), ('(5 o 6','n/a'))
     )
     known_values_name = (
@@ -75,6 +83,180 @@ class KnownValues(unittest.TestCase):
             self.assertEqual(known_result[0], result, error_msg_equal)
             self.assertIsInstance(result, known_result[1], error_msg_type)
 
+class SinglePass(unittest.TestCase):
+    def test_converted_once(self):
+        """Every quantity should be converted where it is, once, without touching the rest of the text"""
+        self.assertEqual(uc.convert_units_prep('300g di farina e 300g di zucchero'), '10.56oz di farina e 10.56oz di zucchero')
+        self.assertEqual(uc.convert_units_prep('300°g+300° C '), '10.56oz+572 F ')
+        self.assertEqual(uc.convert_units_prep('1 gr e 20 gradi'), '0 oz e 68 gradi')
+        self.assertEqual(uc.convert_units_prep('° C senza quantità, poi 20g'), '° C senza quantità, poi 0.64oz')
+
+    def test_name_words_untouched(self):
+        """Only the quantity and the unit should change in a name, not the same letters elsewhere in it"""
+        self.assertEqual(uc.convert_units_name('100 g di pecorino stagionato grattugiato'), '3.53 oz di pecorino stagionato grattugiato')
+
+    def test_long_text(self):
+        """A long text should be converted as each of its parts would be"""
+        parts = ['Cuocere a 180° per 20 minuti', 'aggiungere 1,5 litri di brodo', 'e 300g di riso'] * 500
+        self.assertEqual(uc.convert_units_prep(' '.join(parts)), ' '.join(uc.convert_units_prep(part) for part in parts))
+
+    def test_custom_units(self):
+        """A UnitConverter can convert with its own units"""
+        converter = uc.UnitConverter({'Tazze': (1, 0, 'cup')})
+        self.assertEqual(converter.convert_text('2 tazze di latte e 300g di riso'), '2 cup di latte e 300g di riso')
+
+class Cached(unittest.TestCase):
+    def tearDown(self):
+        uc.disable_conversion_cache()
+
+    def test_same_results(self):
+        """With the cache, the conversions should be the same and the repeats should be hits"""
+        cache = uc.enable_conversion_cache(maxsize=10)
+        for _ in range(3):
+            for text, converted in KnownValues.known_values_prep:
+                self.assertEqual(uc.convert_units_prep(text), converted)
+            for name, converted in KnownValues.known_values_name:
+                self.assertEqual(uc.convert_units_name(name), converted)
+        stats = uc.conversion_cache_stats()
+        self.assertEqual(stats, cache.stats())
+        self.assertEqual(stats.misses, 6)
+        self.assertEqual(stats.hits, 12)
+        self.assertEqual(stats.evictions, 0)
+        self.assertAlmostEqual(stats.hit_rate, 2 / 3)
+        self.assertRaises(TypeError, uc.convert_units_prep, 5)
+
+    def test_text_and_name_apart(self):
+        """The same string should be cached separately as a text and as a name"""
+        uc.enable_conversion_cache()
+        text = '500 gr di farina'
+        self.assertEqual(uc.convert_units_prep(text), uc.UnitConverter().convert_text(text))
+        self.assertEqual(uc.convert_units_name(text), uc.UnitConverter().convert_name(text))
+
+    def test_shared_by_converters(self):
+        """Converters with different units sharing a cache should each get their own conversion of the same text"""
+        cache = uc.ConversionCache()
+        cups = uc.UnitConverter({'tazze': (1, 0, 'cup')}, cache=cache)
+        pints = uc.UnitConverter({'tazze': (0.5, 0, 'pint')}, cache=cache)
+        default = uc.UnitConverter(cache=cache)
+        text = '2 tazze di latte'
+        self.assertEqual(cups.convert_text(text), uc.UnitConverter({'tazze': (1, 0, 'cup')}).convert_text(text))
+        self.assertEqual(pints.convert_text(text), uc.UnitConverter({'tazze': (0.5, 0, 'pint')}).convert_text(text))
+        self.assertNotEqual(cups.convert_text(text), pints.convert_text(text))
+        self.assertEqual(default.convert_text(text), text)
+        # Another converter with the same units shares the entries
+        uc.UnitConverter({'Tazze': (1, 0, 'cup')}, cache=cache).convert_text(text)
+        self.assertEqual(cache.stats().size, 3)
+
+    def test_evictions(self):
+        """Once it's full, the least recently used text should be evicted"""
+        cache = uc.ConversionCache(maxsize=2)
+        converter = uc.UnitConverter(cache=cache)
+        converter.convert_text('300g')
+        converter.convert_text('1 l')
+        converter.convert_text('300g')
+        converter.convert_text('5 cm')
+        self.assertEqual(cache.stats(), uc.CacheStats(hits=1, misses=3, evictions=1, size=2, maxsize=2))
+        converter.convert_text('300g')
+        self.assertEqual(cache.stats().hits, 2)
+        cache.clear()
+        self.assertEqual(cache.stats(), uc.CacheStats(0, 0, 0, 0, 2))
+        self.assertRaises(ValueError, uc.ConversionCache, 0)
+
+    def test_disabled(self):
+        """Without a cache there should be no stats"""
+        self.assertIsNone(uc.conversion_cache_stats())
+
+    def test_threads(self):
+        """Threads sharing the cache should get the right conversions and every lookup should be counted"""
+        cache = uc.ConversionCache(maxsize=3)
+        converter = uc.UnitConverter(cache=cache)
+        texts = [text for text, _ in KnownValues.known_values_prep]
+        expected = {text: converted for text, converted in KnownValues.known_values_prep}
+        wrong = []
+
+        def work():
+            for _ in range(200):
+                for text in texts:
+                    if converter.convert_text(text) != expected[text]:
+                        wrong.append(text)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(wrong, [])
+        stats = cache.stats()
+        self.assertEqual(stats.hits + stats.misses, 8 * 200 * len(texts))
+        self.assertLessEqual(stats.size, 3)
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class Batch(unittest.TestCase):
+    quantities = ['300', '2,7', 1.5, '(5 o 6', 10, 0.5, 1000, 250, '12', 2, 'q.b.', 7]
+    units = ['g', 'kg', 'litri', 'n/a', 'ml', 'dl', 'ml', 'G', 'cl', 'cm', 'n/a', 'mazzetti']
+
+    def test_same_as_one_by_one(self):
+        """convert_units_ing_batch should give the same quantities and units as convert_units_ing, NaN for the ones that aren't numbers"""
+        quantities, units = uc.convert_units_ing_batch(self.quantities, self.units)
+        self.assertEqual(quantities.dtype, numpy.float64)
+        for row, (quantity, unit) in enumerate(zip(self.quantities, self.units)):
+            expected_quantity, expected_unit = uc.convert_units_ing(quantity, unit)
+            self.assertEqual(units[row], expected_unit, (quantity, unit))
+            if isinstance(expected_quantity, str):
+                self.assertTrue(math.isnan(quantities[row]), (quantity, unit))
+            else:
+                self.assertAlmostEqual(quantities[row], expected_quantity, 7, (quantity, unit))
+
+    def test_mixed_column(self):
+        """A quantity that isn't a number should keep its unit even if the unit could be converted, as with convert_units_ing"""
+        quantities = ['q.b.', 300, 'qb', '1,5', 'un pizzico', 0.25, 'q.b.']
+        units = ['g', 'g', 'kg', 'l', 'ml', 'kg', 'n/a']
+        converted, converted_units = uc.convert_units_ing_batch(quantities, units)
+        for row, (quantity, unit) in enumerate(zip(quantities, units)):
+            expected_quantity, expected_unit = uc.convert_units_ing(quantity, unit)
+            self.assertEqual(converted_units[row], expected_unit, (quantity, unit))
+            if isinstance(expected_quantity, str):
+                self.assertTrue(math.isnan(converted[row]), (quantity, unit))
+            else:
+                self.assertAlmostEqual(converted[row], expected_quantity, 7, (quantity, unit))
+
+    def test_ranges(self):
+        """A range can't be a float, so it should be NaN with its unit kept"""
+        quantities, units = uc.convert_units_ing_batch(['2-3', 2], ['kg', 'kg'])
+        self.assertTrue(math.isnan(quantities[0]))
+        self.assertEqual(list(units), ['kg', 'lb'])
+
+    def test_arrays(self):
+        """A NumPy array of numbers should be converted as it is, and an empty column should be empty"""
+        quantities, units = uc.convert_units_ing_batch(numpy.array([300, 1500]), numpy.array(['g', 'ml']))
+        self.assertEqual(list(units), ['oz', 'quart'])
+        self.assertEqual(len(uc.convert_units_ing_batch([], [])[0]), 0)
+
+    def test_bad_lengths(self):
+        """There should be a unit for every quantity"""
+        self.assertRaises(ValueError, uc.convert_units_ing_batch, [1, 2], ['g'])
+
+    @unittest.skipUnless(os.environ.get('R2API_BENCHMARKS'), "set R2API_BENCHMARKS=1 to run the benchmarks")
+    def test_benchmark(self):
+        """The time to convert many ingredients one by one and in a batch"""
+        count = int(os.environ.get('R2API_BENCHMARK_PAGES', 100)) * 1000
+        quantities = (self.quantities * (count // len(self.quantities) + 1))[:count]
+        units = (self.units * (count // len(self.units) + 1))[:count]
+        start = time.perf_counter()
+        for quantity, unit in zip(quantities, units):
+            uc.convert_units_ing(quantity, unit)
+        one_by_one = time.perf_counter() - start
+        start = time.perf_counter()
+        uc.convert_units_ing_batch(quantities, units)
+        batch = time.perf_counter() - start
+        print(f"\n{count} ingredients: one by one {one_by_one:.2f}s, batch {batch:.2f}s")
+
+@unittest.skipIf(numpy is not None, "numpy is installed")
+class MissingNumpy(unittest.TestCase):
+    def test_missing_numpy(self):
+        """Without numpy installed, convert_units_ing_batch should raise an ImportError"""
+        self.assertRaises(ImportError, uc.convert_units_ing_batch, [300], ['g'])
+
 class BadInputs(unittest.TestCase):
     def test_convert_prep_bad(self):
         """convert_unit_prep should raise a TypeError if parameter is not a string"""